@@ -0,0 +1,61 @@
+"""
+Prefix autocomplete latency over large vocabularies
+
+Run from the repository root:
+    python -m benchmarks.autocomplete_latency [vocabulary sizes...]
+
+Terms are built from syllables drawn with Zipf-distributed weights, so
+like real words they pile up under common prefixes ("con", "pro", ...)
+instead of spreading evenly; term frequencies are Zipf-distributed too.
+The prefixes probed range from one to six characters, and "largest range"
+is the most terms any probed prefix matched.
+"""
+import bisect
+import random
+import statistics
+import sys
+import time
+
+from search_utils import PrefixCompleter
+
+DEFAULT_SIZES = [100000, 1000000]
+PROBES = 2000
+SYLLABLES = (
+    "con pro re de in ex com per dis sub pre trans inter un en ad ob ab "
+    "ter ma ri na to li ca la ti mo ro ne lo ve sa pa ta ba mi ra di no "
+    "lym pho cyte al ve o lar bron chi gas tric ven tri cle"
+).split()
+
+def build_vocabulary(size, seed=0):
+    """Return a term -> frequency dict with size distinct terms sharing skewed prefixes"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(SYLLABLES) + 1)]
+    terms = set()
+    while len(terms) < size:
+        terms.add("".join(rng.choices(SYLLABLES, weights, k=rng.randint(2, 5))))
+    return {term: int(1_000_000 / rank) + 1 for rank, term in enumerate(sorted(terms, key=lambda _: rng.random()), 1)}
+
+def main(sizes):
+    print(f"{'terms':>8} {'build ms':>10} {'median us':>10} {'p99 us':>10} {'largest range':>14}")
+    rng = random.Random(1)
+    for size in sizes:
+        term_freqs = build_vocabulary(size)
+        start = time.perf_counter()
+        completer = PrefixCompleter(term_freqs)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        terms = completer.terms
+        prefixes = [term[:rng.randint(1, 6)] for term in rng.sample(terms, PROBES)]
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            completer.complete(prefix)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        largest = max(bisect.bisect_left(terms, prefix + "\U0010ffff") - bisect.bisect_left(terms, prefix)
+                      for prefix in prefixes)
+        print(f"{size:>8} {build_ms:>10.1f} {statistics.median(timings):>10.1f} "
+              f"{timings[int(len(timings) * 0.99)]:>10.1f} {largest:>14}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
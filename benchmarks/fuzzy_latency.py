@@ -0,0 +1,56 @@
+"""
+Typo lookup latency of the trigram index as the vocabulary grows
+
+Run from the repository root:
+    python -m benchmarks.fuzzy_latency [vocabulary sizes...]
+
+The vocabulary is the knowledge base terms padded with random words built
+from the same letters, so trigram distributions stay realistic. Real terms
+keep their occurrence counts and synthetic words occur once, so they rank
+below real terms in full trigram buckets.
+"""
+import random
+import statistics
+import sys
+import time
+
+from search_utils import build_trigram_index, fuzzy_terms, index_content, load_knowledge_content
+
+MISSPELLINGS = ["alveolli", "peyer", "bronchiols", "lymphocite", "diafragm", "esophagous", "thymis"]
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+REPEATS = 20
+
+def build_vocabulary(size, seed=0):
+    """Return a term -> frequency dict: the real vocabulary plus synthetic words"""
+    postings = index_content(load_knowledge_content())["postings"]
+    real_terms = list(postings)
+    letters = "".join(real_terms)
+    rng = random.Random(seed)
+    vocabulary = {
+        term: sum(len(positions) for positions in postings[term].values())
+        for term in real_terms[:size]
+    }
+    while len(vocabulary) < size:
+        vocabulary.setdefault("".join(rng.choice(letters) for _ in range(rng.randint(4, 12))), 1)
+    return vocabulary
+
+def main(sizes):
+    print(f"{'terms':>8} {'build ms':>10} {'median us':>10} {'p95 us':>10}")
+    for size in sizes:
+        vocabulary = build_vocabulary(size)
+        start = time.perf_counter()
+        trigram_index = build_trigram_index(vocabulary, vocabulary)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for _ in range(REPEATS):
+            for token in MISSPELLINGS:
+                start = time.perf_counter()
+                fuzzy_terms(token, trigram_index)
+                timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95)]
+        print(f"{size:>8} {build_ms:>10.1f} {statistics.median(timings):>10.1f} {p95:>10.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
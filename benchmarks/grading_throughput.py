@@ -0,0 +1,49 @@
+"""
+Headless quiz grading throughput
+
+Run from the repository root:
+    python -m benchmarks.grading_throughput [submissions]
+
+Builds random 10-question submissions from the shipped question bank, with
+roughly half of the answers correct, and grades them with grade_quiz.
+Correct typed answers are reworded ("the ...", different case) so they go
+through similarity grading rather than matching the key exactly.
+"""
+import random
+import sys
+import time
+
+from grading import grade_quiz
+from question_bank import QUESTION_TYPES, QUIZ_PATH, load_question_bank
+
+DEFAULT_SUBMISSIONS = 20000
+QUIZ_LENGTH = 10
+
+def random_response(question, rng):
+    """Return a correct or plausible wrong answer for a question"""
+    q_type = question.get("type", "free_response")
+    correct = rng.random() < 0.5
+    if q_type == "matching":
+        matches = [pair["match"] for pair in question["pairs"]]
+        return {pair["item"]: pair["match"] if correct else rng.choice(matches) for pair in question["pairs"]}
+    if q_type == "multiple_choice":
+        return question["answer"] if correct else rng.choice(question["options"])
+    return f"the {question['answer'].upper()}" if correct else "not sure"
+
+def main(count):
+    bank = load_question_bank(QUIZ_PATH)
+    rng = random.Random(0)
+    submissions = []
+    for _ in range(count):
+        questions = bank.sample(rng.choice(list(bank.order)), "Any", QUESTION_TYPES, QUIZ_LENGTH, rng)
+        submissions.append((questions, {q["id"]: random_response(q, rng) for q in questions}))
+
+    start = time.perf_counter()
+    for questions, responses in submissions:
+        grade_quiz(questions, responses)
+    elapsed = time.perf_counter() - start
+    print(f"Graded {count} submissions of {QUIZ_LENGTH} questions in {elapsed * 1000:.0f} ms "
+          f"({count / elapsed:,.0f} submissions/s, {elapsed / count * 1e6:.1f} us each)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SUBMISSIONS)
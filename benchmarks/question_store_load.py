@@ -0,0 +1,60 @@
+"""
+Question bank load time and memory: nested JSON versus the JSONL store
+
+Run from the repository root:
+    python -m benchmarks.question_store_load [bank sizes...]
+
+For each size a synthetic bank is written both as one JSON document and as
+a question store with its sidecar index. Each is then loaded into a
+QuestionBank, reporting load time, memory held by the loaded bank (from
+tracemalloc) and the time to materialize one sampled 10-question quiz.
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.quiz_selection import build_quizzes
+from question_bank import load_question_bank
+from question_store import write_questions
+
+DEFAULT_SIZES = [10000, 100000]
+QUIZ_LENGTH = 10
+
+def measure(path):
+    """Return load ms, retained MB and quiz sampling ms for one bank file"""
+    gc.collect()
+    start = time.perf_counter()
+    load_question_bank(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    gc.collect()
+    tracemalloc.start()
+    bank = load_question_bank(path)
+    retained_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    bank.sample("intermediate", "lymphatic", ["multiple_choice", "free_response"], QUIZ_LENGTH)
+    sample_ms = (time.perf_counter() - start) * 1000
+    return load_ms, retained_mb, sample_ms
+
+def main(sizes):
+    print(f"{'questions':>10} {'format':>6} {'load ms':>10} {'held MB':>9} {'quiz ms':>9}")
+    for size in sizes:
+        quizzes = build_quizzes(size)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = os.path.join(temp_dir, "quizzes.json")
+            store_path = os.path.join(temp_dir, "questions.jsonl")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(quizzes, f)
+            write_questions(quizzes, store_path)
+            for label, path in (("json", json_path), ("jsonl", store_path)):
+                load_ms, retained_mb, sample_ms = measure(path)
+                print(f"{size:>10} {label:>6} {load_ms:>10.1f} {retained_mb:>9.1f} {sample_ms:>9.3f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,68 @@
+"""
+Quiz question selection latency for large question banks
+
+Run from the repository root:
+    python -m benchmarks.quiz_selection [bank sizes...]
+
+Compares the old per-click list-comprehension filtering plus random.sample
+against QuestionBank.sample for a single-category quiz restricted to two
+question types, the common configuration on the quiz page.
+"""
+import random
+import statistics
+import sys
+import time
+
+from question_bank import QUESTION_TYPES, QuestionBank
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+CATEGORIES = ["lymphatic", "respiratory", "digestive", "cardiovascular", "nervous", "skeletal"]
+PROBES = 50
+QUIZ_LENGTH = 10
+
+def build_quizzes(size, seed=0):
+    """Return a nested quiz dict holding size synthetic questions"""
+    rng = random.Random(seed)
+    quizzes = {difficulty: {"questions": []} for difficulty in DIFFICULTIES}
+    for i in range(size):
+        quizzes[rng.choice(DIFFICULTIES)]["questions"].append({
+            "id": f"q{i}",
+            "type": rng.choice(QUESTION_TYPES),
+            "question": f"Question {i}?",
+            "answer": f"Answer {i}",
+            "category": rng.choice(CATEGORIES)
+        })
+    return quizzes
+
+def scan_sample(quizzes, difficulty, category, question_types, k):
+    """The selection quiz_page used to do on every Start Quiz click"""
+    questions = quizzes[difficulty]["questions"]
+    available = [q for q in questions if q.get("category", "") == category]
+    available = [q for q in available if q.get("type", "free_response") in question_types]
+    return random.sample(available, k)
+
+def time_ms(func, probes):
+    """Return the median and worst call time of func in milliseconds"""
+    timings = []
+    for _ in range(probes):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+def main(sizes):
+    print(f"{'questions':>10} {'build ms':>10} {'scan ms':>10} {'bank ms':>10} {'speedup':>8}")
+    types = ["multiple_choice", "free_response"]
+    for size in sizes:
+        quizzes = build_quizzes(size)
+        start = time.perf_counter()
+        bank = QuestionBank.from_quizzes(quizzes)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        scan_ms, _ = time_ms(lambda: scan_sample(quizzes, "intermediate", "lymphatic", types, QUIZ_LENGTH), PROBES)
+        bank_ms, _ = time_ms(lambda: bank.sample("intermediate", "lymphatic", types, QUIZ_LENGTH), PROBES)
+        print(f"{size:>10} {build_ms:>10.1f} {scan_ms:>10.3f} {bank_ms:>10.4f} {scan_ms / bank_ms:>7.0f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,76 @@
+"""
+Sidebar search latency: file scan versus the in-memory BM25 index and the
+vectorized TF-IDF engine
+
+Run from the repository root:
+    python -m benchmarks.search_latency [doc counts...]
+
+The corpus is synthesized by repeating the knowledge base pages, so results
+scale with the real content rather than random text.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from search_utils import KNOWLEDGE_DIR, TfidfSearchEngine, html_to_text, index_content, search_content
+
+QUERIES = ["thymus", "germinal centers", "alveoli gas exchange", "peyer patches", "bile"]
+DEFAULT_DOC_COUNTS = [10, 100, 1000, 5000]
+REPEATS = 5
+
+def read_pages():
+    """Return the raw HTML of every knowledge base page"""
+    pages = []
+    for filename in sorted(os.listdir(KNOWLEDGE_DIR)):
+        if filename.endswith(".html"):
+            with open(os.path.join(KNOWLEDGE_DIR, filename), "r", encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+def write_corpus(directory, pages, doc_count):
+    """Write doc_count HTML files into directory, cycling through the pages"""
+    for i in range(doc_count):
+        with open(os.path.join(directory, f"section{i}.html"), "w", encoding="utf-8") as f:
+            f.write(pages[i % len(pages)])
+
+def scan_search(directory, query):
+    """The original search: read every file and substring-match it"""
+    results = []
+    for filename in os.listdir(directory):
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as file:
+            if query.lower() in file.read().lower():
+                results.append(filename)
+    return results
+
+def median_ms(func):
+    """Median wall time of func over all queries and repeats, in milliseconds"""
+    timings = []
+    for _ in range(REPEATS):
+        for query in QUERIES:
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main(doc_counts):
+    pages = read_pages()
+    print(f"{'docs':>6} {'build ms':>10} {'scan ms':>10} {'index ms':>10} {'tfidf ms':>10} {'speedup':>8}")
+    for doc_count in doc_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(directory, pages, doc_count)
+
+            start = time.perf_counter()
+            content_dict = {f"section{i}": html_to_text(pages[i % len(pages)]) for i in range(doc_count)}
+            index = index_content(content_dict)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            scan_ms = median_ms(lambda query: scan_search(directory, query))
+            index_ms = median_ms(lambda query: search_content(query, index, content_dict, limit=5))
+            engine = TfidfSearchEngine(index)
+            tfidf_ms = median_ms(lambda query: engine.search(query, content_dict, limit=5))
+        print(f"{doc_count:>6} {build_ms:>10.1f} {scan_ms:>10.2f} {index_ms:>10.2f} {tfidf_ms:>10.2f} {scan_ms / index_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_DOC_COUNTS)
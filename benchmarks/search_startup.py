@@ -0,0 +1,78 @@
+"""
+Cold-start cost of the search tokenizer: text_processing versus NLTK
+
+Run from the repository root:
+    python -m benchmarks.search_startup
+
+Each import is timed in a fresh interpreter. The NLTK rows are skipped when
+NLTK or its punkt/stopwords data is not installed.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 5
+
+SNIPPETS = {
+    "baseline interpreter": "pass",
+    "text_processing": "from text_processing import preprocess_text; preprocess_text('Alveoli exchange gas')",
+    "search_utils": "import search_utils; search_utils.preprocess_text('Alveoli exchange gas')",
+    "nltk pipeline": (
+        "from nltk.corpus import stopwords; from nltk.tokenize import word_tokenize; "
+        "set(stopwords.words('english')); word_tokenize('alveoli exchange gas')"
+    ),
+}
+
+THROUGHPUT_TEXT = "The alveoli are the site of gas exchange, where oxygen diffuses into the blood. " * 50
+
+def startup_ms(code):
+    """Median wall time of running code in a fresh interpreter, or None if it fails"""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            return None
+    return statistics.median(timings)
+
+def throughput(preprocess, repeats=200):
+    """Words tokenized per second over a fixed paragraph"""
+    words = len(THROUGHPUT_TEXT.split())
+    start = time.perf_counter()
+    for _ in range(repeats):
+        preprocess(THROUGHPUT_TEXT)
+    return words * repeats / (time.perf_counter() - start)
+
+def nltk_preprocess():
+    """The former search_utils pipeline, or None if NLTK is unavailable"""
+    try:
+        from nltk.corpus import stopwords
+        from nltk.tokenize import word_tokenize
+        stopwords.words('english')
+        word_tokenize("probe")
+    except (ImportError, LookupError):
+        return None
+    from text_processing import normalize
+
+    def preprocess(text):
+        stop_words = set(stopwords.words('english'))
+        return [word for word in word_tokenize(normalize(text)) if word not in stop_words]
+    return preprocess
+
+def main():
+    print(f"{'startup':<22} {'median ms':>10}")
+    for name, code in SNIPPETS.items():
+        ms = startup_ms(code)
+        print(f"{name:<22} {'n/a' if ms is None else f'{ms:.1f}':>10}")
+
+    from text_processing import preprocess_text
+    print(f"\n{'throughput':<22} {'words/s':>10}")
+    print(f"{'text_processing':<22} {throughput(preprocess_text):>10.0f}")
+    preprocess = nltk_preprocess()
+    if preprocess:
+        print(f"{'nltk pipeline':<22} {throughput(preprocess):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-session quiz state memory with 500 concurrent sessions
+
+Run from the repository root:
+    python -m benchmarks.session_memory [sessions]
+
+Each simulated session starts a 10-question quiz from the shipped question
+bank. "dicts" keeps copies of the question dicts in session state, as
+activate_quiz did when load_quiz_data (st.cache_data returns a fresh copy on
+every call) fed it; "ids" keeps the tuple of question ids that is stored
+now, resolved through the shared question bank. Memory is measured with
+tracemalloc and excludes the shared bank itself.
+"""
+import copy
+import random
+import sys
+import tracemalloc
+
+from question_bank import QUIZ_PATH, load_question_bank
+
+DEFAULT_SESSIONS = 500
+QUIZ_LENGTH = 10
+TYPES = ["free_response", "multiple_choice", "matching", "identification"]
+
+def session_state(bank, rng, store_ids):
+    """Return the quiz entries of one session's state after starting a quiz"""
+    ids = bank.sample_ids("intermediate", "Any", TYPES, QUIZ_LENGTH, rng)
+    state = {"quiz_active": True, "quiz_submitted": False, "user_responses": {}}
+    if store_ids:
+        state["active_question_ids"] = tuple(ids)
+    else:
+        state["active_questions"] = copy.deepcopy(bank.resolve(ids))
+    return state
+
+def measure(bank, sessions, store_ids):
+    """Return the bytes held by the quiz state of every session"""
+    rng = random.Random(0)
+    tracemalloc.start()
+    states = [session_state(bank, rng, store_ids) for _ in range(sessions)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del states
+    return held
+
+def main(sessions):
+    bank = load_question_bank(QUIZ_PATH)
+    print(f"{'layout':>6} {'sessions':>9} {'total KB':>10} {'per session B':>14}")
+    for label, store_ids in (("dicts", False), ("ids", True)):
+        held = measure(bank, sessions, store_ids)
+        print(f"{label:>6} {sessions:>9} {held / 1024:>10.1f} {held / sessions:>14.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SESSIONS)
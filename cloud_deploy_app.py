@@ -1,5 +1,4 @@
 import streamlit as st
-import json
 import os
 import base64
 from datetime import datetime
@@ -11,7 +10,8 @@ import altair as alt
 
 # Import custom modules
 from tabbed_interface import tabbed_study_interface
-from search_utils import index_content, search_content, preprocess_text
+from content_registry import get_search_data, get_system_ids, get_system
+from search_utils import PrefixCompleter, TfidfSearchEngine, cached_search, mark_highlights
 from interactive_diagrams import lymph_node_interactive, respiratory_system_interactive, digestive_system_interactive
 from simulations import respiratory_experiment_simulation, co2_reaction_simulation, simulations_page
 from user_progress import load_user_progress, update_quiz_history, update_viewed_section
@@ -50,13 +50,6 @@ def apply_custom_theme():
         </script>
         """, unsafe_allow_html=True)
 
-# Load quiz data
-@st.cache_data
-def load_quiz_data(difficulty="intermediate"):
-    with open('data/enhanced_quizzes.json', 'r', encoding='utf-8') as f:
-        all_quizzes = json.load(f)
-        return all_quizzes.get(difficulty, all_quizzes.get("intermediate"))
-
 # Sidebar navigation and elements
 def sidebar_elements():
     st.sidebar.title("Anatomy Study App")
@@ -81,8 +74,8 @@ def sidebar_elements():
     # Navigation options
     selected = st.sidebar.radio(
         "Navigation",
-        ["Home", "Lymphatic System", "Respiratory System", "Digestive System", 
-         "Quiz", "Progress"]
+        ["Home"] + [get_system(system)["title"] for system in get_system_ids()] +
+        ["Quiz", "Progress"]
     )
     
     # User information
@@ -111,39 +104,73 @@ def sidebar_elements():
     search_query = st.sidebar.text_input("Search study materials:", key="search_box")
     
     if search_query:
+        search_suggestions(search_query)
         search_results(search_query)
     
     return selected
 
+# Search index, built once per process and shared by all sessions
+def get_search_index():
+    return get_search_data()
+
+# Derived search structures are cached per content hash, so page edits rebuild them
+@st.cache_resource(max_entries=2)
+def build_tfidf_engine(content_hash):
+    _, index = get_search_index()
+    return TfidfSearchEngine(index)
+
+@st.cache_resource(max_entries=2)
+def build_prefix_completer(content_hash):
+    _, index = get_search_index()
+    return PrefixCompleter.from_index(index)
+
+def get_tfidf_engine():
+    return build_tfidf_engine(get_search_index()[1]["content_hash"])
+
+def get_prefix_completer():
+    return build_prefix_completer(get_search_index()[1]["content_hash"])
+
+def apply_search_suggestion(suggestion):
+    """Replace the search box text with a chosen suggestion"""
+    st.session_state.search_box = suggestion
+
+def search_suggestions(search_query):
+    """Offer completions of the last word typed in the search box"""
+    suggestions = get_prefix_completer().complete_query(search_query)
+    if suggestions:
+        st.sidebar.caption("Suggestions:")
+        for i, suggestion in enumerate(suggestions):
+            st.sidebar.button(suggestion, key=f"suggest_{i}", on_click=apply_search_suggestion, args=(suggestion,))
+
 # Search functionality
-def search_results(search_query):
+def search_results(search_query, max_results=5):
     """Display search results in the sidebar"""
     st.sidebar.markdown("### Search Results")
     
-    # Search across all study materials
-    sections = ["lymphatic", "respiratory", "digestive"]
-    results = []
-    
-    for section in sections:
-        try:
-            with open(os.path.join('data', 'knowledge', f'{section}.html'), 'r', encoding='utf-8') as file:
-                content = file.read()
-                # Use basic string search for simplicity
-                if search_query.lower() in content.lower():
-                    results.append({
-                        "section": section,
-                        "title": f"{section.capitalize()} System"
-                    })
-        except Exception as e:
-            st.sidebar.error(f"Error searching {section}: {str(e)}")
+    # Rank sections with the in-memory index instead of re-reading the HTML files
+    try:
+        content_dict, index = get_search_index()
+        # SEARCH_ENGINE=tfidf switches to vectorized cosine ranking for large curricula
+        engine = get_tfidf_engine() if os.environ.get("SEARCH_ENGINE") == "tfidf" else None
+        results = cached_search(search_query, index, content_dict, limit=max_results, engine=engine)
+    except Exception as e:
+        st.sidebar.error(f"Error searching study materials: {str(e)}")
+        return
     
     if results:
         for i, result in enumerate(results):
             section = result["section"]
-            title = result["title"]
+            # Navigation entries are the manifest titles
+            system = get_system(section)
+            title = system["title"] if system else f"{section.capitalize()} System"
             
             st.sidebar.markdown(f"<div class='search-result'>", unsafe_allow_html=True)
             st.sidebar.markdown(f"**{title}**", unsafe_allow_html=True)
+            st.sidebar.caption(mark_highlights(result["snippet"], result["highlights"]))
+            
+            # Show other matching sentences from the same section
+            for hit in result["sentence_hits"][1:]:
+                st.sidebar.markdown(f"- {mark_highlights(hit['sentence'], hit['highlights'])}")
             
             # Add a button to navigate to that section
             if st.sidebar.button(f"Go to {title}", key=f"search_{i}"):
@@ -185,29 +212,16 @@ def home_page():
         </div>
         """, unsafe_allow_html=True)
         
-        st.markdown("<div class='custom-card'>", unsafe_allow_html=True)
-        st.subheader("Lymphatic System")
-        st.write("Learn about the network of vessels, organs, and tissues that help maintain fluid balance and defend against infections.")
-        if st.button("Study Lymphatic System", key="btn_lymphatic"):
-            st.session_state['navigation'] = "Lymphatic System"
-            st.rerun()
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.markdown("<div class='custom-card'>", unsafe_allow_html=True)
-        st.subheader("Respiratory System")
-        st.write("Explore the system responsible for gas exchange between the body and the external environment.")
-        if st.button("Study Respiratory System", key="btn_respiratory"):
-            st.session_state['navigation'] = "Respiratory System"
-            st.rerun()
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.markdown("<div class='custom-card'>", unsafe_allow_html=True)
-        st.subheader("Digestive System")
-        st.write("Learn about how the body processes food, extracts nutrients, and eliminates waste.")
-        if st.button("Study Digestive System", key="btn_digestive"):
-            st.session_state['navigation'] = "Digestive System"
-            st.rerun()
-        st.markdown("</div>", unsafe_allow_html=True)
+        # One card per system in the content manifest
+        for system_id in get_system_ids():
+            system = get_system(system_id)
+            st.markdown("<div class='custom-card'>", unsafe_allow_html=True)
+            st.subheader(system["title"])
+            st.write(system.get("summary", ""))
+            if st.button(f"Study {system['title']}", key=f"btn_{system_id}"):
+                st.session_state['navigation'] = system["title"]
+                st.rerun()
+            st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
         st.markdown("""
@@ -269,7 +283,7 @@ def home_page():
                     "Date": date,
                     "Category": quiz["category"].capitalize(),
                     "Difficulty": quiz["difficulty"].capitalize(),
-                    "Score": f"{quiz['score']}/{quiz['total']} ({score_pct:.0f}%)"
+                    "Score": f"{quiz['score']:g}/{quiz['total']} ({score_pct:.0f}%)"
                 })
             
             quiz_df = pd.DataFrame(quiz_data)
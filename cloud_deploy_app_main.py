@@ -24,16 +24,22 @@ from logging_config import configure_logging
 logger = configure_logging()('main')
 
 from user_progress import initialize_user_progress
+from progress_store import start_compactor, progress_cache_stats
+from search_utils import search_cache_stats
 from session_state import initialize_session_state
 from cloud_deploy_app_progress import progress_page
 from cloud_deploy_app_quiz import quiz_page, render_quiz_question
 from cloud_deploy_app import sidebar_elements, apply_custom_theme, home_page, tabbed_study_interface
+from content_registry import get_system_by_title
 
 # Complete main function
 def main():
     """Main application entry point"""
     logger.info("Starting application")
     
+    # Fold progress journals into snapshots in the background (no-op after the first run)
+    start_compactor()
+    
     # Initialize a user identifier if not present
     initialize_session_state()
     
@@ -63,12 +69,8 @@ def main():
     # Display content based on selection
     if selected == "Home":
         home_page()
-    elif selected == "Lymphatic System":
-        tabbed_study_interface("lymphatic")
-    elif selected == "Respiratory System":
-        tabbed_study_interface("respiratory")
-    elif selected == "Digestive System":
-        tabbed_study_interface("digestive")
+    elif get_system_by_title(selected):
+        tabbed_study_interface(get_system_by_title(selected)["id"])
     elif selected == "Quiz":
         # Important: DO NOT clear navigation state for Quiz until user explicitly navigates away
         logger.info("Attempting to display quiz page")
@@ -85,6 +87,9 @@ def main():
     if 'navigation' in st.session_state and selected != "Quiz":
         logger.info(f"Clearing navigation state after rendering {selected}")
         del st.session_state['navigation']
+    
+    logger.debug(f"Progress cache: {progress_cache_stats()}")
+    logger.debug(f"Search cache: {search_cache_stats()}")
 
 # Run the application
 if __name__ == "__main__":
@@ -1,4 +1,11 @@
 # Progress tracking page implementation
+import streamlit as st
+import pandas as pd
+import altair as alt
+from datetime import datetime
+from user_progress import load_user_progress, get_quiz_aggregates
+from content_registry import get_system_ids
+
 def progress_page():
     """Display user progress and analytics"""
     st.title("Learning Progress")
@@ -26,7 +33,7 @@ def progress_page():
         
         # Get mastery levels
         mastery_levels = user_progress.get("mastery_levels", {})
-        systems = ["lymphatic", "respiratory", "digestive"]
+        systems = get_system_ids()
         
         # Create mastery level data
         mastery_data = []
@@ -98,7 +105,7 @@ def progress_page():
                     "Category": quiz["category"].capitalize(),
                     "Difficulty": quiz["difficulty"].capitalize(),
                     "Score": score_pct,
-                    "Points": f"{quiz['score']}/{quiz['total']}"
+                    "Points": f"{quiz['score']:g}/{quiz['total']}"
                 })
             
             history_df = pd.DataFrame(history_data)
@@ -167,19 +174,19 @@ def progress_page():
     with tabs[2]:
         st.subheader("Personalized Study Recommendations")
         
-        # Get mastery levels and quiz history
+        # Get mastery levels and per-system quiz aggregates
         mastery_levels = user_progress.get("mastery_levels", {})
-        quiz_history = user_progress.get("quiz_history", [])
+        quiz_aggregates = get_quiz_aggregates(user_progress)
         
-        if mastery_levels and quiz_history:
+        if mastery_levels and quiz_aggregates:
             # Find weakest system
             weakest_system = min(mastery_levels.items(), key=lambda x: x[1])
             system_name = weakest_system[0]
             level = weakest_system[1]
             
-            # Find recent performance
-            recent_system_quizzes = [q for q in quiz_history if q["category"] == system_name][-3:] if quiz_history else []
-            avg_score = sum(q["score"]/q["total"] for q in recent_system_quizzes) / len(recent_system_quizzes) if recent_system_quizzes else 0
+            # Find recent performance from the last three quiz scores
+            recent_scores = quiz_aggregates.get(system_name, {}).get("recent", [])[-3:]
+            avg_score = sum(recent_scores) / len(recent_scores) if recent_scores else 0
             
             # Create recommendations based on mastery level and recent performance
             if level == 0:
@@ -15,12 +15,15 @@ from quiz_state import (
     reset_quiz_state, 
     is_quiz_active, 
     is_quiz_submitted,
-    activate_quiz
+    activate_quiz,
+    get_active_questions
 )
 
 # Fix imports for required functions
-from cloud_deploy_app import load_quiz_data
+from question_bank import get_question_bank
 from user_progress import update_quiz_history
+from grading import grade_quiz
+from content_registry import get_system_ids
 
 def quiz_page():
     """Display the quiz interface with improved state management"""
@@ -47,7 +50,7 @@ def quiz_page():
             # Quiz category selection
             category = st.selectbox(
                 "Select Topic", 
-                ["Any", "lymphatic", "respiratory", "digestive"],
+                ["Any"] + get_system_ids(),
                 key="quiz_category_select"
             )
         
@@ -75,33 +78,24 @@ def quiz_page():
         if st.button("Start Quiz", key="start_quiz_button"):
             logger.info(f"Starting quiz: {category}, {difficulty}, {num_questions} questions")
             try:
-                # Load quiz data
-                quiz_data = load_quiz_data(difficulty)
+                # Questions are pre-indexed by difficulty, category and type
+                bank = get_question_bank()
+                available = bank.count(difficulty, category, question_types)
                 
-                # Filter questions by category if specified
-                if category != "Any":
-                    available_questions = [q for q in quiz_data["questions"] if q.get("category", "") == category]
-                else:
-                    available_questions = quiz_data["questions"]
-                
-                # Filter by selected question types
-                available_questions = [q for q in available_questions if q.get("type", "free_response") in question_types]
-                
-                logger.info(f"Found {len(available_questions)} available questions")
+                logger.info(f"Found {available} available questions")
                 
-                if len(available_questions) >= num_questions:
-                    # Randomly select questions
-                    import random
-                    selected_questions = random.sample(available_questions, num_questions)
+                if available >= num_questions:
+                    # Randomly select question ids
+                    selected_ids = bank.sample_ids(difficulty, category, question_types, num_questions)
                     
                     # Activate the quiz
-                    activate_quiz(selected_questions, difficulty)
+                    activate_quiz(selected_ids, difficulty)
                     logger.info("Quiz activated with selected questions")
                     
                     # Rerun to show active quiz
                     st.rerun()
                 else:
-                    st.error(f"Not enough questions available. Only {len(available_questions)} found.")
+                    st.error(f"Not enough questions available. Only {available} found.")
             except Exception as e:
                 logger.error(f"Error starting quiz: {str(e)}")
                 st.error(f"Error starting quiz: {str(e)}")
@@ -118,7 +112,8 @@ def quiz_page():
         """, unsafe_allow_html=True)
         
         # Display questions
-        for i, question in enumerate(st.session_state.active_questions):
+        active_questions = get_active_questions()
+        for i, question in enumerate(active_questions):
             st.subheader(f"Question {i+1}")
             render_quiz_question(question, False, st.session_state.user_responses)
         
@@ -130,58 +125,24 @@ def quiz_page():
             if st.button("Submit Quiz", key="submit_quiz_button"):
                 logger.info("Quiz submitted")
                 
-                # Calculate score
-                score = 0
-                total = len(st.session_state.active_questions)
-                
-                for question in st.session_state.active_questions:
-                    q_id = question["id"]
-                    q_type = question["type"]
-                    
-                    if q_type == "free_response" or q_type == "identification":
-                        if q_id in st.session_state.user_responses:
-                            user_answer = st.session_state.user_responses[q_id].lower().strip()
-                            expected = question["answer"].lower().strip()
-                            if user_answer == expected:
-                                score += 1
-                    
-                    elif q_type == "multiple_choice":
-                        if q_id in st.session_state.user_responses:
-                            user_answer = st.session_state.user_responses[q_id]
-                            expected = question["answer"]
-                            if user_answer == expected:
-                                score += 1
-                    
-                    elif q_type == "matching":
-                        if q_id in st.session_state.user_responses:
-                            user_matches = st.session_state.user_responses[q_id]
-                            correct_count = 0
-                            total_pairs = len(question["pairs"])
-                            
-                            for pair in question["pairs"]:
-                                item = pair["item"]
-                                expected = pair["match"]
-                                user_match = user_matches.get(item, "")
-                                
-                                if user_match == expected:
-                                    correct_count += 1
-                            
-                            # Award partial credit for matching questions
-                            if correct_count == total_pairs:
-                                score += 1
+                # Grade every question once; the results view reuses the verdicts
+                grade = grade_quiz(active_questions, st.session_state.user_responses)
+                score = grade["score"]
+                total = grade["total"]
                 
                 # Store the result
                 st.session_state.quiz_result = {
                     "score": score, 
                     "total": total, 
-                    "difficulty": st.session_state.quiz_result["difficulty"]
+                    "difficulty": st.session_state.quiz_result["difficulty"],
+                    "verdicts": grade["verdicts"]
                 }
                 st.session_state.quiz_submitted = True
                 
                 # Update user progress
                 if "user_id" in st.session_state:
                     # Determine category
-                    categories = [q.get("category", "general") for q in st.session_state.active_questions]
+                    categories = [q.get("category", "general") for q in active_questions]
                     most_common_category = Counter(categories).most_common(1)[0][0]
                     
                     # Format for progress tracking
@@ -191,7 +152,7 @@ def quiz_page():
                         "difficulty": st.session_state.quiz_result["difficulty"],
                         "score": score,
                         "total": total,
-                        "question_types": question_types
+                        "question_types": sorted({q.get("type", "free_response") for q in active_questions})
                     }
                     
                     # Update progress
@@ -219,7 +180,7 @@ def quiz_page():
         st.markdown(f"""
         <div class="custom-card">
             <h3>Quiz Results</h3>
-            <p>You scored <strong>{score}/{total}</strong> ({percentage:.1f}%)</p>
+            <p>You scored <strong>{score:g}/{total}</strong> ({percentage:.1f}%)</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -264,10 +225,11 @@ def quiz_page():
         # Show detailed results
         st.subheader("Detailed Results")
         
-        for i, question in enumerate(st.session_state.active_questions):
+        verdicts = st.session_state.quiz_result.get("verdicts", {})
+        for i, question in enumerate(get_active_questions()):
             st.markdown(f"<div class='quiz-result-item'>", unsafe_allow_html=True)
             st.write(f"**Question {i+1}**")
-            render_quiz_question(question, True, st.session_state.user_responses)
+            render_quiz_question(question, True, st.session_state.user_responses, verdicts.get(question["id"]))
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Feedback based on score
@@ -296,19 +258,23 @@ def quiz_page():
                 st.session_state.navigation = "Home"
                 st.rerun()
 
-def render_quiz_question(question, is_submitted=False, user_responses=None):
-    """Render a quiz question with improved UI"""
+def render_quiz_question(question, is_submitted=False, user_responses=None, verdict=None):
+    """Render a quiz question with improved UI, showing its grading verdict once submitted"""
     q_id = question["id"]
     q_type = question["type"]
     
+    # Submitted questions show the verdict from grade_quiz; grade here only if none was passed
+    if is_submitted and verdict is None:
+        verdict = grade_quiz([question], user_responses or {})["verdicts"][q_id]
+    
     st.markdown(f"<div class='quiz-question'>", unsafe_allow_html=True)
     st.markdown(f"**{question['question']}**", unsafe_allow_html=True)
     
     # Free response questions
     if q_type == "free_response":
         if not is_submitted:
-            # Use a unique key for each input
-            input_key = f"input_{q_id}_{id(question)}"
+            # Widget keys depend only on the question id so they survive reruns
+            input_key = f"input_{q_id}"
             user_answer = st.text_input(
                 "Your answer:", 
                 key=input_key,
@@ -317,19 +283,22 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
             if user_responses is not None:
                 user_responses[q_id] = user_answer
         else:
-            user_answer = user_responses.get(q_id, "")
-            expected = question["answer"]
-            is_correct = user_answer.lower().strip() == expected.lower().strip()
+            user_answer = verdict["response"]
+            expected = verdict["expected"]
+            is_correct = verdict["correct"]
             
             st.text_input(
                 "Your answer:", 
                 value=user_answer,
-                key=f"result_{q_id}_{id(question)}",
+                key=f"result_{q_id}",
                 disabled=True,
             )
             
             if is_correct:
                 st.markdown(f"<span style='color: green; font-weight: bold;'>✓ Correct!</span>", unsafe_allow_html=True)
+            elif verdict["credit"]:
+                st.markdown(f"<span style='color: orange; font-weight: bold;'>◐ Partially correct.</span>", unsafe_allow_html=True)
+                st.markdown(f"**Expected answer:** {expected}", unsafe_allow_html=True)
             else:
                 st.markdown(f"<span style='color: red; font-weight: bold;'>✗ Incorrect.</span>", unsafe_allow_html=True)
                 st.markdown(f"**Expected answer:** {expected}", unsafe_allow_html=True)
@@ -340,15 +309,15 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
             selected = st.radio(
                 "Select your answer:",
                 question["options"],
-                key=f"input_{q_id}_{id(question)}",
+                key=f"input_{q_id}",
                 index=None,
             )
             if user_responses is not None and selected is not None:
                 user_responses[q_id] = selected
         else:
-            user_answer = user_responses.get(q_id, "")
-            expected = question["answer"]
-            is_correct = user_answer == expected
+            user_answer = verdict["response"]
+            expected = verdict["expected"]
+            is_correct = verdict["correct"]
             
             options = question["options"]
             selected_idx = options.index(user_answer) if user_answer in options else None
@@ -356,7 +325,7 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
             st.radio(
                 "Select your answer:",
                 options,
-                key=f"result_{q_id}_{id(question)}",
+                key=f"result_{q_id}",
                 index=selected_idx,
                 disabled=True,
             )
@@ -388,7 +357,7 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
                     selected = st.selectbox(
                         f"Match for {item}",
                         matches,
-                        key=f"input_{q_id}_{i}_{id(question)}",
+                        key=f"input_{q_id}_{i}",
                     )
                     
                     # Store the answer
@@ -397,17 +366,15 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
                             user_responses[q_id] = {}
                         user_responses[q_id][item] = selected
         else:
-            correct_count = 0
-            total_pairs = len(pairs)
+            correct_count = verdict["correct_count"]
+            total_pairs = verdict["total_pairs"]
             
-            for pair in pairs:
+            for pair in verdict["pairs"]:
                 item = pair["item"]
-                expected = pair["match"]
-                user_match = user_responses.get(q_id, {}).get(item, "")
-                is_correct = user_match == expected
+                expected = pair["expected"]
+                user_match = pair["response"]
                 
-                if is_correct:
-                    correct_count += 1
+                if pair["correct"]:
                     st.markdown(f"**{item}** → {user_match} <span style='color: green; font-weight: bold;'>✓</span>", unsafe_allow_html=True)
                 else:
                     st.markdown(f"**{item}** → {user_match} <span style='color: red; font-weight: bold;'>✗</span>", unsafe_allow_html=True)
@@ -431,25 +398,28 @@ def render_quiz_question(question, is_submitted=False, user_responses=None):
         if not is_submitted:
             user_answer = st.text_input(
                 "Your identification:", 
-                key=f"input_{q_id}_{id(question)}",
+                key=f"input_{q_id}",
                 value=user_responses.get(q_id, "") if user_responses else "",
             )
             if user_responses is not None:
                 user_responses[q_id] = user_answer
         else:
-            user_answer = user_responses.get(q_id, "")
-            expected = question["answer"]
-            is_correct = user_answer.lower().strip() == expected.lower().strip()
+            user_answer = verdict["response"]
+            expected = verdict["expected"]
+            is_correct = verdict["correct"]
             
             st.text_input(
                 "Your identification:", 
                 value=user_answer,
-                key=f"result_{q_id}_{id(question)}",
+                key=f"result_{q_id}",
                 disabled=True,
             )
             
             if is_correct:
                 st.markdown(f"<span style='color: green; font-weight: bold;'>✓ Correct!</span>", unsafe_allow_html=True)
+            elif verdict["credit"]:
+                st.markdown(f"<span style='color: orange; font-weight: bold;'>◐ Partially correct.</span>", unsafe_allow_html=True)
+                st.markdown(f"**Expected answer:** {expected}", unsafe_allow_html=True)
             else:
                 st.markdown(f"<span style='color: red; font-weight: bold;'>✗ Incorrect.</span>", unsafe_allow_html=True)
                 st.markdown(f"**Expected answer:** {expected}", unsafe_allow_html=True)
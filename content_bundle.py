@@ -0,0 +1,182 @@
+"""
+Compiled content bundle for the study pages.
+
+The build step (`python content_bundle.py`, run from the render build command
+and setup_app.py) reads every data/knowledge/*.html page once and writes a
+single versioned file holding the raw HTML (also split at <h2> headings), the
+plain-text extraction, the heading outline, the search index and content
+hashes. The app loads it once per process through get_bundle() instead of
+reading the HTML on every rerun, and recompiles it in memory when a page
+changes.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+from datetime import datetime
+
+from search_utils import INDEX_FORMAT_VERSION, KNOWLEDGE_DIR, html_to_text, index_content
+
+logger = logging.getLogger('content_bundle')
+
+# Bump whenever the bundle layout changes so stale bundles are rebuilt
+BUNDLE_FORMAT_VERSION = 2
+DEFAULT_BUNDLE_PATH = os.path.join("data", "content_bundle.pkl")
+
+HEADING_RE = re.compile(r'(?is)<h([1-6])\b[^>]*>(.*?)</h\1>')
+H2_RE = re.compile(r'(?is)<h2\b[^>]*>(.*?)</h2>')
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def heading_outline(content):
+    """Return the page headings in order as {"level", "title"} dicts"""
+    return [
+        {"level": int(level), "title": html_to_text(title).replace('\n', ' ')}
+        for level, title in HEADING_RE.findall(content)
+    ]
+
+
+def split_sections(content):
+    """
+    Split a page at its <h2> headings
+
+    Returns the HTML before the first <h2> and a list of {"title", "html"}
+    parts, where html is everything under that heading up to the next one.
+    """
+    matches = list(H2_RE.finditer(content))
+    intro = content[:matches[0].start()] if matches else content
+    parts = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        parts.append({
+            "title": html_to_text(match.group(1)).replace('\n', ' '),
+            "html": content[match.end():end].strip()
+        })
+    return intro.strip(), parts
+
+
+def source_files(knowledge_dir=KNOWLEDGE_DIR):
+    """Map each section name to its HTML file's (mtime_ns, size)"""
+    sources = {}
+    for filename in sorted(os.listdir(knowledge_dir)):
+        if filename.endswith('.html'):
+            stat = os.stat(os.path.join(knowledge_dir, filename))
+            sources[filename[:-len('.html')]] = (stat.st_mtime_ns, stat.st_size)
+    return sources
+
+
+def build_bundle(knowledge_dir=KNOWLEDGE_DIR):
+    """Compile every knowledge page into a bundle dict"""
+    sections = {}
+    for section in source_files(knowledge_dir):
+        with open(os.path.join(knowledge_dir, f'{section}.html'), 'rb') as file:
+            raw = file.read()
+        content = raw.decode('utf-8')
+        intro, parts = split_sections(content)
+        sections[section] = {
+            "html": content,
+            "intro": intro,
+            "parts": parts,
+            "text": html_to_text(content),
+            "outline": heading_outline(content),
+            "sha256": hashlib.sha256(raw).hexdigest()
+        }
+
+    index = index_content({section: data["text"] for section, data in sections.items()})
+    return {
+        "version": BUNDLE_FORMAT_VERSION,
+        "built_at": datetime.now().isoformat(),
+        "content_hash": index["content_hash"],
+        "sources": source_files(knowledge_dir),
+        "sections": sections,
+        "index": index
+    }
+
+
+def save_bundle(bundle, path=DEFAULT_BUNDLE_PATH):
+    """Write a bundle to disk atomically"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_bundle(path=DEFAULT_BUNDLE_PATH):
+    """Load a bundle from disk, or return None if it is missing or outdated"""
+    try:
+        with open(path, 'rb') as f:
+            bundle = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    if not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_FORMAT_VERSION:
+        return None
+    if bundle["index"].get("version") != INDEX_FORMAT_VERSION:
+        return None
+    return bundle
+
+
+def bundle_is_current(bundle, knowledge_dir=KNOWLEDGE_DIR, sources=None):
+    """Check that a bundle was compiled from the current knowledge pages"""
+    if sources is None:
+        sources = source_files(knowledge_dir)
+    if sources == bundle["sources"]:
+        return True
+    if set(sources) != set(bundle["sections"]):
+        return False
+    # Timestamps change when files are copied; fall back to comparing content
+    for section, data in bundle["sections"].items():
+        with open(os.path.join(knowledge_dir, f'{section}.html'), 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() != data["sha256"]:
+                return False
+    return True
+
+
+def get_bundle(knowledge_dir=KNOWLEDGE_DIR, path=DEFAULT_BUNDLE_PATH):
+    """
+    Return the process-wide content bundle, loading it on first use
+
+    Every call stats the knowledge pages (no reads) and compares them with
+    the sources the bundle was built from. A missing or stale bundle, for
+    example after editing a page, is replaced by one compiled in memory,
+    so edits appear without a restart and outdated content is never served.
+    """
+    global _bundle
+    with _bundle_lock:
+        sources = source_files(knowledge_dir)
+        if _bundle is not None and _bundle["sources"] == sources:
+            return _bundle
+
+        bundle = _bundle if _bundle is not None else load_bundle(path)
+        if bundle is None or not bundle_is_current(bundle, knowledge_dir, sources):
+            logger.warning(f"Content bundle {path} missing or stale; compiling from {knowledge_dir}")
+            bundle = build_bundle(knowledge_dir)
+        # Remember the current timestamps so unchanged files are not hashed again
+        bundle["sources"] = sources
+        _bundle = bundle
+        return _bundle
+
+
+def reset_bundle():
+    """Forget the loaded bundle so the next get_bundle() reloads it"""
+    global _bundle
+    with _bundle_lock:
+        _bundle = None
+
+
+def main():
+    """Build the content bundle and write it to disk"""
+    bundle = build_bundle()
+    save_bundle(bundle)
+    print(f"Bundled {len(bundle['sections'])} sections, {len(bundle['index']['postings'])} terms "
+          f"({bundle['content_hash'][:12]}) -> {DEFAULT_BUNDLE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
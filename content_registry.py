@@ -0,0 +1,133 @@
+"""
+Process-wide registry of study content.
+
+Study pages come from the compiled content bundle. Everything else about a
+system (its title, histology slides and their features, and the interactive
+diagram structures) comes from data/content_manifest.json, so adding a system
+means adding a manifest entry and a knowledge page, not editing code. Both are
+loaded once and then served from memory to every session through indexes; each
+lookup only stats the source files, and a changed mtime or size reloads them so
+content edits show up without restarting the app.
+"""
+import json
+import logging
+import os
+import threading
+
+from content_bundle import get_bundle
+
+logger = logging.getLogger('content_registry')
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "content_manifest.json")
+
+_files = {}
+_files_lock = threading.Lock()
+_search_data = None
+
+
+def load_file_cached(path, loader):
+    """
+    Return loader(path), reusing the previous result while the file is unchanged
+
+    The file is identified by its mtime and size, so a save that rewrites it
+    is picked up on the next call.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _files_lock:
+        entry = _files.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        value = loader(path)
+        if entry is not None:
+            logger.info(f"Reloaded {path} after it changed")
+        _files[path] = (stamp, value)
+        return value
+
+
+def clear_registry():
+    """Forget every loaded file so the next lookup reads it again"""
+    global _search_data
+    with _files_lock:
+        _files.clear()
+        _search_data = None
+
+
+def load_manifest(path):
+    """Read the content manifest and index systems, slides and diagram structures"""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    systems = manifest["systems"]
+    return {
+        "system_ids": [system["id"] for system in systems],
+        "systems": {system["id"]: system for system in systems},
+        "systems_by_title": {system["title"]: system for system in systems},
+        "slides": {system["id"]: system.get("histology", []) for system in systems},
+        "slides_by_name": {
+            (system["id"], slide["name"]): slide
+            for system in systems for slide in system.get("histology", [])
+        },
+        "diagrams": {system["id"]: system["diagram"] for system in systems if system.get("diagram")}
+    }
+
+
+def get_manifest(path=MANIFEST_PATH):
+    """Return the indexed content manifest"""
+    return load_file_cached(path, load_manifest)
+
+
+def get_system_ids(path=MANIFEST_PATH):
+    """Return the ids of every system, in manifest order"""
+    return get_manifest(path)["system_ids"]
+
+
+def get_system(system_id, path=MANIFEST_PATH):
+    """Return a system's manifest entry, or None"""
+    return get_manifest(path)["systems"].get(system_id)
+
+
+def get_system_by_title(title, path=MANIFEST_PATH):
+    """Return the system whose navigation title matches, or None"""
+    return get_manifest(path)["systems_by_title"].get(title)
+
+
+def get_diagram(system_id, path=MANIFEST_PATH):
+    """Return the interactive diagram of a system (name, title, label, structures), or None"""
+    return get_manifest(path)["diagrams"].get(system_id)
+
+
+def get_study_page(section):
+    """Return the bundled page for a section (html, intro, parts, text, outline), or None"""
+    return get_bundle()["sections"].get(section)
+
+
+def get_search_data():
+    """Return (content_dict, index) for search, rebuilt only when the bundle changes"""
+    global _search_data
+    bundle = get_bundle()
+    data = _search_data
+    if data is None or data[0] != bundle["content_hash"]:
+        content_dict = {section: page["text"] for section, page in bundle["sections"].items()}
+        data = (bundle["content_hash"], content_dict, bundle["index"])
+        _search_data = data
+    return data[1], data[2]
+
+
+def get_histology_slides(system, path=MANIFEST_PATH):
+    """Return the histology slides listed for a system"""
+    return get_manifest(path)["slides"].get(system, [])
+
+
+def get_histological_features(system, image_name, path=MANIFEST_PATH):
+    """
+    Returns key histological features for a given system and image
+    
+    Args:
+        system: Anatomical system name
+        image_name: Name of the histology image
+        
+    Returns:
+        Dictionary of feature names and descriptions
+    """
+    slide = get_manifest(path)["slides_by_name"].get((system, image_name))
+    return slide.get("features", {}) if slide else {}
@@ -0,0 +1,340 @@
+"""
+Quiz grading, independent of Streamlit.
+
+grade_quiz() grades a whole submission once: questions are grouped by type
+and each group goes through that type's grader in a single call. The
+result holds the score and one verdict per question, which the results
+view renders instead of re-deciding correctness, so a submission can also
+be graded headless (see benchmarks/grading_throughput.py).
+
+Typed answers (free response and identification) are compared as word
+sets rather than strings. Each expected answer is preprocessed once into
+an AnswerKey: lowercased words without punctuation, plurals folded,
+synonyms from data/answer_synonyms.json mapped to one spelling, filler
+words dropped, plus the number of typos tolerated in each word. A
+response only goes through the same cheap normalization, with misspelled
+synonyms folded too, and a word-overlap F1 against its key, so "the white
+pulp" matches "White pulp" without per-submission string search.
+"""
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+
+from content_registry import load_file_cached
+
+logger = logging.getLogger('grading')
+
+SYNONYMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "answer_synonyms.json")
+
+# Typed answers at least this similar to the key get full credit
+ACCEPT_THRESHOLD = float(os.environ.get("GRADING_ACCEPT_THRESHOLD", "0.9"))
+# Typed answers at least this similar get PARTIAL_CREDIT
+PARTIAL_THRESHOLD = float(os.environ.get("GRADING_PARTIAL_THRESHOLD", "0.6"))
+PARTIAL_CREDIT = float(os.environ.get("GRADING_PARTIAL_CREDIT", "0.5"))
+
+# Misspelled words of at least this length match within one edit, and within
+# two from WORD_LONG_LENGTH; the first letter must agree, since a different
+# prefix usually names a different structure (afferent/efferent)
+WORD_MIN_FUZZY_LENGTH = 4
+WORD_LONG_LENGTH = 12
+
+# Keys of at most this many words are all-or-nothing: the missing word is
+# what tells the answer apart (Type I vs Type II pneumocyte); 0 turns this off
+SHORT_ANSWER_TOKENS = int(os.environ.get("GRADING_SHORT_ANSWER_TOKENS", "3"))
+
+APOSTROPHE_RE = re.compile(r"['\u2019]")
+SEPARATOR_RE = re.compile(r'\W+')
+
+# Filler words that do not change the meaning of a short answer
+ANSWER_STOPWORDS = frozenset("a an and are by for in is it its of or the their this to with".split())
+
+
+def singular(word):
+    """Fold a regular plural to its singular form"""
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def allowed_edits(word):
+    """Return how many typos a key word tolerates"""
+    if len(word) < WORD_MIN_FUZZY_LENGTH:
+        return 0
+    return 2 if len(word) >= WORD_LONG_LENGTH else 1
+
+
+def within_edits(word, other, limit):
+    """Check whether two words are at most limit edits apart (a transposition counts as one)"""
+    if abs(len(word) - len(other)) > limit:
+        return False
+    previous2 = None
+    previous = list(range(len(other) + 1))
+    for i in range(1, len(word) + 1):
+        current = [i] + [0] * len(other)
+        for j in range(1, len(other) + 1):
+            cost = word[i - 1] != other[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and word[i - 1] == other[j - 2] and word[i - 2] == other[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+
+def is_typo_of(word, key_word):
+    """Check whether word is a tolerated misspelling of key_word"""
+    if word[0] != key_word[0]:
+        return False
+    limit = allowed_edits(key_word)
+    return bool(limit) and within_edits(key_word, word, limit)
+
+
+def answer_words(text):
+    """Lowercase text and split it into singular words without punctuation"""
+    text = APOSTROPHE_RE.sub('', (text or '').lower())
+    return [singular(word) for word in SEPARATOR_RE.split(text) if word]
+
+
+class AnswerKey:
+    """An expected answer preprocessed for similarity grading"""
+
+    __slots__ = ("tokens", "token_set", "edits")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.token_set = frozenset(tokens)
+        self.edits = {token: allowed_edits(token) for token in self.token_set if allowed_edits(token)}
+
+
+class AnswerSynonyms:
+    """Synonym phrases mapped to one canonical spelling, with a cache of answer keys"""
+
+    def __init__(self, groups):
+        """groups is a list of equivalent phrases; the first one is canonical"""
+        self.phrases = {}
+        # Phrase lengths to try, longest first, for each word that starts a phrase
+        self.lengths = {}
+        for group in groups:
+            canonical = tuple(answer_words(group[0]))
+            for phrase in group:
+                words = tuple(answer_words(phrase))
+                self.phrases[words] = canonical
+                self.lengths.setdefault(words[0], set()).add(len(words))
+        self.lengths = {word: sorted(lengths, reverse=True) for word, lengths in self.lengths.items()}
+        # Phrases, longest first, by the first letter and the lengths a
+        # misspelling of their first word can have
+        self.misspellings = {}
+        for words in sorted(self.phrases, key=len, reverse=True):
+            first = words[0]
+            limit = allowed_edits(first)
+            for length in range(len(first) - limit, len(first) + limit + 1):
+                self.misspellings.setdefault((first[0], length), []).append(words)
+        self.keys = {}
+
+    def misspelled_phrase(self, words):
+        """Return the synonym phrase that words starts with, allowing typos, or None"""
+        for phrase in self.misspellings.get((words[0][0], len(words[0])), ()):
+            if len(phrase) <= len(words) and all(
+                    word == expected or is_typo_of(word, expected)
+                    for word, expected in zip(words, phrase)):
+                return phrase
+        return None
+
+    def canonicalize(self, words, fuzzy=False):
+        """
+        Replace synonym phrases in a word list, longest phrase first
+
+        With fuzzy, a phrase spelled within the allowed typos is replaced
+        too, so a misspelled synonym reaches the key's canonical spelling.
+        """
+        result = []
+        i = 0
+        while i < len(words):
+            for length in self.lengths.get(words[i], ()):
+                canonical = self.phrases.get(tuple(words[i:i + length]))
+                if canonical is not None:
+                    result.extend(canonical)
+                    i += length
+                    break
+            else:
+                fuzzy_word = fuzzy and words[i] not in ANSWER_STOPWORDS
+                phrase = self.misspelled_phrase(words[i:]) if fuzzy_word else None
+                if phrase is not None:
+                    result.extend(self.phrases[phrase])
+                    i += len(phrase)
+                else:
+                    result.append(words[i])
+                    i += 1
+        return result
+
+    def tokens(self, text, fuzzy=False):
+        """Normalize a typed answer into the tokens that are compared"""
+        words = self.canonicalize(answer_words(text), fuzzy)
+        return tuple(word for word in words if word not in ANSWER_STOPWORDS)
+
+    def answer_key(self, answer):
+        """Return the preprocessed key for an expected answer, building it once"""
+        key = self.keys.get(answer)
+        if key is None:
+            key = self.keys[answer] = AnswerKey(self.tokens(answer))
+        return key
+
+
+# Used when the synonyms file is missing; still caches answer keys
+_no_synonyms = AnswerSynonyms([])
+
+
+def load_synonyms(path):
+    """Read the answer synonym groups"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return AnswerSynonyms(json.load(f)["groups"])
+
+
+def get_answer_synonyms(path=SYNONYMS_PATH):
+    """Return the process-wide synonyms and answer keys, reloading them if the file changed"""
+    if not os.path.exists(path):
+        logger.warning(f"Answer synonyms {path} not found; grading without synonyms")
+        return _no_synonyms
+    return load_file_cached(path, load_synonyms)
+
+
+def answer_similarity(key, tokens):
+    """
+    Return the word-overlap F1 between an answer key and response tokens
+
+    A key word missing from the response may be matched by a response word
+    with the same first letter within the key word's allowed typos; short
+    words must match exactly.
+    """
+    if not key.tokens or not tokens:
+        return 1.0 if key.tokens == tokens else 0.0
+    response = set(tokens)
+    unmatched = [token for token in key.token_set if token not in response]
+    matched = len(key.token_set) - len(unmatched)
+    spare = response - key.token_set
+    for token in unmatched:
+        limit = key.edits.get(token)
+        if not limit:
+            continue
+        for candidate in spare:
+            if candidate[0] == token[0] and within_edits(token, candidate, limit):
+                spare.discard(candidate)
+                matched += 1
+                break
+    if not matched:
+        return 0.0
+    recall = matched / len(key.token_set)
+    precision = matched / len(response)
+    return 2 * recall * precision / (recall + precision)
+
+
+def answer_credit(similarity, key=None):
+    """Turn a similarity into full, partial or no credit"""
+    if similarity >= ACCEPT_THRESHOLD:
+        return 1
+    if key is not None and len(key.token_set) <= SHORT_ANSWER_TOKENS:
+        return 0
+    if similarity >= PARTIAL_THRESHOLD:
+        return PARTIAL_CREDIT
+    return 0
+
+
+def grade_text(questions, responses):
+    """Grade free-response and identification answers against their preprocessed keys"""
+    synonyms = get_answer_synonyms()
+    verdicts = []
+    for question, response in zip(questions, responses):
+        response = response or ""
+        key = synonyms.answer_key(question["answer"])
+        similarity = answer_similarity(key, synonyms.tokens(response))
+        if similarity < ACCEPT_THRESHOLD:
+            # Only answers that fall short pay for matching misspelled synonyms
+            similarity = max(similarity, answer_similarity(key, synonyms.tokens(response, fuzzy=True)))
+        credit = answer_credit(similarity, key)
+        verdicts.append({
+            "correct": credit == 1,
+            "credit": credit,
+            "similarity": similarity,
+            "response": response,
+            "expected": question["answer"]
+        })
+    return verdicts
+
+
+def grade_choice(questions, responses):
+    """Grade multiple-choice answers by exact option match"""
+    return [
+        {
+            "correct": response == question["answer"],
+            "credit": 1 if response == question["answer"] else 0,
+            "response": response,
+            "expected": question["answer"]
+        }
+        for question, response in zip(questions, responses)
+    ]
+
+
+def grade_matching(questions, responses):
+    """Grade matching questions pair by pair; only a fully correct set scores"""
+    verdicts = []
+    for question, response in zip(questions, responses):
+        response = response or {}
+        pairs = [
+            {
+                "item": pair["item"],
+                "expected": pair["match"],
+                "response": response.get(pair["item"], ""),
+                "correct": response.get(pair["item"], "") == pair["match"]
+            }
+            for pair in question["pairs"]
+        ]
+        correct_count = sum(1 for pair in pairs if pair["correct"])
+        correct = correct_count == len(pairs)
+        verdicts.append({
+            "correct": correct,
+            "credit": 1 if correct else 0,
+            "response": response,
+            "pairs": pairs,
+            "correct_count": correct_count,
+            "total_pairs": len(pairs)
+        })
+    return verdicts
+
+
+GRADERS = {
+    "free_response": grade_text,
+    "identification": grade_text,
+    "multiple_choice": grade_choice,
+    "matching": grade_matching
+}
+
+
+def grade_quiz(questions, responses):
+    """
+    Grade a quiz submission
+
+    responses maps question ids to the user's answers. Returns the score,
+    the total and a verdict per question id with "correct", "credit",
+    "response" and, depending on the type, "expected" or "pairs".
+    """
+    by_type = defaultdict(list)
+    for question in questions:
+        by_type[question.get("type", "free_response")].append(question)
+
+    verdicts = {}
+    for q_type, group in by_type.items():
+        grader = GRADERS.get(q_type)
+        if grader is None:
+            raise ValueError(f"Unknown question type: {q_type}")
+        results = grader(group, [responses.get(question["id"]) for question in group])
+        for question, verdict in zip(group, results):
+            verdicts[question["id"]] = verdict
+
+    return {
+        "score": sum(verdict["credit"] for verdict in verdicts.values()),
+        "total": len(questions),
+        "verdicts": verdicts
+    }
@@ -2,17 +2,16 @@ import os
 from PIL import Image, ImageDraw, ImageFont
 import streamlit as st
 from logging_config import configure_logging
+from content_registry import get_histology_slides, get_system_ids
 
 # Set up logging
 logger = configure_logging()('image_utils')
 
-# Define required image directories
+# Define required image directories, with one histology directory per system in the manifest
 REQUIRED_DIRECTORIES = [
     'static/images',
     'static/images/histology',
-    'static/images/histology/lymphatic',
-    'static/images/histology/respiratory',
-    'static/images/histology/digestive',
+    *[f'static/images/histology/{system}' for system in get_system_ids()],
     'static/images/diagrams',
     'data/knowledge',
     'data/user_progress'
@@ -122,14 +121,11 @@ def validate_image_resources():
     Validates that all required image resources are available or can be generated
     Returns a dictionary with validation results
     """
+    systems = get_system_ids()
     results = {
         "success": True,
         "directories_ok": False,
-        "histology_images": {
-            "lymphatic": [],
-            "respiratory": [],
-            "digestive": []
-        },
+        "histology_images": {system: [] for system in systems},
         "diagram_images": [],
         "errors": []
     }
@@ -145,20 +141,13 @@ def validate_image_resources():
         results["errors"].append(f"Directory validation error: {str(e)}")
     
     # Check for critical files and attempt to generate placeholders if needed
-    systems = ["lymphatic", "respiratory", "digestive"]
-    histology_images = {
-        "lymphatic": ["thymus", "lymph_node", "spleen"],
-        "respiratory": ["trachea", "lung"],
-        "digestive": ["esophagus_stomach", "small_intestine"]
-    }
-    
     try:
-        # Check histology images
+        # Check histology images listed in the content manifest
         for system in systems:
-            for image in histology_images.get(system, []):
-                img_path = get_image_path("histology", system, image)
+            for slide in get_histology_slides(system):
+                img_path = get_image_path("histology", system, slide["name"])
                 if os.path.exists(img_path):
-                    results["histology_images"][system].append(image)
+                    results["histology_images"][system].append(slide["name"])
     except Exception as e:
         results["success"] = False
         results["errors"].append(f"Histology image validation error: {str(e)}")
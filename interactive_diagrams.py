@@ -6,6 +6,7 @@ import io
 import os
 from PIL import Image
 from image_utils import get_image_path, ensure_directories_exist
+from content_registry import get_diagram, get_system_ids
 from logging_config import configure_logging
 
 # Set up logging
@@ -14,48 +15,29 @@ logger = configure_logging()('interactive_diagrams')
 # Ensure required directories exist at import time
 ensure_directories_exist()
 
+# Background for diagram base images and structures without a color
+DIAGRAM_BASE_COLOR = (240, 240, 240)
+
 def create_placeholder_images():
     """Create placeholder images if actual images aren't available"""
     placeholders_path = "static/images"
     os.makedirs(placeholders_path, exist_ok=True)
     
-    # Dictionary of diagrams and their components
-    diagrams = {
-        "lymph_node": ["base", "capsule", "cortex", "medulla", "germinal_center", "afferent_vessels", "efferent_vessel"],
-        "respiratory": ["base", "trachea", "bronchi", "bronchioles", "alveoli", "diaphragm"],
-        "digestive": ["base", "esophagus", "stomach", "small_intestine", "large_intestine", "liver", "pancreas", "gallbladder"]
-    }
-    
-    # Generate a simple colored rectangle for each placeholder
-    colors = {
-        "base": (240, 240, 240),
-        "capsule": (200, 200, 255),
-        "cortex": (255, 200, 200),
-        "medulla": (200, 255, 200),
-        "germinal_center": (255, 255, 200),
-        "afferent_vessels": (200, 255, 255),
-        "efferent_vessel": (255, 200, 255),
-        "trachea": (200, 200, 255),
-        "bronchi": (255, 200, 200),
-        "bronchioles": (200, 255, 200),
-        "alveoli": (255, 255, 200),
-        "diaphragm": (200, 255, 255),
-        "esophagus": (200, 200, 255),
-        "stomach": (255, 200, 200),
-        "small_intestine": (200, 255, 200),
-        "large_intestine": (255, 255, 200),
-        "liver": (200, 255, 255),
-        "pancreas": (255, 200, 255),
-        "gallbladder": (255, 255, 200)
-    }
-    
-    # Create placeholders for each diagram
-    for diagram, parts in diagrams.items():
-        for part in parts:
+    # Create placeholders for the base and every structure of each manifest diagram
+    for system in get_system_ids():
+        diagram_info = get_diagram(system)
+        if not diagram_info:
+            continue
+        diagram = diagram_info["name"]
+        parts = [("base", DIAGRAM_BASE_COLOR)] + [
+            (structure["name"], tuple(structure.get("color", DIAGRAM_BASE_COLOR)))
+            for structure in diagram_info["structures"]
+        ]
+        for part, color in parts:
             img_path = f"{placeholders_path}/{diagram}_{part}.png"
             if not os.path.exists(img_path):
                 # Create a colored image as placeholder
-                img = Image.new('RGB', (400, 300), colors.get(part, (240, 240, 240)))
+                img = Image.new('RGB', (400, 300), color)
                 
                 # Add text indicating this is a placeholder
                 from PIL import ImageDraw, ImageFont
@@ -100,17 +82,21 @@ def get_diagram_image_path(diagram_type, structure):
         # Return a fallback path
         return os.path.join("static", "images", f"{diagram_type}_base.png")
 
-def lymph_node_interactive():
-    """Create an interactive lymph node diagram"""
-    st.subheader("Lymph Node Structure")
+def system_diagram_interactive(system):
+    """Create the interactive diagram for a system from its manifest entry"""
+    diagram_info = get_diagram(system)
+    diagram = diagram_info["name"]
+    st.subheader(diagram_info["title"])
     
     # Load base image with error handling
     try:
-        base_img_path = get_diagram_image_path("lymph_node", "base")
+        base_img_path = get_diagram_image_path(diagram, "base")
     except Exception as e:
-        logger.error(f"Error loading base lymph node image: {str(e)}")
-        st.error("Could not load lymph node diagram. Using placeholder instead.")
-        base_img_path = os.path.join("static", "images", "lymph_node_base.png")
+        logger.error(f"Error loading base {diagram} image: {str(e)}")
+        st.error(f"Could not load {diagram_info['label'].lower()} diagram. Using placeholder instead.")
+        base_img_path = os.path.join("static", "images", f"{diagram}_base.png")
+    
+    structures = {structure["name"]: structure for structure in diagram_info["structures"]}
     
     # Create clickable areas
     col1, col2 = st.columns([3, 1])
@@ -121,127 +107,36 @@ def lymph_node_interactive():
         st.session_state.current_structure = None
     
     with col1:
-        if st.session_state.current_highlight and st.session_state.current_structure and st.session_state.current_structure.startswith("lymph_node"):
-            st.image(st.session_state.current_highlight, caption=f"Lymph Node - {st.session_state.current_structure.split('_')[-1].title()}", use_column_width=True)
+        current = st.session_state.current_structure
+        if st.session_state.current_highlight and current and current.startswith(f"{diagram}_"):
+            structure = structures.get(current[len(diagram) + 1:])
+            label = structure["label"] if structure else current.split('_')[-1].title()
+            st.image(st.session_state.current_highlight, caption=f"{diagram_info['label']} - {label}", use_column_width=True)
         else:
-            st.image(base_img_path, caption="Lymph Node Structure", use_column_width=True)
+            st.image(base_img_path, caption=diagram_info["title"], use_column_width=True)
     
     with col2:
         st.write("Click to highlight:")
         
-        if st.button("Capsule", key="ln_capsule"):
-            highlight_structure("lymph_node", "capsule")
-            
-        if st.button("Cortex", key="ln_cortex"):
-            highlight_structure("lymph_node", "cortex")
-            
-        if st.button("Medulla", key="ln_medulla"):
-            highlight_structure("lymph_node", "medulla")
+        for structure in diagram_info["structures"]:
+            if st.button(structure["label"], key=f"{diagram}_{structure['name']}"):
+                highlight_structure(diagram, structure["name"])
             
-        if st.button("Germinal Center", key="ln_germinal"):
-            highlight_structure("lymph_node", "germinal_center")
-            
-        if st.button("Afferent Vessels", key="ln_afferent"):
-            highlight_structure("lymph_node", "afferent_vessels")
-            
-        if st.button("Efferent Vessel", key="ln_efferent"):
-            highlight_structure("lymph_node", "efferent_vessel")
-            
-        if st.button("Reset View", key="ln_reset"):
+        if st.button("Reset View", key=f"{diagram}_reset"):
             st.session_state.current_highlight = None
             st.session_state.current_structure = None
 
+def lymph_node_interactive():
+    """Create an interactive lymph node diagram"""
+    system_diagram_interactive("lymphatic")
+
 def respiratory_system_interactive():
     """Create an interactive respiratory system diagram"""
-    st.subheader("Respiratory System Structure")
-    
-    # Load base image with error handling
-    try:
-        base_img_path = get_diagram_image_path("respiratory", "base")
-    except Exception as e:
-        logger.error(f"Error loading base respiratory image: {str(e)}")
-        st.error("Could not load respiratory diagram. Using placeholder instead.")
-        base_img_path = os.path.join("static", "images", "respiratory_base.png")
-    
-    # Create clickable areas
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        if st.session_state.current_highlight and st.session_state.current_structure and st.session_state.current_structure.startswith("respiratory"):
-            st.image(st.session_state.current_highlight, caption=f"Respiratory System - {st.session_state.current_structure.split('_')[-1].title()}", use_column_width=True)
-        else:
-            st.image(base_img_path, caption="Respiratory System", use_column_width=True)
-    
-    with col2:
-        st.write("Click to highlight:")
-        
-        if st.button("Trachea", key="rs_trachea"):
-            highlight_structure("respiratory", "trachea")
-            
-        if st.button("Bronchi", key="rs_bronchi"):
-            highlight_structure("respiratory", "bronchi")
-            
-        if st.button("Bronchioles", key="rs_bronchioles"):
-            highlight_structure("respiratory", "bronchioles")
-            
-        if st.button("Alveoli", key="rs_alveoli"):
-            highlight_structure("respiratory", "alveoli")
-            
-        if st.button("Diaphragm", key="rs_diaphragm"):
-            highlight_structure("respiratory", "diaphragm")
-            
-        if st.button("Reset View", key="rs_reset"):
-            st.session_state.current_highlight = None
-            st.session_state.current_structure = None
+    system_diagram_interactive("respiratory")
 
 def digestive_system_interactive():
     """Create an interactive digestive system diagram"""
-    st.subheader("Digestive System Structure")
-    
-    # Load base image with error handling
-    try:
-        base_img_path = get_diagram_image_path("digestive", "base")
-    except Exception as e:
-        logger.error(f"Error loading base digestive image: {str(e)}")
-        st.error("Could not load digestive diagram. Using placeholder instead.")
-        base_img_path = os.path.join("static", "images", "digestive_base.png")
-    
-    # Create clickable areas
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        if st.session_state.current_highlight and st.session_state.current_structure and st.session_state.current_structure.startswith("digestive"):
-            st.image(st.session_state.current_highlight, caption=f"Digestive System - {st.session_state.current_structure.split('_')[-1].title()}", use_column_width=True)
-        else:
-            st.image(base_img_path, caption="Digestive System", use_column_width=True)
-    
-    with col2:
-        st.write("Click to highlight:")
-        
-        if st.button("Esophagus", key="ds_esophagus"):
-            highlight_structure("digestive", "esophagus")
-            
-        if st.button("Stomach", key="ds_stomach"):
-            highlight_structure("digestive", "stomach")
-            
-        if st.button("Small Intestine", key="ds_small"):
-            highlight_structure("digestive", "small_intestine")
-            
-        if st.button("Large Intestine", key="ds_large"):
-            highlight_structure("digestive", "large_intestine")
-            
-        if st.button("Liver", key="ds_liver"):
-            highlight_structure("digestive", "liver")
-            
-        if st.button("Pancreas", key="ds_pancreas"):
-            highlight_structure("digestive", "pancreas")
-            
-        if st.button("Gallbladder", key="ds_gallbladder"):
-            highlight_structure("digestive", "gallbladder")
-            
-        if st.button("Reset View", key="ds_reset"):
-            st.session_state.current_highlight = None
-            st.session_state.current_structure = None
+    system_diagram_interactive("digestive")
 
 def highlight_structure(diagram_type, structure):
     """Highlight a specific structure in a diagram with error handling"""
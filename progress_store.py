@@ -0,0 +1,988 @@
+"""
+Storage backends for user progress tracking.
+
+user_progress never touches files directly; it goes through the store returned
+by get_progress_store(). Progress changes are expressed as small events
+("view" and "quiz") so that row-oriented backends can persist them as
+single-row inserts instead of rewriting the whole progress document.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows has no advisory file locks; fall back to in-process locking
+    fcntl = None
+
+logger = logging.getLogger('progress_store')
+
+DEFAULT_PROGRESS_DIR = os.path.join("data", "user_progress")
+DEFAULT_DB_PATH = os.path.join(DEFAULT_PROGRESS_DIR, "progress.db")
+
+# Number of recent quizzes per category used to compute mastery
+MASTERY_WINDOW = 5
+MASTERY_MIN_QUIZZES = 3
+
+
+class ProgressConflictError(Exception):
+    """Raised when saving a progress document that changed since it was loaded"""
+
+
+def make_view_event(section, timestamp=None):
+    """Create an event recording that a section was viewed"""
+    return {
+        "type": "view",
+        "section": section,
+        "timestamp": timestamp or datetime.now().isoformat()
+    }
+
+
+def make_quiz_event(quiz_entry):
+    """Create an event recording a completed quiz"""
+    return {"type": "quiz", "entry": quiz_entry}
+
+
+def new_quiz_aggregate():
+    """Create an empty per-category quiz aggregate"""
+    return {
+        "recent": [],        # score ratios of the last MASTERY_WINDOW quizzes, oldest first
+        "count": 0,
+        "score_sum": 0,
+        "total_sum": 0,
+        "by_difficulty": {}
+    }
+
+
+def update_quiz_aggregate(aggregate, entry):
+    """Fold one quiz entry into a category aggregate in constant time"""
+    recent = aggregate["recent"]
+    recent.append(entry["score"] / entry["total"] if entry["total"] else 0.0)
+    if len(recent) > MASTERY_WINDOW:
+        del recent[0]
+    aggregate["count"] += 1
+    aggregate["score_sum"] += entry["score"]
+    aggregate["total_sum"] += entry["total"]
+    difficulty = entry.get("difficulty") or "unknown"
+    aggregate["by_difficulty"][difficulty] = aggregate["by_difficulty"].get(difficulty, 0) + 1
+    return aggregate
+
+
+def build_quiz_aggregates(quiz_history):
+    """Build per-category aggregates from a full quiz history"""
+    aggregates = {}
+    for entry in quiz_history:
+        if entry["category"] not in aggregates:
+            aggregates[entry["category"]] = new_quiz_aggregate()
+        update_quiz_aggregate(aggregates[entry["category"]], entry)
+    return aggregates
+
+
+def ensure_quiz_aggregates(progress):
+    """
+    Return the document's quiz aggregates, building them for older documents
+
+    Documents saved before aggregates existed only have quiz_history; the
+    aggregates are rebuilt from it once and kept on the document.
+    """
+    if "quiz_aggregates" not in progress:
+        progress["quiz_aggregates"] = build_quiz_aggregates(progress.get("quiz_history", []))
+    return progress["quiz_aggregates"]
+
+
+def mastery_level(recent_scores):
+    """
+    Compute a mastery level from the score ratios of the most recent quizzes
+
+    Returns None when there are too few quizzes to judge.
+    """
+    if len(recent_scores) < MASTERY_MIN_QUIZZES:
+        return None
+
+    avg_score = sum(recent_scores) / len(recent_scores)
+    if avg_score > 0.9:
+        return 3  # Expert
+    elif avg_score > 0.7:
+        return 2  # Intermediate
+    return 1  # Beginner
+
+
+def apply_event(progress, event):
+    """Apply a progress event to an in-memory progress document"""
+    if event["type"] == "view":
+        section = event["section"]
+        progress["viewed_sections"].setdefault(section, []).append(event["timestamp"])
+    elif event["type"] == "quiz":
+        entry = event["entry"]
+        category = entry["category"]
+        aggregates = ensure_quiz_aggregates(progress)
+        progress["quiz_history"].append(entry)
+
+        # Update mastery level based on recent quiz performance
+        if category not in aggregates:
+            aggregates[category] = new_quiz_aggregate()
+        level = mastery_level(update_quiz_aggregate(aggregates[category], entry)["recent"])
+        if level is not None:
+            progress["mastery_levels"][category] = level
+    else:
+        raise ValueError(f"Unknown progress event type: {event['type']}")
+    return progress
+
+
+class JSONProgressStore:
+    """
+    Stores each user's progress as a JSON document in data/user_progress
+
+    Events are appended to a per-user journal ({user_id}.events.jsonl), one
+    line per event, so recording a view or quiz never rewrites the snapshot.
+    Loading replays the journal over the snapshot, and compaction folds the
+    journal back into the snapshot.
+
+    Every read and write holds a per-user advisory lock ({user_id}.lock), so
+    several worker processes can share the directory. Snapshots are written
+    to a temporary file and renamed into place, so readers never see a
+    partially written document.
+    """
+
+    def __init__(self, directory=DEFAULT_PROGRESS_DIR):
+        self.directory = directory
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path_for(self, user_id):
+        return os.path.join(self.directory, f"{user_id}.json")
+
+    def journal_path_for(self, user_id):
+        return os.path.join(self.directory, f"{user_id}.events.jsonl")
+
+    def lock_path_for(self, user_id):
+        return os.path.join(self.directory, f"{user_id}.lock")
+
+    def _lock_for(self, user_id):
+        with self._locks_guard:
+            if user_id not in self._locks:
+                self._locks[user_id] = threading.Lock()
+            return self._locks[user_id]
+
+    @contextmanager
+    def _locked(self, user_id, shared=False):
+        """Hold the user's lock, both within this process and across processes"""
+        with self._lock_for(user_id):
+            if fcntl is None:
+                yield
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.lock_path_for(user_id), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_snapshot(self, user_id):
+        try:
+            with open(self.path_for(user_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _read_journal(self, user_id):
+        try:
+            with open(self.journal_path_for(user_id), "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                # A torn line from an interrupted append; skip it
+                continue
+        return events
+
+    def _write_snapshot(self, user_id, progress):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{user_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(progress, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path_for(user_id))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _remove_journal(self, user_id):
+        try:
+            os.remove(self.journal_path_for(user_id))
+        except FileNotFoundError:
+            pass
+
+    def _replay(self, user_id):
+        """Read the snapshot and apply the journal; the version counts both"""
+        progress = self._read_snapshot(user_id)
+        if progress is None:
+            return None
+        events = self._read_journal(user_id)
+        for event in events:
+            apply_event(progress, event)
+        progress["version"] = progress.get("version", 0) + len(events)
+        return progress
+
+    def load(self, user_id):
+        """Return the snapshot with the journal replayed, or None for unknown users"""
+        with self._locked(user_id, shared=True):
+            return self._replay(user_id)
+
+    def save(self, user_id, progress):
+        """
+        Replace the user's snapshot with the given document
+
+        The document must carry the version it was loaded at (documents
+        without a version may only create new users). If anything was written
+        since, ProgressConflictError is raised instead of overwriting it.
+        The journal is discarded because the document already includes it.
+        """
+        with self._locked(user_id):
+            current = self._replay(user_id)
+            current_version = current["version"] if current is not None else 0
+            expected_version = progress.get("version", 0)
+            if expected_version != current_version:
+                raise ProgressConflictError(
+                    f"Progress for {user_id} is at version {current_version}, "
+                    f"not {expected_version}")
+
+            self._write_snapshot(user_id, dict(progress, version=current_version + 1))
+            self._remove_journal(user_id)
+            progress["version"] = current_version + 1
+
+    def record_events(self, user_id, events, progress=None):
+        """Append events to the user's journal; the full document is not needed"""
+        lines = "".join(json.dumps(event) + "\n" for event in events)
+        with self._locked(user_id):
+            with open(self.journal_path_for(user_id), "a+") as f:
+                # Start on a fresh line if a previous append was cut short
+                if f.tell() > 0:
+                    f.seek(f.tell() - 1)
+                    if f.read(1) != "\n":
+                        lines = "\n" + lines
+                f.write(lines)
+
+    def compact(self, user_id):
+        """Fold the user's journal into the snapshot, returning the number of events folded"""
+        with self._locked(user_id):
+            events = self._read_journal(user_id)
+            if not events:
+                return 0
+            progress = self._replay(user_id)
+            if progress is None:
+                return 0
+            self._write_snapshot(user_id, progress)
+            self._remove_journal(user_id)
+            return len(events)
+
+    def compact_all(self, min_journal_bytes=0):
+        """Compact every journal larger than min_journal_bytes, returning events folded"""
+        if not os.path.isdir(self.directory):
+            return 0
+        folded = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".events.jsonl"):
+                continue
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            if size > min_journal_bytes:
+                folded += self.compact(name[:-len(".events.jsonl")])
+        return folded
+
+    def user_ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(self.directory)
+                      if name.endswith(".json"))
+
+
+class SQLiteProgressStore:
+    """
+    Stores progress in a SQLite database running in WAL mode
+
+    Quiz results and section views live in normalized tables, so recording
+    an event is a single-row insert regardless of how long the history is.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS mastery_levels (
+            user_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            level INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, category)
+        );
+        CREATE TABLE IF NOT EXISTS quiz_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            category TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            difficulty TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_quiz_history_user
+            ON quiz_history (user_id, category, id);
+        CREATE TABLE IF NOT EXISTS section_views (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            section TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_section_views_user
+            ON section_views (user_id, section, id);
+        CREATE TABLE IF NOT EXISTS quiz_aggregates (
+            user_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (user_id, category)
+        );
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        # One connection per store, opened and set up once. Streamlit runs
+        # every rerun in a new script thread, so the connection is shared
+        # between threads and the lock serializes its use.
+        self._conn = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _open(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(users)")]
+        if "version" not in columns:
+            # Databases created before versioning was added
+            conn.execute("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        return conn
+
+    @contextmanager
+    def _connected(self):
+        """Hold the store's lock and yield its connection, opening it on first use"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._open()
+            yield self._conn
+
+    def close(self):
+        """Close the store's connection; the next use reopens it"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load(self, user_id):
+        """Return the stored progress document, or None for unknown users"""
+        with self._connected() as conn:
+            user = conn.execute("SELECT version FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            if user is None:
+                return None
+
+            mastery_levels = {
+                row["category"]: row["level"]
+                for row in conn.execute(
+                    "SELECT category, level FROM mastery_levels WHERE user_id = ? ORDER BY rowid",
+                    (user_id,))
+            }
+            viewed_sections = {category: [] for category in mastery_levels}
+            for row in conn.execute(
+                    "SELECT section, timestamp FROM section_views WHERE user_id = ? ORDER BY id",
+                    (user_id,)):
+                viewed_sections.setdefault(row["section"], []).append(row["timestamp"])
+            quiz_history = [
+                {
+                    "timestamp": row["timestamp"],
+                    "category": row["category"],
+                    "score": row["score"],
+                    "total": row["total"],
+                    "difficulty": row["difficulty"]
+                }
+                for row in conn.execute(
+                    "SELECT timestamp, category, score, total, difficulty FROM quiz_history "
+                    "WHERE user_id = ? ORDER BY id",
+                    (user_id,))
+            ]
+
+            quiz_aggregates = {
+                row["category"]: json.loads(row["data"])
+                for row in conn.execute(
+                    "SELECT category, data FROM quiz_aggregates WHERE user_id = ?", (user_id,))
+            }
+            if any(q["category"] not in quiz_aggregates for q in quiz_history):
+                # Rows written before aggregates existed
+                rebuilt = build_quiz_aggregates(quiz_history)
+                for category, aggregate in rebuilt.items():
+                    quiz_aggregates.setdefault(category, aggregate)
+
+            return {
+                "user_id": user_id,
+                "quiz_history": quiz_history,
+                "viewed_sections": viewed_sections,
+                "mastery_levels": mastery_levels,
+                "quiz_aggregates": quiz_aggregates,
+                "version": user["version"]
+            }
+
+    def save(self, user_id, progress):
+        """
+        Replace everything stored for a user with the given document
+
+        Like JSONProgressStore.save, raises ProgressConflictError if the
+        document's version is not the stored version.
+        """
+        with self._connected() as conn:
+            expected_version = progress.get("version", 0)
+            with conn:
+                # Compare-and-set on the version; this also takes the write lock
+                updated = conn.execute(
+                    "UPDATE users SET version = version + 1 WHERE user_id = ? AND version = ?",
+                    (user_id, expected_version)).rowcount
+                if not updated:
+                    if expected_version != 0:
+                        raise ProgressConflictError(f"Progress for {user_id} changed since version {expected_version}")
+                    try:
+                        conn.execute(
+                            "INSERT INTO users (user_id, created_at, version) VALUES (?, ?, 1)",
+                            (user_id, datetime.now().isoformat()))
+                    except sqlite3.IntegrityError:
+                        raise ProgressConflictError(f"Progress for {user_id} already exists")
+                for table in ("mastery_levels", "quiz_history", "section_views", "quiz_aggregates"):
+                    conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+
+                sections = list(progress.get("mastery_levels", {}))
+                sections += [s for s in progress.get("viewed_sections", {}) if s not in sections]
+                conn.executemany(
+                    "INSERT INTO mastery_levels (user_id, category, level) VALUES (?, ?, ?)",
+                    [(user_id, s, progress.get("mastery_levels", {}).get(s, 0)) for s in sections])
+                conn.executemany(
+                    "INSERT INTO quiz_history (user_id, timestamp, category, score, total, difficulty) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(user_id, q["timestamp"], q["category"], q["score"], q["total"], q.get("difficulty"))
+                     for q in progress.get("quiz_history", [])])
+                conn.executemany(
+                    "INSERT INTO section_views (user_id, section, timestamp) VALUES (?, ?, ?)",
+                    [(user_id, section, timestamp)
+                     for section, timestamps in progress.get("viewed_sections", {}).items()
+                     for timestamp in timestamps])
+                conn.executemany(
+                    "INSERT INTO quiz_aggregates (user_id, category, data) VALUES (?, ?, ?)",
+                    [(user_id, category, json.dumps(aggregate))
+                     for category, aggregate in ensure_quiz_aggregates(progress).items()])
+            progress["version"] = expected_version + 1
+
+    def record_events(self, user_id, events, progress=None):
+        """Persist events as single-row inserts; the full document is not needed"""
+        with self._connected() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO users (user_id, created_at) VALUES (?, ?)",
+                    (user_id, datetime.now().isoformat()))
+                conn.execute(
+                    "UPDATE users SET version = version + ? WHERE user_id = ?",
+                    (len(events), user_id))
+                for event in events:
+                    if event["type"] == "view":
+                        conn.execute(
+                            "INSERT INTO section_views (user_id, section, timestamp) VALUES (?, ?, ?)",
+                            (user_id, event["section"], event["timestamp"]))
+                        conn.execute(
+                            "INSERT OR IGNORE INTO mastery_levels (user_id, category, level) VALUES (?, ?, 0)",
+                            (user_id, event["section"]))
+                    elif event["type"] == "quiz":
+                        entry = event["entry"]
+                        aggregate = self._load_aggregate(conn, user_id, entry["category"])
+                        conn.execute(
+                            "INSERT INTO quiz_history (user_id, timestamp, category, score, total, difficulty) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (user_id, entry["timestamp"], entry["category"], entry["score"],
+                             entry["total"], entry.get("difficulty")))
+                        self._update_aggregate(conn, user_id, entry["category"], update_quiz_aggregate(aggregate, entry))
+                    else:
+                        raise ValueError(f"Unknown progress event type: {event['type']}")
+
+    def _load_aggregate(self, conn, user_id, category):
+        row = conn.execute(
+            "SELECT data FROM quiz_aggregates WHERE user_id = ? AND category = ?",
+            (user_id, category)).fetchone()
+        if row is not None:
+            return json.loads(row["data"])
+
+        # Rows written before aggregates existed; rebuild this category once
+        history = [dict(row) for row in conn.execute(
+            "SELECT score, total, difficulty, category FROM quiz_history "
+            "WHERE user_id = ? AND category = ? ORDER BY id",
+            (user_id, category))]
+        return build_quiz_aggregates(history).get(category, new_quiz_aggregate())
+
+    def _update_aggregate(self, conn, user_id, category, aggregate):
+        conn.execute(
+            "INSERT INTO quiz_aggregates (user_id, category, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, category) DO UPDATE SET data = excluded.data",
+            (user_id, category, json.dumps(aggregate)))
+        level = mastery_level(aggregate["recent"])
+        if level is not None:
+            conn.execute(
+                "INSERT INTO mastery_levels (user_id, category, level) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id, category) DO UPDATE SET level = excluded.level",
+                (user_id, category, level))
+
+    def user_ids(self):
+        with self._connected() as conn:
+            return [row["user_id"] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+
+
+class WriteBehindProgressStore:
+    """
+    Buffers progress writes in memory and flushes them to another store in batches
+
+    Events for the same user are coalesced into one record_events call on the
+    wrapped store, and a saved document replaces anything pending for that
+    user. A background thread flushes every flush_interval seconds, or sooner
+    once max_pending events are buffered. Pending writes are also flushed at
+    interpreter exit, and flush() can be called directly (e.g. from tests).
+
+    Reads see buffered writes: load() applies pending events on top of what
+    the wrapped store returns, counting each one in the version like the
+    JSON journal does. save() checks the document's version when it is
+    called, so a stale document raises ProgressConflictError in the caller
+    instead of being dropped by the flusher.
+    """
+
+    def __init__(self, inner, flush_interval=2.0, max_pending=100):
+        self.inner = inner
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        # Expose the wrapped store's extras (path_for, compact_all, ...)
+        return getattr(self.inner, name)
+
+    def _user_lock(self, user_id):
+        with self._lock:
+            if user_id not in self._user_locks:
+                self._user_locks[user_id] = threading.Lock()
+            return self._user_locks[user_id]
+
+    def _pending_entry(self, user_id):
+        entry = self._pending.get(user_id)
+        if entry is None:
+            entry = self._pending[user_id] = {"snapshot": None, "events": []}
+        return entry
+
+    def load(self, user_id):
+        # Holding the user lock keeps a concurrent flush from moving pending
+        # writes into the wrapped store halfway through this read
+        with self._user_lock(user_id):
+            with self._lock:
+                entry = self._pending.get(user_id)
+                snapshot = copy.deepcopy(entry["snapshot"]) if entry else None
+                events = list(entry["events"]) if entry else []
+
+            progress = snapshot if snapshot is not None else self.inner.load(user_id)
+            if progress is None:
+                return None
+            for event in events:
+                apply_event(progress, event)
+            progress["version"] = progress.get("version", 0) + len(events)
+            return progress
+
+    def save(self, user_id, progress):
+        """
+        Buffer a whole progress document after checking its version
+
+        Anything already buffered for the user is written out first, so the
+        version is compared with the wrapped store's and the buffered
+        snapshot later lands on exactly that version. Raises
+        ProgressConflictError like the wrapped store's save.
+        """
+        with self._user_lock(user_id):
+            self._write_pending(user_id)
+            current = self.inner.load(user_id)
+            current_version = current["version"] if current is not None else 0
+            expected_version = progress.get("version", 0)
+            if expected_version != current_version:
+                raise ProgressConflictError(
+                    f"Progress for {user_id} is at version {current_version}, "
+                    f"not {expected_version}")
+
+            with self._lock:
+                entry = self._pending_entry(user_id)
+                if entry["events"]:
+                    # Recorded while the version was being checked
+                    raise ProgressConflictError(f"Progress for {user_id} changed while it was being saved")
+                entry["snapshot"] = dict(copy.deepcopy(progress), version=current_version + 1)
+                self._pending_count += 1
+                full = self._pending_count >= self.max_pending
+        progress["version"] = current_version + 1
+        if full:
+            self._wakeup.set()
+
+    def record_events(self, user_id, events, progress=None):
+        with self._lock:
+            self._pending_entry(user_id)["events"].extend(events)
+            self._pending_count += len(events)
+            full = self._pending_count >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def pending_count(self):
+        """Return the number of buffered writes"""
+        with self._lock:
+            return self._pending_count
+
+    def flush(self):
+        """Write every buffered change to the wrapped store"""
+        with self._lock:
+            user_ids = list(self._pending)
+        for user_id in user_ids:
+            self._flush_user(user_id)
+
+    def _flush_user(self, user_id):
+        with self._user_lock(user_id):
+            self._write_pending(user_id)
+
+    def _write_pending(self, user_id):
+        """Write one user's buffered changes; the caller holds the user lock"""
+        with self._lock:
+            entry = self._pending.pop(user_id, None)
+            if entry is None:
+                return
+            self._pending_count -= len(entry["events"]) + (entry["snapshot"] is not None)
+
+        try:
+            if entry["snapshot"] is not None:
+                snapshot = entry["snapshot"]
+                try:
+                    # save() checked the snapshot against the version before its own
+                    self.inner.save(user_id, dict(snapshot, version=snapshot["version"] - 1))
+                except ProgressConflictError as e:
+                    # Another process wrote since save() was called; keep what is stored
+                    logger.error(f"Dropping buffered progress snapshot: {str(e)}")
+                entry["snapshot"] = None
+            if entry["events"]:
+                self.inner.record_events(user_id, entry["events"])
+        except Exception:
+            # Put the unwritten changes back in front of anything buffered since
+            with self._lock:
+                newer = self._pending.pop(user_id, None)
+                if newer is not None and newer["snapshot"] is not None:
+                    entry = newer
+                elif newer is not None:
+                    entry["events"].extend(newer["events"])
+                self._pending[user_id] = entry
+                self._pending_count += len(entry["events"]) + (entry["snapshot"] is not None)
+            raise
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Progress write-behind flush failed: {str(e)}")
+
+    def close(self):
+        """Stop the flusher thread and write out anything still buffered"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._flusher.is_alive() and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+
+    def user_ids(self):
+        with self._lock:
+            pending = [user_id for user_id, entry in self._pending.items() if entry["snapshot"] is not None]
+        return sorted(set(self.inner.user_ids()) | set(pending))
+
+
+def copy_progress(progress):
+    """Copy a progress document so the copy can be modified independently"""
+    copied = {}
+    for key, value in progress.items():
+        if key == "quiz_history":
+            # Entries are never modified once recorded, so they can be shared
+            copied[key] = list(value)
+        else:
+            copied[key] = _copy_container(value)
+    return copied
+
+
+def _copy_container(value):
+    if isinstance(value, dict):
+        return {k: _copy_container(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_container(v) if isinstance(v, (dict, list)) else v for v in value]
+    return value
+
+
+class CachedProgressStore:
+    """
+    Keeps recently loaded progress documents in a bounded in-process LRU cache
+
+    A single page render loads the same user's progress several times
+    (sidebar, page body, view tracking); with the cache only the first load
+    reaches the wrapped store. Writes made through this store update the
+    cached copy, and entries expire after ttl seconds so changes written by
+    other processes are picked up.
+    """
+
+    def __init__(self, inner, max_entries=256, ttl=5.0):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _put(self, user_id, progress):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy_progress(progress))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id=None):
+        """Drop one user's cached progress, or everything when user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def load(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return copy_progress(entry[1])
+            self.misses += 1
+
+        progress = self.inner.load(user_id)
+        if progress is not None:
+            self._put(user_id, progress)
+        return progress
+
+    def save(self, user_id, progress):
+        try:
+            self.inner.save(user_id, progress)
+        except Exception:
+            self.invalidate(user_id)
+            raise
+        self._put(user_id, progress)
+
+    def record_events(self, user_id, events, progress=None):
+        try:
+            self.inner.record_events(user_id, events, progress)
+        except Exception:
+            self.invalidate(user_id)
+            raise
+
+        if progress is None:
+            self.invalidate(user_id)
+        else:
+            # Recording events moves the stored version on by one per event
+            progress = copy_progress(progress)
+            progress["version"] = progress.get("version", 0) + len(events)
+            self._put(user_id, progress)
+
+    def stats(self):
+        """Return hit/miss counters and occupancy, for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl
+            }
+
+    def user_ids(self):
+        return self.inner.user_ids()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_progress_store(backend=None):
+    """
+    Create a progress store for the given backend name
+
+    The backend defaults to the PROGRESS_BACKEND environment variable
+    ("json" or "sqlite"), falling back to "json". Setting
+    PROGRESS_WRITE_BEHIND=1 buffers writes in memory and flushes them every
+    PROGRESS_FLUSH_INTERVAL seconds or PROGRESS_FLUSH_THRESHOLD writes.
+    Loads are served from an LRU cache of PROGRESS_CACHE_SIZE users
+    (0 disables it) whose entries live for PROGRESS_CACHE_TTL seconds.
+    """
+    backend = (backend or os.environ.get("PROGRESS_BACKEND", "json")).lower()
+    if backend == "json":
+        store = JSONProgressStore(os.environ.get("PROGRESS_DIR", DEFAULT_PROGRESS_DIR))
+    elif backend == "sqlite":
+        store = SQLiteProgressStore(os.environ.get("PROGRESS_DB_PATH", DEFAULT_DB_PATH))
+    else:
+        raise ValueError(f"Unknown progress backend: {backend}")
+
+    if os.environ.get("PROGRESS_WRITE_BEHIND", "0").lower() in ("1", "true", "yes"):
+        store = WriteBehindProgressStore(
+            store,
+            flush_interval=float(os.environ.get("PROGRESS_FLUSH_INTERVAL", "2.0")),
+            max_pending=int(os.environ.get("PROGRESS_FLUSH_THRESHOLD", "100"))
+        )
+
+    cache_size = int(os.environ.get("PROGRESS_CACHE_SIZE", "256"))
+    if cache_size > 0:
+        store = CachedProgressStore(
+            store,
+            max_entries=cache_size,
+            ttl=float(os.environ.get("PROGRESS_CACHE_TTL", "5.0"))
+        )
+    return store
+
+
+def get_progress_store():
+    """Return the process-wide progress store, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_progress_store()
+    return _store
+
+
+def set_progress_store(store):
+    """Replace the process-wide progress store (None resets to the configured default)"""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+_compactor = None
+_compactor_stop = threading.Event()
+
+
+def start_compactor(store=None, interval=60, min_journal_bytes=4096):
+    """
+    Start a background thread that periodically compacts progress journals
+
+    Only stores that keep a journal (those with compact_all) are compacted.
+    Calling this again while the compactor is running has no effect, so it is
+    safe to call on every Streamlit rerun.
+    """
+    global _compactor
+    store = store or get_progress_store()
+    if not hasattr(store, "compact_all"):
+        return None
+
+    with _store_lock:
+        if _compactor is not None and _compactor.is_alive():
+            return _compactor
+
+        _compactor_stop.clear()
+
+        def run():
+            while not _compactor_stop.wait(interval):
+                try:
+                    store.compact_all(min_journal_bytes)
+                except Exception as e:
+                    logger.error(f"Progress journal compaction failed: {str(e)}")
+
+        _compactor = threading.Thread(target=run, name="progress-compactor", daemon=True)
+        _compactor.start()
+        return _compactor
+
+
+def stop_compactor():
+    """Stop the background compactor thread if it is running"""
+    global _compactor
+    _compactor_stop.set()
+    if _compactor is not None:
+        _compactor.join()
+        _compactor = None
+
+
+def progress_cache_stats():
+    """Return the progress cache counters, or None when caching is disabled"""
+    store = get_progress_store()
+    return store.stats() if isinstance(store, CachedProgressStore) else None
+
+
+def migrate_progress(source, target):
+    """Copy every user's progress from one store to another, returning the count"""
+    count = 0
+    for user_id in source.user_ids():
+        progress = source.load(user_id)
+        if progress is not None:
+            # Migration overwrites whatever the target already holds
+            existing = target.load(user_id)
+            progress["version"] = existing["version"] if existing is not None else 0
+            target.save(user_id, progress)
+            count += 1
+    return count
+
+
+def main():
+    """Migrate JSON progress files into the SQLite store"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    count = migrate_progress(JSONProgressStore(), SQLiteProgressStore(db_path))
+    print(f"Migrated {count} user progress records to {db_path}")
+
+
+if __name__ == "__main__":
+    main()
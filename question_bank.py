@@ -0,0 +1,168 @@
+"""
+Process-wide question bank for the quiz page.
+
+The bank is built once per process and files every question id under its
+(difficulty, category, type) key. Starting a quiz then unions the id lists
+for the selected types instead of scanning the whole difficulty bucket, and
+samples from them without building the filtered list, so the cost of a click
+depends on the quiz length rather than on the size of the bank.
+
+When the line-delimited store (data/questions.jsonl, see question_store.py)
+is present the bank is built from its sidecar index and only the sampled
+questions are ever parsed; otherwise data/enhanced_quizzes.json is loaded.
+"""
+import bisect
+import json
+import logging
+import os
+import random
+
+from content_registry import load_file_cached
+from question_store import QUESTIONS_PATH, SOURCE_QUIZ_PATH, QuestionStore, question_entry
+
+logger = logging.getLogger('question_bank')
+
+QUIZ_PATH = SOURCE_QUIZ_PATH
+DEFAULT_DIFFICULTY = "intermediate"
+QUESTION_TYPES = ["free_response", "multiple_choice", "matching", "identification"]
+
+# Category key for groups that span every category
+ANY_CATEGORY = None
+
+
+class QuestionBank:
+    """Questions indexed by difficulty, category and type"""
+
+    def __init__(self, entries, fetch):
+        """
+        Build the indexes from question keys
+
+        entries yields (id, difficulty, category, type) in file order and
+        fetch(q_id) returns the full question.
+        """
+        self.fetch = fetch
+        self.difficulty_of = {}
+        self.order = {}
+        groups = {}
+        for q_id, difficulty, category, q_type in entries:
+            self.difficulty_of[q_id] = difficulty
+            self.order.setdefault(difficulty, []).append(q_id)
+            groups.setdefault((difficulty, category, q_type), []).append(q_id)
+            groups.setdefault((difficulty, ANY_CATEGORY, q_type), []).append(q_id)
+        self.order = {difficulty: tuple(ids) for difficulty, ids in self.order.items()}
+        self.groups = {key: tuple(ids) for key, ids in groups.items()}
+
+    @classmethod
+    def from_quizzes(cls, quizzes):
+        """Build a bank holding nested {difficulty: {"questions": [...]}} quizzes in memory"""
+        questions = {}
+        entries = []
+        for difficulty, data in quizzes.items():
+            for question in data.get("questions", []):
+                questions[question["id"]] = question
+                entries.append(question_entry(question, difficulty))
+        return cls(entries, questions.__getitem__)
+
+    def __len__(self):
+        return len(self.difficulty_of)
+
+    def resolve_difficulty(self, difficulty):
+        """Return difficulty, or the default one if the bank has no such bucket"""
+        return difficulty if difficulty in self.order else DEFAULT_DIFFICULTY
+
+    def get(self, q_id):
+        """Return the question with this id, or None"""
+        return self.fetch(q_id) if q_id in self.difficulty_of else None
+
+    def resolve(self, question_ids):
+        """Return the questions for a sequence of ids, skipping any no longer in the bank"""
+        questions = []
+        for q_id in question_ids:
+            question = self.get(q_id)
+            if question is None:
+                logger.warning(f"Question {q_id} is no longer in the question bank")
+            else:
+                questions.append(question)
+        return questions
+
+    def segments(self, difficulty, category=None, question_types=None):
+        """
+        Return the precomputed id tuples matching a quiz configuration
+
+        Each tuple is the intersection of one difficulty, category and type;
+        the tuples for different types are disjoint, so together they are the
+        union of the selected types. A category of None or "Any" matches all.
+        """
+        difficulty = self.resolve_difficulty(difficulty)
+        if category == "Any":
+            category = ANY_CATEGORY
+        if question_types is None:
+            question_types = QUESTION_TYPES
+        return [
+            self.groups[key]
+            for key in ((difficulty, category, q_type) for q_type in dict.fromkeys(question_types))
+            if key in self.groups
+        ]
+
+    def count(self, difficulty, category=None, question_types=None):
+        """Return how many questions match a quiz configuration"""
+        return sum(len(ids) for ids in self.segments(difficulty, category, question_types))
+
+    def select_ids(self, difficulty, category=None, question_types=None):
+        """Return the ids of every matching question"""
+        return [q_id for ids in self.segments(difficulty, category, question_types) for q_id in ids]
+
+    def sample_ids(self, difficulty, category, question_types, k, rng=random):
+        """
+        Pick k distinct matching question ids at random
+
+        Raises ValueError if fewer than k questions match, like random.sample.
+        """
+        segments = self.segments(difficulty, category, question_types)
+        offsets = []
+        total = 0
+        for ids in segments:
+            total += len(ids)
+            offsets.append(total)
+        picked = []
+        for position in rng.sample(range(total), k):
+            segment = bisect.bisect_right(offsets, position)
+            start = offsets[segment - 1] if segment else 0
+            picked.append(segments[segment][position - start])
+        return picked
+
+    def sample(self, difficulty, category, question_types, k, rng=random):
+        """Pick k distinct matching questions at random, fetching only those"""
+        return [self.fetch(q_id) for q_id in self.sample_ids(difficulty, category, question_types, k, rng)]
+
+
+def load_question_bank(path=QUIZ_PATH):
+    """Index the questions in a .jsonl store or a nested JSON quiz file"""
+    if path.endswith('.jsonl'):
+        store = QuestionStore(path)
+        bank = QuestionBank(store.entries, store.read)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            bank = QuestionBank.from_quizzes(json.load(f))
+    logger.info(f"Indexed {len(bank)} questions from {path}")
+    return bank
+
+
+def default_question_path(store_path=QUESTIONS_PATH, source_path=QUIZ_PATH):
+    """
+    Return the question store if it is up to date, otherwise the JSON quiz file
+
+    A store older than the JSON it was converted from is ignored so edits to
+    the quiz file are never hidden by a stale conversion.
+    """
+    if not os.path.exists(store_path):
+        return source_path
+    if os.path.exists(source_path) and os.stat(source_path).st_mtime_ns > os.stat(store_path).st_mtime_ns:
+        logger.warning(f"{store_path} is older than {source_path}; run python question_store.py to reconvert it")
+        return source_path
+    return store_path
+
+
+def get_question_bank(path=None):
+    """Return the process-wide question bank, reloading it if its file changed"""
+    return load_file_cached(path or default_question_path(), load_question_bank)
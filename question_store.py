@@ -0,0 +1,175 @@
+"""
+Line-delimited question store.
+
+Questions are kept one JSON object per line in data/questions.jsonl, next to
+a sidecar index (questions.jsonl.idx) holding each question's id, difficulty,
+category, type and byte offset. Opening the store loads only the sidecar and
+memory-maps the question file, so the question bank can be indexed without
+parsing any question and a quiz reads just the lines it sampled.
+
+Convert the nested data/enhanced_quizzes.json format with:
+    python question_store.py [quizzes.json] [questions.jsonl]
+"""
+import json
+import logging
+import mmap
+import os
+import pickle
+import sys
+from array import array
+
+logger = logging.getLogger('question_store')
+
+# Bump whenever the sidecar layout changes so stale indexes are rebuilt
+STORE_INDEX_VERSION = 1
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+QUESTIONS_PATH = os.path.join(DATA_DIR, "questions.jsonl")
+SOURCE_QUIZ_PATH = os.path.join(DATA_DIR, "enhanced_quizzes.json")
+
+
+def question_entry(question, difficulty):
+    """Return the (id, difficulty, category, type) key the question bank indexes by"""
+    return (
+        question["id"],
+        difficulty,
+        question.get("category", ""),
+        question.get("type", "free_response")
+    )
+
+
+def index_path_for(path):
+    """Return the sidecar index path for a question file"""
+    return f"{path}.idx"
+
+
+def file_stamp(path):
+    """Return a file's (mtime_ns, size)"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def save_store_index(path, entries, offsets):
+    """Write the sidecar index for a question file atomically"""
+    index = {
+        "version": STORE_INDEX_VERSION,
+        "source": file_stamp(path),
+        "entries": entries,
+        "offsets": offsets
+    }
+    index_path = index_path_for(path)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
+    return index
+
+
+def load_store_index(path):
+    """Load the sidecar index, or return None if it is missing or does not match the file"""
+    try:
+        with open(index_path_for(path), 'rb') as f:
+            index = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != STORE_INDEX_VERSION:
+        return None
+    if index["source"] != file_stamp(path):
+        return None
+    return index
+
+
+def build_store_index(path):
+    """Scan a question file and write its sidecar index"""
+    entries = []
+    offsets = array('Q')
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                question = json.loads(line)
+                entries.append(question_entry(question, question.get("difficulty", "")))
+                offsets.append(offset)
+            offset += len(line)
+    return save_store_index(path, entries, offsets)
+
+
+def write_questions(quizzes, path=QUESTIONS_PATH):
+    """
+    Write nested {difficulty: {"questions": [...]}} quizzes as a question file
+
+    Each line is one question with its difficulty added. The sidecar index
+    is written at the same time, so the new store opens without a scan.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    entries = []
+    offsets = array('Q')
+    offset = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for difficulty, data in quizzes.items():
+            for question in data.get("questions", []):
+                line = json.dumps({"difficulty": difficulty, **question}, ensure_ascii=False, separators=(',', ':'))
+                line = line.encode('utf-8') + b'\n'
+                entries.append(question_entry(question, difficulty))
+                offsets.append(offset)
+                f.write(line)
+                offset += len(line)
+    os.replace(tmp_path, path)
+    save_store_index(path, entries, offsets)
+    return len(entries)
+
+
+def convert_quizzes(source=SOURCE_QUIZ_PATH, path=QUESTIONS_PATH):
+    """Convert a nested JSON quiz file into a question file"""
+    with open(source, 'r', encoding='utf-8') as f:
+        quizzes = json.load(f)
+    return write_questions(quizzes, path)
+
+
+class QuestionStore:
+    """Read-only, memory-mapped view of a question file"""
+
+    def __init__(self, path=QUESTIONS_PATH):
+        self.path = path
+        index = load_store_index(path)
+        if index is None:
+            logger.warning(f"Question index for {path} missing or stale; rebuilding it")
+            index = build_store_index(path)
+        self.entries = index["entries"]
+        self.offsets = index["offsets"]
+        self.positions = {entry[0]: i for i, entry in enumerate(self.entries)}
+        with open(path, 'rb') as f:
+            # mmap cannot map an empty file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if index["source"][1] else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, q_id):
+        return q_id in self.positions
+
+    def read(self, q_id):
+        """Parse and return one question, reading only its line"""
+        start = self.offsets[self.positions[q_id]]
+        end = self._map.find(b'\n', start)
+        return json.loads(self._map[start:end if end != -1 else len(self._map)])
+
+    def close(self):
+        """Unmap the question file"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def main(argv):
+    """Convert a nested quiz file into a question file"""
+    source = argv[0] if argv else SOURCE_QUIZ_PATH
+    path = argv[1] if len(argv) > 1 else QUESTIONS_PATH
+    count = convert_quizzes(source, path)
+    print(f"Wrote {count} questions from {source} -> {path} (index {index_path_for(path)})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
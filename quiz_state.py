@@ -1,6 +1,7 @@
 # Create a new file: quiz_state.py
 import streamlit as st
 from logging_config import configure_logging
+from question_bank import get_question_bank
 
 logger = configure_logging()('quiz_state')
 
@@ -10,7 +11,7 @@ def initialize_quiz_state():
         "quiz_active": False,
         "quiz_submitted": False,
         "user_responses": {},
-        "active_questions": [],
+        "active_question_ids": (),
         "quiz_result": {"score": 0, "total": 0, "difficulty": "intermediate"},
         "quiz_category": None,
         "quiz_difficulty": "intermediate"
@@ -26,7 +27,7 @@ def reset_quiz_state():
     st.session_state.quiz_active = False
     st.session_state.quiz_submitted = False
     st.session_state.user_responses = {}
-    st.session_state.active_questions = []
+    st.session_state.active_question_ids = ()
     logger.info("Reset quiz state")
 
 def is_quiz_active():
@@ -37,11 +38,16 @@ def is_quiz_submitted():
     """Check if quiz is submitted"""
     return st.session_state.get("quiz_submitted", False)
 
-def activate_quiz(questions, difficulty):
-    """Activate the quiz with selected questions"""
+def activate_quiz(question_ids, difficulty):
+    """Activate the quiz with the ids of the selected questions"""
     st.session_state.quiz_active = True
     st.session_state.quiz_submitted = False
     st.session_state.user_responses = {}
-    st.session_state.active_questions = questions
+    # Only ids are kept per session; the questions live in the shared question bank
+    st.session_state.active_question_ids = tuple(question_ids)
     st.session_state.quiz_result["difficulty"] = difficulty
-    logger.info(f"Activated quiz with {len(questions)} questions, difficulty: {difficulty}")
\ No newline at end of file
+    logger.info(f"Activated quiz with {len(question_ids)} questions, difficulty: {difficulty}")
+
+def get_active_questions():
+    """Return the active quiz's questions, resolved through the shared question bank"""
+    return get_question_bank().resolve(st.session_state.get("active_question_ids", ()))
@@ -1,81 +1,678 @@
+import bisect
+import copy
+import hashlib
+import heapq
+import html
+import math
+import os
 import re
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import nltk
-
-# Download necessary NLTK data (will run on first import)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-def preprocess_text(text):
-    """Preprocess text for searching"""
-    # Convert to lowercase and remove punctuation
-    text = re.sub(r'[^\w\s]', '', text.lower())
-    # Tokenize
-    tokens = word_tokenize(text)
-    # Remove stopwords
-    stop_words = set(stopwords.words('english'))
-    tokens = [word for word in tokens if word not in stop_words]
-    return tokens
+import threading
+from collections import Counter, OrderedDict
+from itertools import chain
+from text_processing import normalize, preprocess_text
+
+# Bump whenever the index layout changes so content bundles holding an older index are rebuilt
+INDEX_FORMAT_VERSION = 5
+KNOWLEDGE_DIR = os.path.join("data", "knowledge")
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Sentences end at terminal punctuation followed by whitespace, or at a block boundary
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+# Typo tolerance: unknown query tokens of at least this length are expanded to
+# vocabulary terms whose trigram sets have a Dice similarity above the threshold
+FUZZY_MIN_LENGTH = 4
+FUZZY_THRESHOLD = 0.6
+FUZZY_MAX_EXPANSIONS = 3
+# Each trigram bucket keeps only its most frequent terms, so a lookup reads a
+# bounded number of candidates however large the vocabulary grows
+FUZZY_MAX_BUCKET = 32
+
+# Quoted phrases are required; unquoted terms that occur close together get up
+# to PROXIMITY_BOOST extra score, scaled by how tight their smallest window is
+PHRASE_RE = re.compile(r'"([^"]*)"')
+PROXIMITY_BOOST = 0.5
+
+# Process-wide cache of search results, shared by every session
+SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "512"))
+
+# Autocomplete answers are precomputed for every prefix matching more terms
+# than this; other prefixes scan at most this many terms
+COMPLETION_SCAN_LIMIT = 64
+
+def html_to_text(content):
+    """Convert an HTML study page to plain text, one block element per line"""
+    text = re.sub(r'(?is)<(script|style)\b.*?</\1>', ' ', content)
+    text = re.sub(r'(?i)</?(h[1-6]|p|li|ul|ol|div|tr|br)\b[^>]*>', '\n', text)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = html.unescape(text)
+    lines = (re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+def load_knowledge_content(knowledge_dir=KNOWLEDGE_DIR):
+    """Load every knowledge base page as plain text, keyed by section name"""
+    content_dict = {}
+    for filename in sorted(os.listdir(knowledge_dir)):
+        if filename.endswith('.html'):
+            with open(os.path.join(knowledge_dir, filename), 'r', encoding='utf-8') as file:
+                content_dict[filename[:-len('.html')]] = html_to_text(file.read())
+    return content_dict
+
+def content_hash(content_dict):
+    """Return a digest identifying the exact text of every section"""
+    digest = hashlib.sha256()
+    for section in sorted(content_dict):
+        for part in (section, content_dict[section]):
+            encoded = part.encode('utf-8')
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+    return digest.hexdigest()
+
+def split_sentences(text):
+    """Return the (start, end) character spans of the sentences in text"""
+    spans = []
+    start = 0
+    for match in SENTENCE_BREAK_RE.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
 
 def index_content(content_dict):
-    """Create a searchable index from content"""
-    index = {}
-    
+    """
+    Create a positional inverted index from content
+
+    Each term maps to the sections containing it and the token positions
+    where it occurs, so term frequencies come from the position lists.
+    Document lengths are kept for BM25 length normalization. Sentence
+    spans and the sentence number of every token position are stored per
+    section so snippets can be chosen from the postings alone.
+    """
+    postings = {}
+    doc_lengths = {}
+    sentences = {}
+    token_sentences = {}
+
     for section, content in content_dict.items():
-        tokens = preprocess_text(content)
-        for token in tokens:
-            if token not in index:
-                index[token] = []
-            index[token].append(section)
-    
-    return index
-
-def search_content(query, index, content_dict):
-    """Search content using the index"""
-    query_tokens = preprocess_text(query)
-    results = {}
-    
+        spans = split_sentences(content)
+        sentence_of_position = []
+        for sentence_number, (start, end) in enumerate(spans):
+            for token in preprocess_text(content[start:end]):
+                position = len(sentence_of_position)
+                postings.setdefault(token, {}).setdefault(section, []).append(position)
+                sentence_of_position.append(sentence_number)
+        doc_lengths[section] = len(sentence_of_position)
+        sentences[section] = spans
+        token_sentences[section] = sentence_of_position
+
+    return {
+        "version": INDEX_FORMAT_VERSION,
+        "content_hash": content_hash(content_dict),
+        "postings": postings,
+        "doc_lengths": doc_lengths,
+        "avg_doc_length": sum(doc_lengths.values()) / len(doc_lengths) if doc_lengths else 0.0,
+        "sentences": sentences,
+        "token_sentences": token_sentences,
+        "trigrams": build_trigram_index(postings, {
+            term: sum(len(positions) for positions in term_postings.values())
+            for term, term_postings in postings.items()
+        })
+    }
+
+def trigrams(term):
+    """Return the set of character trigrams of a term padded with boundary markers"""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_trigram_index(terms, freqs=None):
+    """
+    Map each trigram to the terms containing it, bucketed by trigram count
+
+    Bucketing by size lets a lookup skip terms whose length alone rules out
+    reaching the similarity threshold. Each bucket is a tuple of at most
+    FUZZY_MAX_BUCKET terms, most frequent first (freqs maps terms to their
+    number of occurrences; without it terms rank alphabetically).
+    """
+    trigram_index = {}
+    for term in terms:
+        grams = trigrams(term)
+        for gram in grams:
+            trigram_index.setdefault(gram, {}).setdefault(len(grams), []).append(term)
+    rank = (lambda term: (-freqs.get(term, 0), term)) if freqs else None
+    for buckets in trigram_index.values():
+        for size, bucket in buckets.items():
+            buckets[size] = tuple(heapq.nsmallest(FUZZY_MAX_BUCKET, bucket, key=rank))
+    return trigram_index
+
+def fuzzy_terms(token, trigram_index, threshold=FUZZY_THRESHOLD, limit=FUZZY_MAX_EXPANSIONS):
+    """
+    Return up to limit (term, similarity) pairs for vocabulary terms close to token
+
+    Only the terms kept in the token's trigram buckets are considered, so
+    the work per lookup is bounded; a rare term is only missed when every
+    bucket it shares with the token is full of more frequent terms.
+    """
+    grams = trigrams(token)
+    size = len(grams)
+    # Dice similarity 2c / (size + other) can only reach threshold in this size range
+    min_size = math.ceil(size * threshold / (2 - threshold))
+    max_size = math.floor(size * (2 - threshold) / threshold)
+
+    by_size = [trigram_index[gram] for gram in grams if gram in trigram_index]
+    candidates = []
+    for other_size in range(min_size, max_size + 1):
+        min_shared = math.ceil(threshold * (size + other_size) / 2)
+        buckets = [sizes[other_size] for sizes in by_size if other_size in sizes]
+        if len(buckets) < min_shared:
+            continue
+        counts = Counter(chain.from_iterable(buckets))
+        candidates.extend(
+            (term, 2 * shared / (size + other_size))
+            for term, shared in counts.items() if shared >= min_shared)
+    candidates.sort(key=lambda x: (-x[1], x[0]))
+    return candidates[:limit]
+
+def expand_query_tokens(query_tokens, index):
+    """
+    Replace query tokens missing from the vocabulary with close matches
+
+    Returns the expanded token list and a weight per token, where fuzzy
+    matches are weighted by their similarity to the typed token.
+    """
+    expanded = []
+    weights = {}
     for token in query_tokens:
-        if token in index:
-            for section in index[token]:
-                if section not in results:
-                    results[section] = 0
-                results[section] += 1
-    
-    # Sort results by relevance
-    sorted_results = sorted(results.items(), key=lambda x: x[1], reverse=True)
-    
-    # Prepare search results with snippets
+        if token in index["postings"] or len(token) < FUZZY_MIN_LENGTH:
+            expanded.append(token)
+            weights[token] = max(weights.get(token, 0.0), 1.0)
+            continue
+        for term, similarity in fuzzy_terms(token, index["trigrams"]):
+            expanded.append(term)
+            weights[term] = max(weights.get(term, 0.0), similarity)
+    return expanded, weights
+
+def bm25_term_score(tf, doc_freq, doc_length, index):
+    """BM25 contribution of a term seen tf times in a section"""
+    num_docs = len(index["doc_lengths"])
+    idf = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / (index["avg_doc_length"] or 1.0))
+    return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+def bm25_scores(query_tokens, index, weights=None):
+    """Score every section containing at least one query token with BM25"""
+    postings = index["postings"]
+    doc_lengths = index["doc_lengths"]
+    scores = {}
+
+    for token in set(query_tokens):
+        token_postings = postings.get(token)
+        if not token_postings:
+            continue
+        weight = weights.get(token, 1.0) if weights else 1.0
+        for section, positions in token_postings.items():
+            score = bm25_term_score(len(positions), len(token_postings), doc_lengths[section], index)
+            scores[section] = scores.get(section, 0.0) + weight * score
+
+    return scores
+
+def parse_query(query):
+    """Split a query into loose tokens and a token list per quoted phrase"""
+    phrases = [tokens for tokens in (preprocess_text(phrase) for phrase in PHRASE_RE.findall(query)) if tokens]
+    return preprocess_text(PHRASE_RE.sub(' ', query)), phrases
+
+def phrase_starts(phrase, section, index):
+    """Return the positions in a section where the phrase tokens occur consecutively"""
+    postings = index["postings"]
+    if any(section not in postings.get(token, {}) for token in phrase):
+        return []
+    starts = postings[phrase[0]][section]
+    for offset, token in enumerate(phrase[1:], 1):
+        # Merge the sorted position lists, shifting each by its offset in the phrase
+        positions = postings[token][section]
+        merged = []
+        i = j = 0
+        while i < len(starts) and j < len(positions):
+            shifted = positions[j] - offset
+            if starts[i] == shifted:
+                merged.append(starts[i])
+                i += 1
+                j += 1
+            elif starts[i] < shifted:
+                i += 1
+            else:
+                j += 1
+        starts = merged
+        if not starts:
+            break
+    return starts
+
+def phrase_scores(phrases, index):
+    """
+    Score the sections containing every phrase
+
+    Each phrase is scored like a BM25 term whose frequency is its number
+    of occurrences in the section.
+    """
+    scores = None
+    for phrase in phrases:
+        candidates = set(index["postings"].get(phrase[0], {})) if scores is None else set(scores)
+        matches = {}
+        for section in candidates:
+            starts = phrase_starts(phrase, section, index)
+            if starts:
+                matches[section] = len(starts)
+        scores = {
+            section: (scores[section] if scores else 0.0)
+            + bm25_term_score(tf, len(matches), index["doc_lengths"][section], index)
+            for section, tf in matches.items()
+        }
+        if not scores:
+            return {}
+    return scores or {}
+
+def minimal_window(position_lists):
+    """Length of the shortest token span holding a position from every list"""
+    events = list(heapq.merge(*([(position, i) for position in positions] for i, positions in enumerate(position_lists))))
+    counts = [0] * len(position_lists)
+    covered = 0
+    best = None
+    left = 0
+    for position, i in events:
+        if counts[i] == 0:
+            covered += 1
+        counts[i] += 1
+        while covered == len(position_lists):
+            left_position, left_i = events[left]
+            span = position - left_position + 1
+            if best is None or span < best:
+                best = span
+            counts[left_i] -= 1
+            if counts[left_i] == 0:
+                covered -= 1
+            left += 1
+    return best
+
+def proximity_boost(scores, query_tokens, index):
+    """Scale up sections where two or more distinct query terms occur near each other"""
+    terms = [term for term in dict.fromkeys(query_tokens) if term in index["postings"]]
+    if len(terms) < 2:
+        return scores
+    boosted = {}
+    for section, score in scores.items():
+        position_lists = [index["postings"][term][section] for term in terms if section in index["postings"][term]]
+        if len(position_lists) >= 2:
+            window = minimal_window(position_lists)
+            score *= 1 + PROXIMITY_BOOST * len(position_lists) / window
+        boosted[section] = score
+    return boosted
+
+def sentence_matches(section, query_terms, index):
+    """Count the distinct query terms found in each matching sentence of a section"""
+    token_sentences = index["token_sentences"][section]
+    matches = {}
+    for term in query_terms:
+        positions = index["postings"].get(term, {}).get(section, ())
+        for sentence_number in {token_sentences[position] for position in positions}:
+            matches[sentence_number] = matches.get(sentence_number, 0) + 1
+    return matches
+
+def highlight_spans(text, query_terms):
+    """Return (start, end) offsets of the words in text that match a query term"""
+    spans = []
+    for chunk in re.finditer(r'\S+', text):
+        # A whitespace-free chunk normalizes to a single token, as in preprocess_text
+        if normalize(chunk.group()) in query_terms:
+            word = re.search(r'\w(?:.*\w)?', chunk.group())
+            spans.append((chunk.start() + word.start(), chunk.start() + word.end()))
+    return spans
+
+def mark_highlights(text, highlights, before="**", after="**"):
+    """Wrap the highlighted spans of text in markers for rendering"""
+    marked = []
+    last = 0
+    for start, end in highlights:
+        marked.append(text[last:start] + before + text[start:end] + after)
+        last = end
+    marked.append(text[last:])
+    return "".join(marked)
+
+def format_results(ranked_sections, query_terms, index, content_dict, max_sentence_hits=3):
+    """
+    Build result dicts with snippets for (section, score) pairs, in order
+
+    Each result carries the best snippet plus up to max_sentence_hits
+    sentences from the section that contain query terms, ordered by how
+    many distinct terms they match, each with highlight offsets relative
+    to its own text.
+    """
     formatted_results = []
-    for section, score in sorted_results:
+    for section, score in ranked_sections:
         content = content_dict[section]
-        
-        # Find a relevant snippet
-        snippet = ""
-        best_match_count = 0
-        sentences = re.split(r'(?<=[.!?])\s+', content)
-        
-        for sentence in sentences:
-            match_count = sum(1 for token in query_tokens if token.lower() in sentence.lower())
-            if match_count > best_match_count:
-                best_match_count = match_count
-                snippet = sentence
-        
-        if not snippet and sentences:
-            snippet = sentences[0]  # Use first sentence if no good match
-            
+        spans = index["sentences"][section]
+
+        # Rank sentences by distinct query terms, earliest first on ties
+        matches = sentence_matches(section, query_terms, index)
+        ranked = sorted(matches, key=lambda number: (-matches[number], number))
+        sentence_hits = []
+        for number in ranked[:max_sentence_hits]:
+            sentence = content[spans[number][0]:spans[number][1]]
+            sentence_hits.append({
+                "sentence": sentence,
+                "matches": matches[number],
+                "highlights": highlight_spans(sentence, query_terms)
+            })
+
+        if sentence_hits:
+            snippet, highlights = sentence_hits[0]["sentence"], sentence_hits[0]["highlights"]
+        else:
+            # Use first sentence if no good match
+            snippet = content[spans[0][0]:spans[0][1]] if spans else ""
+            highlights = []
+
         formatted_results.append({
             "section": section,
             "score": score,
-            "snippet": snippet
+            "snippet": snippet,
+            "highlights": highlights,
+            "sentence_hits": sentence_hits
         })
-    
+
     return formatted_results
+
+def search_content(query, index, content_dict, limit=None, max_sentence_hits=3, fuzzy=True):
+    """
+    Search content using the index, ranking sections by BM25
+
+    Quoted phrases must appear verbatim (ignoring stopwords and
+    punctuation) and add their own phrase score; sections where the other
+    terms sit close together are boosted. Misspelled loose tokens are
+    expanded through the trigram index unless fuzzy is False. Only the top
+    limit sections get snippets built when a limit is given.
+    """
+    query_tokens, phrases = parse_query(query)
+    weights = None
+    if fuzzy:
+        query_tokens, weights = expand_query_tokens(query_tokens, index)
+    phrase_tokens = [token for phrase in phrases for token in phrase]
+    results = bm25_scores(query_tokens + phrase_tokens, index, weights)
+    if phrases:
+        results = {
+            section: results.get(section, 0.0) + score
+            for section, score in phrase_scores(phrases, index).items()
+        }
+    results = proximity_boost(results, query_tokens + phrase_tokens, index)
+
+    # Sort results by relevance
+    sorted_results = sorted(results.items(), key=lambda x: (-x[1], x[0]))
+    if limit is not None:
+        sorted_results = sorted_results[:limit]
+
+    return format_results(sorted_results, set(query_tokens + phrase_tokens), index, content_dict, max_sentence_hits)
+
+class TfidfSearchEngine:
+    """
+    Cosine similarity search over a sparse TF-IDF term-document matrix
+
+    The matrix is stored term-major in CSR form (indptr, section ids,
+    weights) built from an index's postings, with every section's column
+    normalized to unit length. A query is scored by gathering the rows of
+    its terms and summing them per section with one bincount, then the top
+    k sections are selected with argpartition.
+    """
+
+    def __init__(self, index):
+        import numpy as np
+
+        self.index = index
+        self.sections = sorted(index["doc_lengths"])
+        self.section_ids = section_ids = {section: i for i, section in enumerate(self.sections)}
+        num_docs = len(self.sections)
+
+        self.term_ids = {}
+        indptr = [0]
+        doc_ids = []
+        term_freqs = []
+        for term, term_postings in index["postings"].items():
+            self.term_ids[term] = len(self.term_ids)
+            for section, positions in term_postings.items():
+                doc_ids.append(section_ids[section])
+                term_freqs.append(len(positions))
+            indptr.append(len(doc_ids))
+
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.doc_ids = np.array(doc_ids, dtype=np.int32)
+        doc_freqs = np.diff(self.indptr)
+        # Smoothed idf so terms found in every section still carry weight
+        self.idf = np.log((1 + num_docs) / (1 + doc_freqs)) + 1
+        term_of_entry = np.repeat(np.arange(len(doc_freqs)), doc_freqs)
+        weights = (1 + np.log(np.array(term_freqs, dtype=np.float64))) * self.idf[term_of_entry]
+        norms = np.sqrt(np.bincount(self.doc_ids, weights=weights ** 2, minlength=num_docs))
+        self.weights = weights / np.where(norms > 0, norms, 1)[self.doc_ids]
+
+    def scores(self, query_tokens):
+        """Cosine similarity of the query with every section, as a dense array"""
+        import numpy as np
+
+        counts = {}
+        for token in query_tokens:
+            if token in self.term_ids:
+                counts[token] = counts.get(token, 0) + 1
+        if not counts:
+            return np.zeros(len(self.sections))
+
+        term_ids = np.array([self.term_ids[token] for token in counts])
+        query_weights = (1 + np.log(np.array(list(counts.values()), dtype=np.float64))) * self.idf[term_ids]
+        query_weights /= np.linalg.norm(query_weights)
+
+        starts, ends = self.indptr[term_ids], self.indptr[term_ids + 1]
+        entries = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+        entry_weights = np.repeat(query_weights, ends - starts) * self.weights[entries]
+        return np.bincount(self.doc_ids[entries], weights=entry_weights, minlength=len(self.sections))
+
+    def top_k(self, query_tokens, k=10, sections=None):
+        """
+        Return up to k (section, score) pairs with a positive score, best first
+
+        All of them are returned if k is None; sections, when given, limits
+        the ranking to those sections.
+        """
+        import numpy as np
+
+        scores = self.scores(query_tokens)
+        if sections is not None:
+            allowed = np.zeros(len(self.sections), dtype=bool)
+            allowed[[self.section_ids[section] for section in sections]] = True
+            scores = np.where(allowed, scores, 0)
+        candidates = np.flatnonzero(scores > 0)
+        if k is not None and len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = [(self.sections[i], float(scores[i])) for i in candidates]
+        return sorted(ranked, key=lambda x: (-x[1], x[0]))
+
+    def search(self, query, content_dict, limit=10, max_sentence_hits=3, fuzzy=True):
+        """
+        Search like search_content, returning the top limit sections by cosine similarity
+
+        Quoted phrases are required here too: only sections where every
+        phrase occurs verbatim are ranked.
+        """
+        query_tokens, phrases = parse_query(query)
+        if fuzzy:
+            query_tokens, _ = expand_query_tokens(query_tokens, self.index)
+        phrase_tokens = [token for phrase in phrases for token in phrase]
+        sections = phrase_scores(phrases, self.index) if phrases else None
+        ranked = self.top_k(query_tokens + phrase_tokens, limit, sections)
+        return format_results(ranked, set(query_tokens + phrase_tokens), self.index, content_dict, max_sentence_hits)
+
+class SearchCache:
+    """
+    Bounded LRU cache of search results keyed by normalized query
+
+    Keys combine the index content hash with the parsed query tokens and
+    phrases, so differently typed versions of one query share an entry and
+    entries for an old index are never returned after the content changes.
+    """
+
+    def __init__(self, max_entries=SEARCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+        return None
+
+    def put(self, key, results):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and occupancy, for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+_search_cache = SearchCache()
+
+def cached_search(query, index, content_dict, limit=None, max_sentence_hits=3, fuzzy=True, engine=None):
+    """
+    Run search_content (or engine.search) through the shared result cache
+
+    Results are copied in and out of the cache, so callers may modify them.
+    """
+    query_tokens, phrases = parse_query(query)
+    key = (
+        index["content_hash"],
+        "tfidf" if engine is not None else "bm25",
+        tuple(query_tokens),
+        tuple(tuple(phrase) for phrase in phrases),
+        limit,
+        max_sentence_hits,
+        fuzzy
+    )
+    results = _search_cache.get(key)
+    if results is None:
+        if engine is not None:
+            results = engine.search(query, content_dict, limit=limit, max_sentence_hits=max_sentence_hits, fuzzy=fuzzy)
+        else:
+            results = search_content(query, index, content_dict, limit, max_sentence_hits, fuzzy)
+        _search_cache.put(key, results)
+    return results
+
+def search_cache_stats():
+    """Return the search result cache counters"""
+    return _search_cache.stats()
+
+def clear_search_cache():
+    """Drop every cached search result"""
+    _search_cache.clear()
+
+class PrefixCompleter:
+    """
+    Prefix autocomplete over a vocabulary ranked by term frequency
+
+    Terms are kept in a sorted array so a prefix maps to a contiguous range
+    found with two binary searches. Every prefix whose range holds more
+    than COMPLETION_SCAN_LIMIT terms (a heavy trie node) has its top
+    suggestions precomputed, merged from its children's, so a lookup either
+    reads a stored list or ranks a short range with a bounded heap,
+    however many terms share the prefix.
+    """
+
+    def __init__(self, term_freqs, max_suggestions=5):
+        self.max_suggestions = max_suggestions
+        self.terms = sorted(term_freqs)
+        self.freqs = [term_freqs[term] for term in self.terms]
+        self.top = {}
+        if len(self.terms) > COMPLETION_SCAN_LIMIT:
+            self._precompute(0, len(self.terms), 0)
+
+    def _rank(self, indexes, limit):
+        """Return the limit most frequent of the given term indexes, ties alphabetical"""
+        return heapq.nsmallest(limit, indexes, key=lambda i: (-self.freqs[i], i))
+
+    def _precompute(self, start, end, depth):
+        """
+        Store the top suggestions of every heavy prefix below a heavy node
+
+        start:end is the range of terms sharing a prefix of length depth.
+        Returns the node's best term indexes, built from the terms its light
+        children hold and the stored lists of its heavy children, so every
+        term is ranked only once.
+        """
+        candidates = []
+        i = start
+        if len(self.terms[i]) == depth:
+            # The prefix itself is a term and sorts first
+            candidates.append(i)
+            i += 1
+        while i < end:
+            prefix = self.terms[i][:depth + 1]
+            child_end = bisect.bisect_left(self.terms, prefix + "\U0010ffff", i, end)
+            if child_end - i > COMPLETION_SCAN_LIMIT:
+                best = self._precompute(i, child_end, depth + 1)
+                self.top[prefix] = [self.terms[j] for j in best]
+                candidates.extend(best)
+            else:
+                candidates.extend(range(i, child_end))
+            i = child_end
+        return self._rank(candidates, self.max_suggestions)
+
+    @classmethod
+    def from_index(cls, index, max_suggestions=5):
+        """Build a completer from an index, using total occurrences as frequency"""
+        term_freqs = {
+            term: sum(len(positions) for positions in term_postings.values())
+            for term, term_postings in index["postings"].items()
+        }
+        return cls(term_freqs, max_suggestions)
+
+    def complete(self, prefix, limit=None):
+        """Return up to limit vocabulary terms starting with prefix, most frequent first"""
+        limit = min(limit or self.max_suggestions, self.max_suggestions)
+        if not prefix:
+            return []
+        if prefix in self.top:
+            return self.top[prefix][:limit]
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + "\U0010ffff", start)
+        return [self.terms[i] for i in self._rank(range(start, end), limit)]
+
+    def complete_query(self, query, limit=None):
+        """Return suggested queries completing the last word being typed"""
+        words = query.split()
+        if not words or query[-1].isspace():
+            return []
+        prefix = normalize(words[-1])
+        head = " ".join(words[:-1])
+        return [f"{head} {term}".strip() for term in self.complete(prefix, limit) if term != prefix]
@@ -1,4 +1,5 @@
 import streamlit as st
+from user_progress import record_debounced_view
 
 def initialize_session_state():
     """Initialize all required session state variables"""
@@ -7,7 +8,8 @@ def initialize_session_state():
         "navigation": "Home",
         "dark_mode": False,
         "current_highlight": None,
-        "current_structure": None
+        "current_structure": None,
+        "last_section_views": {}
     }
     
     for key, default_value in defaults.items():
@@ -16,4 +18,11 @@ def initialize_session_state():
     
     # Quiz state is now handled by quiz_state.py
     from quiz_state import initialize_quiz_state
-    initialize_quiz_state()
\ No newline at end of file
+    initialize_quiz_state()
+
+def record_section_view(section):
+    """Persist a section view unless one was recorded recently in this session"""
+    if not st.session_state.get("user_id"):
+        return
+    last_views = st.session_state.setdefault("last_section_views", {})
+    record_debounced_view(st.session_state.user_id, last_views, section)
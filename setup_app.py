@@ -35,6 +35,22 @@ def main():
     except Exception as e:
         logger.error(f"Error generating histology placeholders: {str(e)}")
     
+    # Compile study content and search index into a single bundle
+    try:
+        from content_bundle import build_bundle, save_bundle
+        save_bundle(build_bundle())
+        logger.info("Content bundle compiled successfully")
+    except Exception as e:
+        logger.error(f"Error compiling content bundle: {str(e)}")
+    
+    # Convert the quiz file into the memory-mapped question store
+    try:
+        from question_store import convert_quizzes
+        convert_quizzes()
+        logger.info("Question store converted successfully")
+    except Exception as e:
+        logger.error(f"Error converting question store: {str(e)}")
+    
     # Run deployment verification
     try:
         from verify_deployment import DeploymentVerifier
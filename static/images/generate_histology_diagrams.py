@@ -1,8 +1,13 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
+import sys
 import random
 import math
 
+# Allow running as a script from this directory; the manifest registry lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from content_registry import get_histology_slides, get_system, get_system_ids
+
 def generate_scale_bar(draw, width, height, font):
     """Generate a scale bar in the bottom right corner"""
     # Draw scale bar
@@ -985,21 +990,15 @@ def create_small_intestine_image(width, height, base_color):
 def generate_histology_images():
     """Generate detailed histology images for anatomy study app"""
     
-    # Define the histology images we need
-    histology_images = {
-        "lymphatic": [
-            {"name": "thymus", "title": "Thymus Histology", "color": (230, 240, 255)},
-            {"name": "lymph_node", "title": "Lymph Node Histology", "color": (230, 240, 255)},
-            {"name": "spleen", "title": "Spleen Histology", "color": (230, 240, 255)}
-        ],
-        "respiratory": [
-            {"name": "trachea", "title": "Trachea Histology", "color": (255, 240, 240)},
-            {"name": "lung", "title": "Lung Histology", "color": (255, 240, 240)}
-        ],
-        "digestive": [
-            {"name": "esophagus_stomach", "title": "Esophagus-Stomach Junction", "color": (240, 255, 240)},
-            {"name": "small_intestine", "title": "Small Intestine", "color": (240, 255, 240)}
-        ]
+    # Renderers for the tissues we can draw; manifest slides without one get a plain slide
+    tissue_renderers = {
+        "thymus": create_thymus_image,
+        "lymph_node": create_lymph_node_image,
+        "spleen": create_spleen_image,
+        "trachea": create_trachea_image,
+        "lung": create_lung_image,
+        "esophagus_stomach": create_esophagus_stomach_image,
+        "small_intestine": create_small_intestine_image
     }
     
     # Define image dimensions
@@ -1008,31 +1007,19 @@ def generate_histology_images():
     # Create base directory if it doesn't exist
     base_dir = os.path.dirname(os.path.abspath(__file__))
     
-    # Generate the histology images
-    for system, images in histology_images.items():
+    # Generate the histology images listed in the content manifest
+    for system in get_system_ids():
         # Ensure system directory exists
         system_dir = os.path.join(base_dir, "histology", system)
         os.makedirs(system_dir, exist_ok=True)
+        base_color = tuple(get_system(system).get("histology_color", (240, 240, 240)))
         
-        for img_info in images:
+        for img_info in get_histology_slides(system):
             img_path = os.path.join(system_dir, f"{img_info['name']}.png")
-            base_color = img_info['color']
             
             # Create specific tissue type image
-            if img_info['name'] == 'thymus':
-                img = create_thymus_image(width, height, base_color)
-            elif img_info['name'] == 'lymph_node':
-                img = create_lymph_node_image(width, height, base_color)
-            elif img_info['name'] == 'spleen':
-                img = create_spleen_image(width, height, base_color)
-            elif img_info['name'] == 'trachea':
-                img = create_trachea_image(width, height, base_color)
-            elif img_info['name'] == 'lung':
-                img = create_lung_image(width, height, base_color)
-            elif img_info['name'] == 'esophagus_stomach':
-                img = create_esophagus_stomach_image(width, height, base_color)
-            elif img_info['name'] == 'small_intestine':
-                img = create_small_intestine_image(width, height, base_color)
+            renderer = tissue_renderers.get(img_info['name'])
+            img = renderer(width, height, base_color) if renderer else Image.new('RGB', (width, height), base_color)
             
             # Add title
             draw = ImageDraw.Draw(img)
@@ -1,7 +1,7 @@
 import streamlit as st
-import os
 import logging
-from user_progress import update_viewed_section
+from session_state import record_section_view
+from content_registry import get_diagram, get_histological_features, get_histology_slides, get_study_page, get_system
 from image_utils import get_image_path, ensure_directories_exist
 
 # Set up logging
@@ -11,6 +11,11 @@ logger = logging.getLogger('tabbed_interface')
 # Ensure required directories exist at import time
 ensure_directories_exist()
 
+def section_toggle(label, key, value=False):
+    """Show an open/closed switch for a study section"""
+    # st.expander always sends its body to the browser, so a toggle decides whether to render it
+    return st.toggle(label, value=value, key=key)
+
 def tabbed_study_interface(section):
     """
     Creates a tabbed interface for study content with text, histology, and interactive diagrams
@@ -18,19 +23,15 @@ def tabbed_study_interface(section):
     Args:
         section: The anatomical section name (e.g., "lymphatic", "respiratory", "digestive")
     """
-    # Record that user has viewed this section
-    if "user_id" in st.session_state:
-        update_viewed_section(st.session_state.user_id, section.lower())
+    # Record that user has viewed this section; widget reruns within the debounce window are skipped
+    record_section_view(section.lower())
     
-    # Create a mapping of system names to their full titles
-    system_titles = {
-        "lymphatic": "Lymphatic System",
-        "respiratory": "Respiratory System",
-        "digestive": "Digestive System"
-    }
+    # System titles come from the content manifest
+    system = get_system(section)
+    system_title = system["title"] if system else section.capitalize() + " System"
     
     # Display the system title
-    st.title(system_titles.get(section, section.capitalize() + " System"))
+    st.title(system_title)
     
     # Create tabs for different content types
     study_tab, histology_tab, interactive_tab = st.tabs([
@@ -39,37 +40,24 @@ def tabbed_study_interface(section):
         "🔄 Interactive Diagram"
     ])
     
-    # Load HTML content for the study tab
+    # HTML content for the study tab comes from the content registry
     with study_tab:
-        with open(os.path.join('data', 'knowledge', f'{section}.html'), 'r', encoding='utf-8') as file:
-            content = file.read()
+        page = get_study_page(section)
         
         # Use CSS class for styling
-        st.markdown(f'<div class="study-content">{content}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="study-content">{page["intro"]}</div>', unsafe_allow_html=True)
+        
+        # Each <h2> section is collapsible and its body is only sent when opened
+        for i, part in enumerate(page["parts"]):
+            if section_toggle(part["title"], key=f"study_part_{section}_{i}", value=(i == 0)):
+                st.markdown(f'<div class="study-content">{part["html"]}</div>', unsafe_allow_html=True)
     
     # Display histology slides in the histology tab
     with histology_tab:
-        st.subheader(f"{system_titles.get(section, section.capitalize())} Histology")
-        
-        # Define histology images for each system
-        histology_images = {
-            "lymphatic": [
-                {"name": "thymus", "title": "Thymus Histology", "description": "T-cell maturation site"},
-                {"name": "lymph_node", "title": "Lymph Node Histology", "description": "Shows germinal centers and medulla"},
-                {"name": "spleen", "title": "Spleen Histology", "description": "Red and white pulp regions"}
-            ],
-            "respiratory": [
-                {"name": "trachea", "title": "Trachea Histology", "description": "Pseudo-stratified ciliated columnar epithelium"},
-                {"name": "lung", "title": "Lung Histology", "description": "Alveolar architecture"}
-            ],
-            "digestive": [
-                {"name": "esophagus_stomach", "title": "Esophagus-Stomach Junction", "description": "Transition from stratified squamous to simple columnar epithelium"},
-                {"name": "small_intestine", "title": "Small Intestine", "description": "Villi and microvilli structures"}
-            ]
-        }
+        st.subheader(f"{system_title} Histology")
         
-        # Get histology images for the current section
-        section_images = histology_images.get(section, [])
+        # Slide metadata is served from the content registry
+        section_images = get_histology_slides(section)
         
         if section_images:
             # Create a selector for different histology slides
@@ -109,94 +97,13 @@ def tabbed_study_interface(section):
     
     # Display interactive diagrams in the interactive tab
     with interactive_tab:
-        st.subheader(f"Interactive {system_titles.get(section, section.capitalize())} Diagram")
+        st.subheader(f"Interactive {system_title} Diagram")
         
         # Import the interactive diagram functions dynamically
-        from interactive_diagrams import (
-            lymph_node_interactive, 
-            respiratory_system_interactive,
-            digestive_system_interactive
-        )
+        from interactive_diagrams import system_diagram_interactive
         
-        # Display the appropriate interactive diagram
-        if section == "lymphatic":
-            lymph_node_interactive()
-        elif section == "respiratory":
-            respiratory_system_interactive()
-        elif section == "digestive":
-            digestive_system_interactive()
+        # Display the diagram listed for this system in the manifest
+        if get_diagram(section):
+            system_diagram_interactive(section)
         else:
             st.warning("No interactive diagram available for this section.")
-
-def get_histological_features(system, image_name):
-    """
-    Returns key histological features for a given system and image
-    
-    Args:
-        system: Anatomical system name
-        image_name: Name of the histology image
-        
-    Returns:
-        Dictionary of feature names and descriptions
-    """
-    # Define features for each histology image
-    features = {
-        "lymphatic": {
-            "thymus": {
-                "Cortex": "Densely packed area of immature T cells (thymocytes)",
-                "Medulla": "Less dense area with mature T cells",
-                "Hassall's Corpuscles": "Concentric whorls of epithelial cells in the medulla",
-                "Capsule": "Thin connective tissue covering"
-            },
-            "lymph_node": {
-                "Cortex": "Outer region containing lymphoid follicles",
-                "Germinal Centers": "Sites of B cell proliferation",
-                "Paracortex": "T cell-rich area",
-                "Medulla": "Inner region with medullary cords",
-                "Subcapsular Sinus": "Space beneath the capsule where afferent lymph enters"
-            },
-            "spleen": {
-                "White Pulp": "Lymphoid tissue surrounding arterioles",
-                "Red Pulp": "Blood-filled spaces where RBCs are filtered",
-                "Marginal Zone": "Boundary between red and white pulp",
-                "Trabecular Arteries": "Branches of splenic artery",
-                "Venous Sinuses": "Specialized blood vessels in red pulp"
-            }
-        },
-        "respiratory": {
-            "trachea": {
-                "Pseudostratified Epithelium": "Ciliated columnar cells with goblet cells",
-                "Lamina Propria": "Loose connective tissue below epithelium",
-                "Submucosal Glands": "Produce mucus and serous secretions",
-                "Hyaline Cartilage": "C-shaped rings providing structural support",
-                "Trachealis Muscle": "Smooth muscle connecting ends of cartilage rings"
-            },
-            "lung": {
-                "Alveoli": "Terminal air sacs where gas exchange occurs",
-                "Type I Pneumocytes": "Thin squamous cells forming most of alveolar surface",
-                "Type II Pneumocytes": "Cuboidal cells that produce surfactant",
-                "Alveolar Macrophages": "Phagocytic cells that remove debris",
-                "Capillary Network": "Dense network surrounding alveoli"
-            }
-        },
-        "digestive": {
-            "esophagus_stomach": {
-                "Stratified Squamous Epithelium": "Multiple layers of flattened cells in esophagus",
-                "Simple Columnar Epithelium": "Single layer of tall cells in stomach",
-                "Z-line": "Abrupt transition between epithelial types",
-                "Gastric Pits": "Invaginations in stomach mucosa",
-                "Parietal Cells": "Acid-producing cells in stomach glands"
-            },
-            "small_intestine": {
-                "Villi": "Finger-like projections increasing surface area",
-                "Microvilli": "Tiny projections forming the brush border",
-                "Crypts of Lieberkühn": "Glands between villi containing stem cells",
-                "Goblet Cells": "Mucus-secreting cells",
-                "Paneth Cells": "Cells at crypt bases containing defensive granules",
-                "Lamina Propria": "Connective tissue core of villi"
-            }
-        }
-    }
-    
-    # Return features for the specific system and image, or empty dict if not found
-    return features.get(system, {}).get(image_name, {})
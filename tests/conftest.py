@@ -0,0 +1,12 @@
+"""
+Shared test configuration
+"""
+import pytest
+from progress_store import set_progress_store
+
+@pytest.fixture(autouse=True)
+def reset_progress_store():
+    """Give every test a freshly configured progress store"""
+    set_progress_store(None)
+    yield
+    set_progress_store(None)
@@ -0,0 +1,107 @@
+"""
+Tests for the content_bundle module
+"""
+import os
+import shutil
+import tempfile
+import pytest
+import content_bundle
+from content_bundle import build_bundle, bundle_is_current, get_bundle, heading_outline, load_bundle, reset_bundle, save_bundle
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge")
+
+@pytest.fixture
+def knowledge_copy():
+    """Copy the knowledge pages to a temporary directory that tests may edit"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        knowledge_dir = os.path.join(temp_dir, "knowledge")
+        shutil.copytree(KNOWLEDGE_DIR, knowledge_dir)
+        reset_bundle()
+        yield temp_dir, knowledge_dir
+        reset_bundle()
+
+def test_bundle_contents():
+    """Test that the bundle holds html, text, outline, hashes and the search index"""
+    bundle = build_bundle(KNOWLEDGE_DIR)
+
+    assert set(bundle["sections"]) == {"digestive", "lymphatic", "respiratory"}
+    lymphatic = bundle["sections"]["lymphatic"]
+    with open(os.path.join(KNOWLEDGE_DIR, "lymphatic.html"), encoding="utf-8") as f:
+        assert lymphatic["html"] == f.read()
+    assert "<" not in lymphatic["text"]
+    assert lymphatic["outline"][0]["level"] == 1
+    assert bundle["index"]["content_hash"] == bundle["content_hash"]
+    assert set(bundle["index"]["doc_lengths"]) == set(bundle["sections"])
+
+def test_heading_outline():
+    """Test that headings are listed in order with their levels"""
+    outline = heading_outline("<h1>Lymph</h1><p>x</p><h2 id='a'>Nodes &amp; <em>vessels</em></h2><h3>Cortex</h3>")
+    assert outline == [
+        {"level": 1, "title": "Lymph"},
+        {"level": 2, "title": "Nodes & vessels"},
+        {"level": 3, "title": "Cortex"}
+    ]
+
+def test_save_load_and_staleness(knowledge_copy):
+    """Test the round trip and that edits or copies are detected correctly"""
+    temp_dir, knowledge_dir = knowledge_copy
+    path = os.path.join(temp_dir, "bundle.pkl")
+    bundle = build_bundle(knowledge_dir)
+    save_bundle(bundle, path)
+
+    loaded = load_bundle(path)
+    assert loaded == bundle
+    assert bundle_is_current(loaded, knowledge_dir)
+
+    # Touching a file without changing it keeps the bundle valid
+    page = os.path.join(knowledge_dir, "lymphatic.html")
+    os.utime(page, (1, 1))
+    assert bundle_is_current(loaded, knowledge_dir)
+
+    with open(page, "a", encoding="utf-8") as f:
+        f.write("<p>Edited.</p>")
+    assert not bundle_is_current(loaded, knowledge_dir)
+    assert load_bundle(os.path.join(temp_dir, "missing.pkl")) is None
+
+def test_get_bundle_loads_once(knowledge_copy, monkeypatch):
+    """Test that the bundle is read once per process and rebuilt in memory when stale"""
+    temp_dir, knowledge_dir = knowledge_copy
+    path = os.path.join(temp_dir, "bundle.pkl")
+    save_bundle(build_bundle(knowledge_dir), path)
+
+    loads = []
+    original_load = content_bundle.load_bundle
+    monkeypatch.setattr(content_bundle, "load_bundle", lambda p: loads.append(p) or original_load(p))
+
+    first = get_bundle(knowledge_dir, path)
+    assert get_bundle(knowledge_dir, path) is first
+    assert loads == [path]
+
+    # Edits are picked up on the next call without a restart
+    with open(os.path.join(knowledge_dir, "digestive.html"), "a", encoding="utf-8") as f:
+        f.write("<p>Brand new villi sentence.</p>")
+    rebuilt = get_bundle(knowledge_dir, path)
+    assert "Brand new villi sentence." in rebuilt["sections"]["digestive"]["text"]
+    assert rebuilt["content_hash"] != first["content_hash"]
+    assert get_bundle(knowledge_dir, path) is rebuilt
+    assert loads == [path]
+
+def test_split_sections():
+    """Test that pages are split at each <h2> with the heading text as title"""
+    from content_bundle import split_sections
+
+    intro, parts = split_sections("<h1>Lymph</h1>\n<h2>Overview</h2>\n<p>A</p>\n<h2 class='x'>Key <em>Parts</em></h2><ul><li>B</li></ul>")
+    assert intro == "<h1>Lymph</h1>"
+    assert parts == [
+        {"title": "Overview", "html": "<p>A</p>"},
+        {"title": "Key Parts", "html": "<ul><li>B</li></ul>"}
+    ]
+    assert split_sections("<p>No headings</p>") == ("<p>No headings</p>", [])
+
+def test_bundle_parts_cover_page():
+    """Test that the split parts of every page keep all of its content"""
+    bundle = build_bundle(KNOWLEDGE_DIR)
+    for page in bundle["sections"].values():
+        assert len(page["parts"]) == sum(1 for item in page["outline"] if item["level"] == 2)
+        for part in page["parts"]:
+            assert part["html"] in page["html"]
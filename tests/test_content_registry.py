@@ -0,0 +1,110 @@
+"""
+Tests for the content_registry module
+"""
+import json
+import os
+import shutil
+import tempfile
+import pytest
+import content_registry
+from content_registry import (
+    clear_registry,
+    get_diagram,
+    get_histological_features,
+    get_histology_slides,
+    get_search_data,
+    get_system,
+    get_system_by_title,
+    get_system_ids,
+)
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "content_manifest.json")
+
+@pytest.fixture
+def manifest_copy():
+    """Copy the content manifest to a temporary file that tests may edit"""
+    clear_registry()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "content_manifest.json")
+        shutil.copy(MANIFEST_PATH, path)
+        yield path
+    clear_registry()
+
+def test_histology_lookups(manifest_copy):
+    """Test slide lists and feature lookups from the metadata file"""
+    slides = get_histology_slides("lymphatic", manifest_copy)
+    assert [slide["name"] for slide in slides] == ["thymus", "lymph_node", "spleen"]
+    assert get_histological_features("lymphatic", "spleen", manifest_copy)["White Pulp"].startswith("Lymphoid")
+    assert get_histological_features("lymphatic", "lung", manifest_copy) == {}
+    assert get_histology_slides("skeletal", manifest_copy) == []
+
+def test_manifest_loaded_once_and_reloaded_on_edit(manifest_copy, monkeypatch):
+    """Test that the file is parsed once and re-parsed after it changes"""
+    loads = []
+    original = content_registry.load_manifest
+    monkeypatch.setattr(content_registry, "load_manifest", lambda path: loads.append(path) or original(path))
+
+    first = get_histology_slides("respiratory", manifest_copy)
+    assert get_histology_slides("respiratory", manifest_copy) is first
+    get_histological_features("respiratory", "lung", manifest_copy)
+    assert len(loads) == 1
+
+    with open(manifest_copy, encoding="utf-8") as f:
+        data = json.load(f)
+    data["systems"][1]["histology"][0]["title"] = "Edited Trachea"
+    with open(manifest_copy, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    assert get_histology_slides("respiratory", manifest_copy)[0]["title"] == "Edited Trachea"
+    assert len(loads) == 2
+
+def test_search_data_follows_bundle(monkeypatch):
+    """Test that search data is reused until the bundle content hash changes"""
+    clear_registry()
+    bundle = {"content_hash": "a", "sections": {"x": {"text": "Thymus."}}, "index": {"content_hash": "a"}}
+    monkeypatch.setattr(content_registry, "get_bundle", lambda: bundle)
+
+    content_dict, index = get_search_data()
+    assert content_dict == {"x": "Thymus."}
+    assert get_search_data()[0] is content_dict
+
+    bundle = {"content_hash": "b", "sections": {"x": {"text": "Spleen."}}, "index": {"content_hash": "b"}}
+    assert get_search_data()[0] == {"x": "Spleen."}
+    clear_registry()
+
+def test_systems_and_diagrams(manifest_copy):
+    """Test system lookups by id and navigation title, and diagram structures"""
+    assert get_system_ids(manifest_copy) == ["lymphatic", "respiratory", "digestive"]
+    assert get_system("respiratory", manifest_copy)["title"] == "Respiratory System"
+    assert get_system_by_title("Digestive System", manifest_copy)["id"] == "digestive"
+    assert get_system_by_title("Quiz", manifest_copy) is None
+
+    diagram = get_diagram("lymphatic", manifest_copy)
+    assert diagram["name"] == "lymph_node"
+    assert "germinal_center" in [structure["name"] for structure in diagram["structures"]]
+
+def test_new_system_needs_no_code(manifest_copy):
+    """Test that a system added to the manifest shows up in every lookup"""
+    with open(manifest_copy, encoding="utf-8") as f:
+        data = json.load(f)
+    data["systems"].append({
+        "id": "skeletal",
+        "title": "Skeletal System",
+        "histology": [{"name": "compact_bone", "title": "Compact Bone", "description": "Osteons", "features": {"Osteon": "Haversian system"}}]
+    })
+    with open(manifest_copy, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    assert get_system_ids(manifest_copy)[-1] == "skeletal"
+    assert get_system_by_title("Skeletal System", manifest_copy)["id"] == "skeletal"
+    assert get_histological_features("skeletal", "compact_bone", manifest_copy) == {"Osteon": "Haversian system"}
+    assert get_diagram("skeletal", manifest_copy) is None
+
+def test_manifest_matches_repository_files():
+    """Test that every manifest system has a summary, a knowledge page and histology images"""
+    root = os.path.dirname(MANIFEST_PATH)
+    for system in get_system_ids(MANIFEST_PATH):
+        assert get_system(system, MANIFEST_PATH)["summary"]
+        assert os.path.exists(os.path.join(root, "knowledge", f"{system}.html"))
+        for slide in get_histology_slides(system, MANIFEST_PATH):
+            assert os.path.exists(os.path.join(os.path.dirname(root), "static", "images", "histology", system, f"{slide['name']}.png"))
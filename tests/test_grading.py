@@ -0,0 +1,149 @@
+"""
+Tests for the grading module
+"""
+import pytest
+import grading
+from grading import (
+    PARTIAL_CREDIT,
+    AnswerSynonyms,
+    answer_credit,
+    answer_similarity,
+    get_answer_synonyms,
+    grade_quiz,
+)
+
+QUESTIONS = [
+    {"id": "fr", "type": "free_response", "question": "?", "answer": "Germinal center"},
+    {"id": "mc", "type": "multiple_choice", "question": "?", "options": ["Liver", "Spleen"], "answer": "Liver"},
+    {"id": "id", "type": "identification", "question": "?", "answer": "Alveoli"},
+    {"id": "ma", "type": "matching", "question": "?", "pairs": [
+        {"item": "Thymus", "match": "T cell development"},
+        {"item": "Spleen", "match": "Blood filtration"},
+    ]},
+]
+
+def test_grade_all_correct():
+    """Test that correct answers of every type score a point each"""
+    responses = {
+        "fr": "  germinal CENTER ",
+        "mc": "Liver",
+        "id": "alveoli",
+        "ma": {"Thymus": "T cell development", "Spleen": "Blood filtration"},
+    }
+    result = grade_quiz(QUESTIONS, responses)
+
+    assert result["score"] == 4
+    assert result["total"] == 4
+    assert all(verdict["correct"] for verdict in result["verdicts"].values())
+    assert result["verdicts"]["ma"]["correct_count"] == 2
+
+def test_grade_wrong_and_missing_answers():
+    """Test verdicts for wrong, unanswered and partly matched questions"""
+    responses = {"fr": "Medulla", "ma": {"Thymus": "T cell development", "Spleen": "Lymph filtration"}}
+    result = grade_quiz(QUESTIONS, responses)
+    verdicts = result["verdicts"]
+
+    assert result["score"] == 0
+    assert verdicts["fr"]["credit"] == 0 and not verdicts["fr"]["correct"]
+    assert verdicts["fr"]["response"] == "Medulla" and verdicts["fr"]["expected"] == "Germinal center"
+    assert verdicts["mc"]["response"] is None and not verdicts["mc"]["correct"]
+    assert verdicts["id"]["response"] == ""
+    assert verdicts["ma"]["correct_count"] == 1
+    assert [pair["correct"] for pair in verdicts["ma"]["pairs"]] == [True, False]
+
+def test_unknown_question_type():
+    """Test that an unsupported question type is reported"""
+    with pytest.raises(ValueError):
+        grade_quiz([{"id": "x", "type": "essay"}], {})
+
+def test_typed_answers_ignore_articles_case_and_plurals():
+    """Test that wording differences which keep the meaning get full credit"""
+    questions = [
+        {"id": "wp", "type": "identification", "question": "?", "answer": "White pulp"},
+        {"id": "hc", "type": "identification", "question": "?", "answer": "Hassall's corpuscle"},
+        {"id": "lb", "type": "free_response", "question": "?", "answer": "Superior, middle, and inferior lobes."},
+    ]
+    responses = {"wp": "the white pulp", "hc": "Hassall corpuscles", "lb": "superior lobe, middle lobe and inferior lobe"}
+    result = grade_quiz(questions, responses)
+
+    assert result["score"] == 3
+    assert all(verdict["similarity"] == 1.0 for verdict in result["verdicts"].values())
+
+def test_synonyms_and_misspellings():
+    """Test that synonyms and misspelled long words match the answer key"""
+    synonyms = get_answer_synonyms()
+    for answer, response in [
+        ("Type II pneumocyte", "type 2 pneumocytes"),
+        ("Germinal center", "germnal centre"),
+        ("Alveoli", "air sacs"),
+        ("Emphysema", "emphysma"),
+        ("Bronchiole", "bronchoile"),
+        ("Pseudostratified ciliated columnar epithelium", "pseudostratifed ciliated colmnar epithelium"),
+    ]:
+        assert answer_similarity(synonyms.answer_key(answer), synonyms.tokens(response)) == 1.0
+
+def test_misspelled_synonyms():
+    """Test that a misspelled synonym still reaches the key's canonical spelling"""
+    synonyms = get_answer_synonyms()
+    for answer, response in [
+        ("Alveoli", "alveolli"),
+        ("Alveolus", "alveolli"),
+        ("Esophagus", "oesophogus"),
+        ("Germinal center", "germinal cenrte"),
+        ("Type I pneumocyte", "squamous alveolar cel"),
+    ]:
+        key = synonyms.answer_key(answer)
+        assert answer_similarity(key, synonyms.tokens(response, fuzzy=True)) == 1.0
+
+    result = grade_quiz(QUESTIONS, {"id": "alveolli"})
+    assert result["verdicts"]["id"]["correct"]
+
+def test_partial_and_no_credit():
+    """Test that incomplete answers get partial credit and wrong ones none"""
+    questions = [
+        {"id": "lb", "type": "free_response", "question": "?", "answer": "Superior, middle, and inferior lobes."},
+        {"id": "wp", "type": "identification", "question": "?", "answer": "White pulp"},
+        {"id": "t2", "type": "identification", "question": "?", "answer": "Type II pneumocyte"},
+    ]
+    responses = {"lb": "superior and inferior lobes", "wp": "red pulp", "t2": "type I pneumocyte"}
+    verdicts = grade_quiz(questions, responses)["verdicts"]
+
+    assert verdicts["lb"]["credit"] == PARTIAL_CREDIT and not verdicts["lb"]["correct"]
+    assert verdicts["wp"]["credit"] == 0
+    assert verdicts["t2"]["credit"] == 0
+
+def test_short_answer_rule_can_be_turned_off(monkeypatch):
+    """Test that short keys give partial credit when GRADING_SHORT_ANSWER_TOKENS is 0"""
+    synonyms = get_answer_synonyms()
+    key = synonyms.answer_key("Type II pneumocyte")
+    similarity = answer_similarity(key, synonyms.tokens("type I pneumocyte"))
+    assert answer_credit(similarity, key) == 0
+
+    monkeypatch.setattr(grading, "SHORT_ANSWER_TOKENS", 0)
+    assert answer_credit(similarity, key) == PARTIAL_CREDIT
+
+def test_different_terms_are_not_typos():
+    """Test that words differing by a meaningful prefix or ending get no credit"""
+    synonyms = get_answer_synonyms()
+    for answer, response in [
+        ("Afferent", "efferent"),
+        ("Afferent vessels", "efferent vessels"),
+        ("Hyperplasia", "hypoplasia"),
+        ("Hypothalamus", "thalamus"),
+        ("Submucosa", "mucosa"),
+        ("Bronchiole", "bronchi"),
+    ]:
+        key = synonyms.answer_key(answer)
+        similarity = answer_similarity(key, synonyms.tokens(response))
+        assert similarity < 1.0
+        assert answer_credit(similarity, key) == 0
+
+def test_answer_keys_are_built_once():
+    """Test that each expected answer is preprocessed once and reused"""
+    synonyms = AnswerSynonyms([["lymph node", "lymph gland"]])
+    key = synonyms.answer_key("Lymph nodes")
+
+    assert key.tokens == ("lymph", "node")
+    assert synonyms.answer_key("Lymph nodes") is key
+    assert answer_similarity(key, synonyms.tokens("a lymph gland")) == 1.0
+    assert answer_similarity(synonyms.answer_key("Villi"), synonyms.tokens("")) == 0.0
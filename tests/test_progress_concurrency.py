@@ -0,0 +1,69 @@
+"""
+Stress test for concurrent progress writes from several worker processes
+"""
+import json
+import multiprocessing
+import os
+import tempfile
+import pytest
+from progress_store import JSONProgressStore, ProgressConflictError, set_progress_store
+
+USER_ID = "shared-user"
+WORKERS = 6
+UPDATES_PER_WORKER = 25
+
+def hammer(directory, worker):
+    """Record views and quizzes for one user while compacting and re-saving"""
+    from user_progress import update_quiz_history, update_viewed_section
+
+    store = JSONProgressStore(directory)
+    set_progress_store(store)
+    conflicts = 0
+    for i in range(UPDATES_PER_WORKER):
+        update_viewed_section(USER_ID, "lymphatic")
+        update_quiz_history(USER_ID, {"score": i % 10, "total": 10, "difficulty": "beginner"}, "lymphatic")
+
+        if i % 5 == worker % 5:
+            store.compact(USER_ID)
+        if i % 7 == worker % 7:
+            # Read-modify-write of the whole document must never lose events
+            progress = store.load(USER_ID)
+            try:
+                store.save(USER_ID, progress)
+            except ProgressConflictError:
+                conflicts += 1
+    return conflicts
+
+@pytest.fixture
+def shared_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+def test_concurrent_writers_lose_nothing(shared_dir):
+    """Test that many processes updating one user never lose entries or corrupt the snapshot"""
+    store = JSONProgressStore(shared_dir)
+    store.save(USER_ID, {
+        "user_id": USER_ID,
+        "quiz_history": [],
+        "viewed_sections": {"lymphatic": []},
+        "mastery_levels": {"lymphatic": 0}
+    })
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(WORKERS) as pool:
+        pool.starmap(hammer, [(shared_dir, worker) for worker in range(WORKERS)])
+
+    expected = WORKERS * UPDATES_PER_WORKER
+    progress = store.load(USER_ID)
+    assert len(progress["viewed_sections"]["lymphatic"]) == expected
+    assert len(progress["quiz_history"]) == expected
+
+    # The snapshot on disk is always a complete document
+    with open(store.path_for(USER_ID)) as f:
+        json.load(f)
+    assert not [name for name in os.listdir(shared_dir) if name.endswith(".tmp")]
+
+    # Compacting everything that is left changes nothing
+    store.compact(USER_ID)
+    compacted = store.load(USER_ID)
+    assert compacted == progress
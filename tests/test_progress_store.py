@@ -0,0 +1,459 @@
+"""
+Tests for the progress_store module
+"""
+import os
+import tempfile
+import threading
+import time
+import pytest
+import progress_store
+from progress_store import (
+    CachedProgressStore,
+    JSONProgressStore,
+    SQLiteProgressStore,
+    WriteBehindProgressStore,
+    ProgressConflictError,
+    migrate_progress,
+    set_progress_store,
+)
+from user_progress import (
+    get_quiz_aggregates,
+    initialize_user_progress,
+    load_user_progress,
+    update_quiz_history,
+    update_viewed_section,
+)
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        original_dir = os.getcwd()
+        try:
+            os.chdir(temp_dir)
+            yield temp_dir
+        finally:
+            os.chdir(original_dir)
+
+@pytest.fixture
+def sqlite_store(temp_dir):
+    """Route user_progress through a SQLite store for the duration of a test"""
+    store = SQLiteProgressStore(os.path.join(temp_dir, "progress.db"))
+    set_progress_store(store)
+    yield store
+    store.close()
+    set_progress_store(None)
+
+def quiz(score, total=10, difficulty="beginner"):
+    return {"score": score, "total": total, "difficulty": difficulty}
+
+def test_sqlite_round_trip(sqlite_store):
+    """Test that progress written through user_progress reads back intact"""
+    user_id = "sqlite-user"
+    initialize_user_progress(user_id)
+    update_viewed_section(user_id, "respiratory")
+    update_viewed_section(user_id, "respiratory")
+    for score in (10, 10, 10):
+        update_quiz_history(user_id, quiz(score), "lymphatic")
+
+    progress = load_user_progress(user_id)
+    assert len(progress["viewed_sections"]["respiratory"]) == 2
+    assert progress["viewed_sections"]["digestive"] == []
+    assert len(progress["quiz_history"]) == 3
+    assert progress["mastery_levels"]["lymphatic"] == 3
+    assert progress["mastery_levels"]["digestive"] == 0
+
+def test_sqlite_events_are_single_row_inserts(sqlite_store):
+    """Test that recording a view inserts one row instead of rewriting history"""
+    user_id = "sqlite-user"
+    initialize_user_progress(user_id)
+    update_viewed_section(user_id, "lymphatic")
+    with sqlite_store._connected() as conn:
+        first_id = conn.execute("SELECT MAX(id) FROM section_views").fetchone()[0]
+
+    update_viewed_section(user_id, "lymphatic")
+    with sqlite_store._connected() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM section_views ORDER BY id")]
+    assert ids == [first_id, first_id + 1]
+
+def test_sqlite_uses_wal(sqlite_store):
+    """Test that the SQLite store enables write-ahead logging"""
+    with sqlite_store._connected() as conn:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_sqlite_shares_one_connection_between_threads(sqlite_store, monkeypatch):
+    """Test that script threads reuse the store's connection instead of setting up their own"""
+    opened = []
+    open_connection = sqlite_store._open
+    monkeypatch.setattr(sqlite_store, "_open", lambda: opened.append(1) or open_connection())
+    initialize_user_progress("sqlite-user")
+
+    def rerun():
+        update_viewed_section("sqlite-user", "lymphatic")
+
+    threads = [threading.Thread(target=rerun) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1
+    assert len(load_user_progress("sqlite-user")["viewed_sections"]["lymphatic"]) == 4
+
+def test_mastery_matches_between_backends(temp_dir):
+    """Test that both backends compute the same mastery levels"""
+    scores = [9, 4, 8, 8, 7, 10]
+    results = []
+    for store in (JSONProgressStore(os.path.join(temp_dir, "json")),
+                  SQLiteProgressStore(os.path.join(temp_dir, "progress.db"))):
+        set_progress_store(store)
+        initialize_user_progress("user")
+        for score in scores:
+            update_quiz_history("user", quiz(score), "digestive")
+        results.append(store.load("user")["mastery_levels"])
+    set_progress_store(None)
+
+    assert results[0] == results[1]
+    assert results[0]["digestive"] == 2
+
+def test_migrate_json_to_sqlite(temp_dir):
+    """Test migration of existing JSON progress files into SQLite"""
+    json_store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(json_store)
+    for user_id in ("user-a", "user-b"):
+        initialize_user_progress(user_id)
+        update_viewed_section(user_id, "digestive")
+        update_quiz_history(user_id, quiz(7), "digestive")
+    set_progress_store(None)
+
+    sqlite_store = SQLiteProgressStore(os.path.join(temp_dir, "progress.db"))
+    assert migrate_progress(json_store, sqlite_store) == 2
+    for user_id in ("user-a", "user-b"):
+        migrated, original = sqlite_store.load(user_id), json_store.load(user_id)
+        del migrated["version"], original["version"]
+        assert migrated == original
+
+def test_save_rejects_stale_versions(temp_dir):
+    """Test that saving a document loaded before another write raises a conflict"""
+    for store in (JSONProgressStore(os.path.join(temp_dir, "json")),
+                  SQLiteProgressStore(os.path.join(temp_dir, "progress.db"))):
+        set_progress_store(store)
+        initialize_user_progress("user")
+        stale = store.load("user")
+        update_viewed_section("user", "lymphatic")
+
+        with pytest.raises(ProgressConflictError):
+            store.save("user", stale)
+        fresh = store.load("user")
+        store.save("user", fresh)
+        store.save("user", fresh)
+        assert len(store.load("user")["viewed_sections"]["lymphatic"]) == 1
+
+        # Initializing an existing user returns what is stored instead of resetting it
+        assert len(initialize_user_progress("user")["viewed_sections"]["lymphatic"]) == 1
+    set_progress_store(None)
+
+def test_json_snapshot_writes_are_atomic(temp_dir):
+    """Test that a failed snapshot write leaves the previous snapshot and no temp files"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(store)
+    initialize_user_progress("user")
+    set_progress_store(None)
+    progress = store.load("user")
+    progress["quiz_history"].append({"timestamp": object()})
+
+    with pytest.raises(TypeError):
+        store.save("user", progress)
+    assert store.load("user")["quiz_history"] == []
+    assert sorted(os.listdir(store.directory)) == ["user.json", "user.lock"]
+
+def test_create_progress_store_from_environment(monkeypatch):
+    """Test that PROGRESS_BACKEND selects the backend and PROGRESS_CACHE_SIZE the cache"""
+    monkeypatch.setenv("PROGRESS_CACHE_SIZE", "0")
+    monkeypatch.setenv("PROGRESS_BACKEND", "sqlite")
+    assert isinstance(progress_store.create_progress_store(), SQLiteProgressStore)
+    monkeypatch.setenv("PROGRESS_BACKEND", "json")
+    assert isinstance(progress_store.create_progress_store(), JSONProgressStore)
+    with pytest.raises(ValueError):
+        progress_store.create_progress_store("yaml")
+
+    monkeypatch.setenv("PROGRESS_CACHE_SIZE", "16")
+    store = progress_store.create_progress_store()
+    assert isinstance(store, CachedProgressStore)
+    assert isinstance(store.inner, JSONProgressStore)
+    assert store.stats()["max_entries"] == 16
+
+def test_json_views_append_to_journal(temp_dir):
+    """Test that recording views appends to the journal instead of rewriting the snapshot"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(store)
+    initialize_user_progress("user")
+    snapshot_mtime = os.stat(store.path_for("user")).st_mtime_ns
+
+    for _ in range(3):
+        update_viewed_section("user", "lymphatic")
+    update_quiz_history("user", quiz(6), "lymphatic")
+    set_progress_store(None)
+
+    assert os.stat(store.path_for("user")).st_mtime_ns == snapshot_mtime
+    with open(store.journal_path_for("user")) as f:
+        assert len(f.readlines()) == 4
+    progress = store.load("user")
+    assert len(progress["viewed_sections"]["lymphatic"]) == 3
+    assert len(progress["quiz_history"]) == 1
+
+def test_json_compaction_folds_journal(temp_dir):
+    """Test that compaction folds the journal into the snapshot without changing the result"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(store)
+    initialize_user_progress("user")
+    for score in (10, 10, 10):
+        update_viewed_section("user", "digestive")
+        update_quiz_history("user", quiz(score), "digestive")
+    set_progress_store(None)
+    before = store.load("user")
+
+    assert store.compact_all() == 6
+    assert not os.path.exists(store.journal_path_for("user"))
+    assert store.load("user") == before
+    assert store.compact("user") == 0
+
+def test_json_journal_skips_torn_line(temp_dir):
+    """Test that a partially written journal line is ignored on load"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(store)
+    initialize_user_progress("user")
+    update_viewed_section("user", "respiratory")
+    set_progress_store(None)
+    with open(store.journal_path_for("user"), "a") as f:
+        f.write('{"type": "view", "sec')
+
+    assert len(store.load("user")["viewed_sections"]["respiratory"]) == 1
+
+def test_background_compactor(temp_dir):
+    """Test that the background compactor folds journals on its interval"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    set_progress_store(store)
+    initialize_user_progress("user")
+    update_viewed_section("user", "lymphatic")
+    set_progress_store(None)
+
+    progress_store.start_compactor(store, interval=0.01, min_journal_bytes=0)
+    try:
+        for _ in range(200):
+            if not os.path.exists(store.journal_path_for("user")):
+                break
+            time.sleep(0.01)
+    finally:
+        progress_store.stop_compactor()
+
+    assert not os.path.exists(store.journal_path_for("user"))
+    assert len(store.load("user")["viewed_sections"]["lymphatic"]) == 1
+
+class RecordingStore(JSONProgressStore):
+    """JSON store that counts the writes it receives"""
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.batches = []
+        self.fail = False
+
+    def record_events(self, user_id, events, progress=None):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append((user_id, len(events)))
+        super().record_events(user_id, events, progress)
+
+@pytest.fixture
+def write_behind(temp_dir):
+    """Route user_progress through a write-behind buffer that only flushes on demand"""
+    inner = RecordingStore(os.path.join(temp_dir, "json"))
+    store = WriteBehindProgressStore(inner, flush_interval=3600, max_pending=1000)
+    set_progress_store(store)
+    yield store
+    set_progress_store(None)
+    store.close()
+
+def test_write_behind_buffers_and_coalesces(write_behind):
+    """Test that buffered writes are readable before a flush and batched per user"""
+    initialize_user_progress("user")
+    for _ in range(5):
+        update_viewed_section("user", "lymphatic")
+    update_quiz_history("user", quiz(8), "lymphatic")
+
+    assert write_behind.inner.load("user") is None
+    assert len(load_user_progress("user")["viewed_sections"]["lymphatic"]) == 5
+
+    write_behind.flush()
+    assert write_behind.pending_count() == 0
+    assert write_behind.inner.batches == [("user", 6)]
+    progress = write_behind.inner.load("user")
+    assert len(progress["viewed_sections"]["lymphatic"]) == 5
+    assert len(progress["quiz_history"]) == 1
+
+def test_write_behind_flushes_at_threshold(temp_dir):
+    """Test that reaching max_pending wakes the flusher without waiting for the timer"""
+    inner = JSONProgressStore(os.path.join(temp_dir, "json"))
+    store = WriteBehindProgressStore(inner, flush_interval=3600, max_pending=3)
+    try:
+        store.save("user", {"user_id": "user", "quiz_history": [], "viewed_sections": {}, "mastery_levels": {}})
+        store.record_events("user", [progress_store.make_view_event("digestive")] * 2)
+        for _ in range(200):
+            if store.pending_count() == 0:
+                break
+            time.sleep(0.01)
+        assert len(inner.load("user")["viewed_sections"]["digestive"]) == 2
+    finally:
+        store.close()
+
+def test_write_behind_requeues_failed_flush(write_behind):
+    """Test that a failed flush keeps the buffered writes for the next attempt"""
+    initialize_user_progress("user")
+    write_behind.flush()
+    update_viewed_section("user", "respiratory")
+
+    write_behind.inner.fail = True
+    with pytest.raises(OSError):
+        write_behind.flush()
+    assert write_behind.pending_count() == 1
+    update_viewed_section("user", "respiratory")
+
+    write_behind.inner.fail = False
+    write_behind.close()
+    assert len(write_behind.inner.load("user")["viewed_sections"]["respiratory"]) == 2
+
+def test_write_behind_checks_versions_on_save(temp_dir, monkeypatch):
+    """Test that saving through the default cached write-behind stack keeps versions in step"""
+    monkeypatch.setenv("PROGRESS_DIR", os.path.join(temp_dir, "json"))
+    monkeypatch.setenv("PROGRESS_WRITE_BEHIND", "1")
+    monkeypatch.setenv("PROGRESS_FLUSH_INTERVAL", "3600")
+    store = progress_store.create_progress_store()
+    assert isinstance(store.inner, WriteBehindProgressStore)
+    set_progress_store(store)
+    try:
+        initialize_user_progress("user")
+        store.inner.flush()
+        progress = store.load("user")
+        progress["mastery_levels"]["lymphatic"] = 2
+        store.save("user", progress)
+        store.inner.flush()
+        assert store.inner.inner.load("user")["mastery_levels"]["lymphatic"] == 2
+
+        stale = store.inner.load("user")
+        store.record_events("user", [progress_store.make_view_event("lymphatic")], store.load("user"))
+        with pytest.raises(ProgressConflictError):
+            store.save("user", stale)
+        fresh = store.load("user")
+        store.save("user", fresh)
+        store.inner.flush()
+        stored = store.inner.inner.load("user")
+        assert stored["version"] == fresh["version"] == 4
+        assert len(stored["viewed_sections"]["lymphatic"]) == 1
+    finally:
+        set_progress_store(None)
+        store.inner.close()
+
+class CountingStore(JSONProgressStore):
+    """JSON store that counts loads"""
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.loads = 0
+
+    def load(self, user_id):
+        self.loads += 1
+        return super().load(user_id)
+
+@pytest.fixture
+def cached(temp_dir):
+    """Route user_progress through an LRU cache over a load-counting store"""
+    store = CachedProgressStore(CountingStore(os.path.join(temp_dir, "json")), max_entries=2, ttl=60)
+    set_progress_store(store)
+    yield store
+
+def test_cache_serves_repeated_loads(cached):
+    """Test that repeated loads and writes only reach the wrapped store once"""
+    initialize_user_progress("user")
+    for _ in range(4):
+        load_user_progress("user")
+    update_viewed_section("user", "digestive")
+    update_quiz_history("user", quiz(9), "digestive")
+
+    progress = load_user_progress("user")
+    assert cached.inner.loads == 0
+    assert cached.stats()["hits"] == 7
+    assert len(progress["viewed_sections"]["digestive"]) == 1
+    assert progress == cached.inner.load("user")
+
+def test_cache_returns_independent_copies(cached):
+    """Test that modifying a loaded document does not change the cached one"""
+    initialize_user_progress("user")
+    progress = load_user_progress("user")
+    progress["viewed_sections"]["lymphatic"].append("tampered")
+    progress["mastery_levels"]["lymphatic"] = 3
+
+    fresh = load_user_progress("user")
+    assert fresh["viewed_sections"]["lymphatic"] == []
+    assert fresh["mastery_levels"]["lymphatic"] == 0
+
+def test_cache_evicts_least_recently_used(cached):
+    """Test that the cache stays within max_entries, evicting the oldest user"""
+    for user_id in ("a", "b", "c"):
+        initialize_user_progress(user_id)
+    stats = cached.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+
+    load_user_progress("a")
+    assert cached.inner.loads == 1
+    assert cached.stats()["misses"] == 1
+
+def test_cache_entries_expire(cached):
+    """Test that entries older than the TTL are reloaded"""
+    cached.ttl = 0.01
+    initialize_user_progress("user")
+    time.sleep(0.02)
+    load_user_progress("user")
+    assert cached.inner.loads == 1
+
+def test_cache_drops_entry_on_conflict(cached):
+    """Test that a conflicting save invalidates the cached document"""
+    initialize_user_progress("user")
+    stale = load_user_progress("user")
+    cached.inner.record_events("user", [progress_store.make_view_event("lymphatic")])
+
+    with pytest.raises(ProgressConflictError):
+        cached.save("user", stale)
+    assert len(load_user_progress("user")["viewed_sections"]["lymphatic"]) == 1
+
+def test_quiz_aggregates_track_history(temp_dir):
+    """Test that incrementally maintained aggregates match a rebuild from history"""
+    for store in (JSONProgressStore(os.path.join(temp_dir, "json")),
+                  SQLiteProgressStore(os.path.join(temp_dir, "progress.db"))):
+        set_progress_store(store)
+        initialize_user_progress("user")
+        for i, score in enumerate([3, 10, 9, 8, 10, 10, 6, 10]):
+            category = "lymphatic" if i % 3 else "respiratory"
+            difficulty = ["beginner", "advanced"][i % 2]
+            update_quiz_history("user", quiz(score, difficulty=difficulty), category)
+
+        progress = store.load("user")
+        aggregates = get_quiz_aggregates(progress)
+        assert aggregates == progress_store.build_quiz_aggregates(progress["quiz_history"])
+        lymphatic = aggregates["lymphatic"]
+        assert lymphatic["count"] == 5
+        assert len(lymphatic["recent"]) == progress_store.MASTERY_WINDOW
+        assert lymphatic["by_difficulty"] == {"advanced": 3, "beginner": 2}
+        assert progress["mastery_levels"]["lymphatic"] == 3
+        assert progress["mastery_levels"]["respiratory"] == 1
+
+def test_quiz_aggregates_rebuilt_for_older_documents(temp_dir):
+    """Test that documents saved without aggregates get them on the next quiz"""
+    store = JSONProgressStore(os.path.join(temp_dir, "json"))
+    history = [{"timestamp": "2024-01-01T00:00:00", "category": "digestive",
+                "score": 5, "total": 10, "difficulty": "beginner"}] * 2
+    store.save("user", {"user_id": "user", "quiz_history": history,
+                        "viewed_sections": {}, "mastery_levels": {"digestive": 0}})
+    set_progress_store(store)
+
+    progress = update_quiz_history("user", quiz(5), "digestive")
+    assert progress["quiz_aggregates"]["digestive"]["count"] == 3
+    assert progress["mastery_levels"]["digestive"] == 1
@@ -0,0 +1,90 @@
+"""
+Tests for the question_bank module
+"""
+import json
+import os
+import random
+import tempfile
+import pytest
+from content_registry import clear_registry
+from question_bank import QUIZ_PATH, QuestionBank, get_question_bank
+
+QUIZZES = {
+    "beginner": {"questions": [
+        {"id": "b1", "type": "free_response", "question": "?", "answer": "a", "category": "lymphatic"},
+        {"id": "b2", "type": "multiple_choice", "question": "?", "answer": "a", "category": "lymphatic"},
+        {"id": "b3", "type": "multiple_choice", "question": "?", "answer": "a", "category": "digestive"},
+        {"id": "b4", "question": "?", "answer": "a"},
+    ]},
+    "intermediate": {"questions": [
+        {"id": "i1", "type": "matching", "question": "?", "pairs": [], "category": "respiratory"},
+    ]},
+}
+
+def scan(quizzes, difficulty, category, question_types):
+    """Filter the way quiz_page did before the bank existed"""
+    questions = quizzes.get(difficulty, quizzes["intermediate"])["questions"]
+    if category != "Any":
+        questions = [q for q in questions if q.get("category", "") == category]
+    return [q["id"] for q in questions if q.get("type", "free_response") in question_types]
+
+def test_selection_matches_list_filtering():
+    """Test that indexed selection returns the same questions as a full scan"""
+    bank = QuestionBank.from_quizzes(QUIZZES)
+    types = ["free_response", "multiple_choice", "matching", "identification"]
+    for difficulty in ["beginner", "intermediate", "expert"]:
+        for category in ["Any", "lymphatic", "digestive", "respiratory", ""]:
+            for n in range(1, len(types) + 1):
+                selected = types[:n]
+                expected = scan(QUIZZES, difficulty, category, selected)
+                assert sorted(bank.select_ids(difficulty, category, selected)) == sorted(expected)
+                assert bank.count(difficulty, category, selected) == len(expected)
+
+def test_sample_is_distinct_and_matching():
+    """Test that sampling picks distinct questions from the selected groups only"""
+    bank = QuestionBank.from_quizzes(QUIZZES)
+    rng = random.Random(3)
+    for _ in range(20):
+        picked = bank.sample("beginner", "Any", ["multiple_choice", "free_response"], 3, rng)
+        assert len({q["id"] for q in picked}) == 3
+        assert all(q.get("type", "free_response") in ("multiple_choice", "free_response") for q in picked)
+
+    assert sorted(bank.sample_ids("beginner", "lymphatic", ["free_response", "multiple_choice"], 2, rng)) == ["b1", "b2"]
+    with pytest.raises(ValueError):
+        bank.sample("beginner", "digestive", ["multiple_choice"], 2, rng)
+
+def test_shared_bank_reloads_on_change():
+    """Test that the process-wide bank is reused until the quiz file changes"""
+    clear_registry()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "quizzes.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(QUIZZES, f)
+            bank = get_question_bank(path)
+            assert get_question_bank(path) is bank
+            assert len(bank) == 5
+
+            QUIZZES["intermediate"]["questions"].append({"id": "i2", "type": "matching", "question": "??", "pairs": []})
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(QUIZZES, f)
+                assert len(get_question_bank(path)) == 6
+            finally:
+                QUIZZES["intermediate"]["questions"].pop()
+    finally:
+        clear_registry()
+
+def test_real_quiz_file():
+    """Test that every difficulty in the shipped quiz file is indexed"""
+    bank = get_question_bank(QUIZ_PATH)
+    assert bank.count("beginner", "lymphatic") == 4
+    assert len(bank.order["advanced"]) == 12
+
+def test_resolve_ids():
+    """Test that stored question ids resolve to the shared question objects"""
+    bank = QuestionBank.from_quizzes(QUIZZES)
+    questions = bank.resolve(("i1", "gone", "b2"))
+
+    assert [q["id"] for q in questions] == ["i1", "b2"]
+    assert questions[1] is QUIZZES["beginner"]["questions"][1]
@@ -0,0 +1,85 @@
+"""
+Tests for the question_store module
+"""
+import json
+import os
+import tempfile
+import time
+import pytest
+from question_bank import QUIZ_PATH, default_question_path, load_question_bank
+from question_store import (
+    QuestionStore,
+    build_store_index,
+    convert_quizzes,
+    index_path_for,
+    load_store_index,
+)
+
+@pytest.fixture
+def temp_dir():
+    """Provide a temporary directory for question files"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+def test_convert_round_trip(temp_dir):
+    """Test that every converted question reads back unchanged with its difficulty"""
+    path = os.path.join(temp_dir, "questions.jsonl")
+    with open(QUIZ_PATH, 'r', encoding='utf-8') as f:
+        quizzes = json.load(f)
+    assert convert_quizzes(QUIZ_PATH, path) == 36
+
+    store = QuestionStore(path)
+    try:
+        for difficulty, data in quizzes.items():
+            for question in data["questions"]:
+                assert store.read(question["id"]) == {"difficulty": difficulty, **question}
+    finally:
+        store.close()
+
+def test_bank_from_store_matches_json(temp_dir):
+    """Test that a bank built from the store selects the same questions as one built from JSON"""
+    path = os.path.join(temp_dir, "questions.jsonl")
+    convert_quizzes(QUIZ_PATH, path)
+    from_json = load_question_bank(QUIZ_PATH)
+    from_store = load_question_bank(path)
+
+    assert from_store.groups == from_json.groups
+    question = from_store.get("b_lymph_4")
+    assert question["pairs"][0] == {"item": "Thymus", "match": "T cell development"}
+    assert from_store.get("missing") is None
+
+def test_stale_index_is_rebuilt(temp_dir):
+    """Test that editing the question file invalidates and rebuilds its index"""
+    path = os.path.join(temp_dir, "questions.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"id": "q1", "difficulty": "beginner", "question": "Ünïcode?"}\n')
+    build_store_index(path)
+    assert load_store_index(path) is not None
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n{"id": "q2", "difficulty": "advanced", "type": "matching", "category": "digestive"}')
+    assert load_store_index(path) is None
+
+    store = QuestionStore(path)
+    try:
+        assert store.entries[1] == ("q2", "advanced", "digestive", "matching")
+        assert store.read("q1")["question"] == "Ünïcode?"
+        assert store.read("q2")["type"] == "matching"
+    finally:
+        store.close()
+    assert os.path.exists(index_path_for(path))
+
+def test_stale_store_falls_back_to_json(temp_dir):
+    """Test that a store older than its source quiz file is not used"""
+    store_path = os.path.join(temp_dir, "questions.jsonl")
+    source_path = os.path.join(temp_dir, "quizzes.json")
+    assert default_question_path(store_path, source_path) == source_path
+
+    convert_quizzes(QUIZ_PATH, store_path)
+    assert default_question_path(store_path, source_path) == store_path
+
+    with open(source_path, 'w', encoding='utf-8') as f:
+        json.dump({}, f)
+    future = time.time() + 10
+    os.utime(source_path, (future, future))
+    assert default_question_path(store_path, source_path) == source_path
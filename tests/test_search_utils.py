@@ -0,0 +1,292 @@
+"""
+Tests for the search_utils module
+"""
+import os
+import pytest
+from search_utils import (
+    html_to_text,
+    index_content,
+    load_knowledge_content,
+    mark_highlights,
+    search_content,
+    split_sentences,
+)
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge")
+
+@pytest.fixture(scope="module")
+def knowledge():
+    """Index the real knowledge base once for all tests"""
+    content = load_knowledge_content(KNOWLEDGE_DIR)
+    return content, index_content(content)
+
+def test_index_has_positions_and_lengths():
+    """Test that the index stores one posting per section with token positions"""
+    content = {"a": "Thymus thymus lymph.", "b": "Lymph nodes filter lymph."}
+    index = index_content(content)
+
+    assert index["postings"]["thymus"] == {"a": [0, 1]}
+    assert index["postings"]["lymph"] == {"a": [2], "b": [0, 3]}
+    assert index["doc_lengths"] == {"a": 3, "b": 4}
+    assert index["avg_doc_length"] == 3.5
+
+def test_bm25_prefers_rarer_and_denser_terms():
+    """Test that BM25 ranks by term rarity and frequency rather than raw counts"""
+    content = {
+        "spleen": "Spleen filters blood. The spleen has white pulp and red pulp.",
+        "lymph": "Lymph nodes filter lymph. Blood vessels run nearby.",
+        "thymus": "Thymus matures T cells. Blood supply is rich.",
+    }
+    results = search_content("spleen blood", index_content(content), content)
+
+    assert [r["section"] for r in results][0] == "spleen"
+    assert len(results) == 3
+    assert results[0]["score"] > results[1]["score"]
+
+def test_search_knowledge_base(knowledge):
+    """Test searching the real study content"""
+    content, index = knowledge
+    results = search_content("germinal centers", index, content)
+
+    assert results[0]["section"] == "lymphatic"
+    assert "germinal" in results[0]["snippet"].lower()
+    assert search_content("xylophone", index, content) == []
+
+def test_html_to_text():
+    """Test that markup is stripped with block elements on separate lines"""
+    text = html_to_text("<h2>Overview</h2>\n<ul><li><strong>Spleen:</strong> filters &amp; stores</li><li>Thymus</li></ul>")
+    assert text == "Overview\nSpleen: filters & stores\nThymus"
+
+def test_limit_and_sentence_hits(knowledge):
+    """Test that results are capped and carry the matching sentences"""
+    content, index = knowledge
+    results = search_content("lymph", index, content, limit=1, max_sentence_hits=2)
+
+    assert len(results) == 1
+    hits = results[0]["sentence_hits"]
+    assert 0 < len(hits) <= 2
+    assert all("lymph" in hit["sentence"].lower() for hit in hits)
+
+def test_sentence_spans_and_token_sentences():
+    """Test that sentence boundaries and token sentence numbers are stored at index time"""
+    text = "Alveoli exchange gas. Bronchi conduct air!\nTrachea"
+    assert [text[start:end] for start, end in split_sentences(text)] == [
+        "Alveoli exchange gas.", "Bronchi conduct air!", "Trachea"
+    ]
+
+    index = index_content({"resp": text})
+    assert index["sentences"]["resp"] == split_sentences(text)
+    assert index["token_sentences"]["resp"] == [0, 0, 0, 1, 1, 1, 2]
+
+def test_snippet_highlights():
+    """Test that the snippet is the sentence with the most query terms and carries offsets"""
+    content = {"lymph": "Lymph flows slowly. Germinal centers form in the lymph node cortex (GALT). Done."}
+    result = search_content("germinal lymph", index_content(content), content)[0]
+
+    assert result["snippet"] == "Germinal centers form in the lymph node cortex (GALT)."
+    assert [result["snippet"][start:end] for start, end in result["highlights"]] == ["Germinal", "lymph"]
+    assert mark_highlights(result["snippet"], result["highlights"]).startswith("**Germinal** centers form in the **lymph** node")
+    assert [hit["matches"] for hit in result["sentence_hits"]] == [2, 1]
+
+def test_tfidf_engine_matches_result_shape(knowledge):
+    """Test that the vectorized engine ranks sections and returns the same result fields"""
+    pytest.importorskip("numpy")
+    from search_utils import TfidfSearchEngine
+
+    content, index = knowledge
+    engine = TfidfSearchEngine(index)
+    results = engine.search("germinal centers", content, limit=2)
+
+    assert results[0]["section"] == "lymphatic"
+    assert len(results) <= 2
+    assert set(results[0]) == set(search_content("germinal centers", index, content)[0])
+    assert 0 < results[0]["score"] <= 1.0
+    assert engine.search("xylophone", content) == []
+
+def test_cached_search_with_tfidf_engine():
+    """Test the engine path of cached_search with no limit and with fuzzy matching off"""
+    pytest.importorskip("numpy")
+    from search_utils import TfidfSearchEngine, cached_search, clear_search_cache
+
+    clear_search_cache()
+    content = {"thymus": "The thymus matures T cells.", "spleen": "The spleen filters blood cells."}
+    index = index_content(content)
+    engine = TfidfSearchEngine(index)
+
+    assert {r["section"] for r in cached_search("cells", index, content, engine=engine)} == {"thymus", "spleen"}
+    assert cached_search("spleeen", index, content, engine=engine)[0]["section"] == "spleen"
+    assert cached_search("spleeen", index, content, fuzzy=False, engine=engine) == []
+
+def test_tfidf_engine_requires_quoted_phrases(knowledge):
+    """Test that both engines apply the same phrase filter"""
+    pytest.importorskip("numpy")
+    from search_utils import TfidfSearchEngine, cached_search, clear_search_cache
+
+    clear_search_cache()
+    content, index = knowledge
+    engine = TfidfSearchEngine(index)
+    for query in ['"center germinal"', '"germinal centers" spleen']:
+        bm25 = [r["section"] for r in cached_search(query, index, content)]
+        tfidf = [r["section"] for r in cached_search(query, index, content, engine=engine)]
+        assert sorted(tfidf) == sorted(bm25)
+    assert cached_search('"center germinal"', index, content, engine=engine) == []
+    assert cached_search('"germinal centers"', index, content, engine=engine)[0]["section"] == "lymphatic"
+
+def test_tfidf_scores_are_cosine_similarity():
+    """Test scores against a direct dense cosine computation"""
+    np = pytest.importorskip("numpy")
+    from search_utils import TfidfSearchEngine
+
+    content = {"a": "spleen spleen blood", "b": "blood lymph", "c": "thymus"}
+    engine = TfidfSearchEngine(index_content(content))
+    terms = sorted(engine.term_ids)
+    idf = {term: engine.idf[engine.term_ids[term]] for term in terms}
+
+    def vector(tokens):
+        v = np.array([(1 + np.log(tokens.count(t))) * idf[t] if t in tokens else 0.0 for t in terms])
+        return v / np.linalg.norm(v)
+
+    query = vector(["spleen", "blood"])
+    expected = [float(vector(content[s].split()) @ query) for s in ["a", "b", "c"]]
+    assert np.allclose(engine.scores(["spleen", "blood"]), expected)
+    assert [section for section, _ in engine.top_k(["spleen", "blood"], k=1)] == ["a"]
+
+def test_fuzzy_terms_use_trigram_similarity():
+    """Test that misspellings map to vocabulary terms and unrelated words do not"""
+    from search_utils import build_trigram_index, fuzzy_terms
+
+    trigram_index = build_trigram_index(["alveoli", "alveolar", "peyers", "patches", "per"])
+    assert fuzzy_terms("alveolli", trigram_index)[0][0] == "alveoli"
+    assert [term for term, _ in fuzzy_terms("peyer", trigram_index)] == ["peyers"]
+    assert fuzzy_terms("xylophone", trigram_index) == []
+
+def test_fuzzy_terms_find_frequent_terms_in_full_buckets(monkeypatch):
+    """Test that capping trigram buckets keeps frequent terms findable when every bucket overflows"""
+    import search_utils
+    from search_utils import build_trigram_index, fuzzy_terms, trigrams
+
+    monkeypatch.setattr(search_utils, "FUZZY_MAX_BUCKET", 4)
+    term_freqs = {
+        "alveoli"[:i] + letter + "alveoli"[i + 1:]: 1
+        for i in range(len("alveoli")) for letter in "bcdfghkmnprstwz"
+    }
+    term_freqs["alveoli"] = 50
+    trigram_index = build_trigram_index(term_freqs, term_freqs)
+
+    grams = trigrams("alveoli")
+    assert all(len(trigram_index[gram][len(grams)]) == 4 for gram in grams)
+    assert fuzzy_terms("alveolli", trigram_index)[0] == ("alveoli", 0.8)
+
+def test_misspelled_queries_find_sections(knowledge):
+    """Test typo-tolerant search over the study content"""
+    content, index = knowledge
+    assert search_content("alveolli", index, content, fuzzy=False) == []
+
+    results = search_content("alveolli", index, content)
+    assert results[0]["section"] == "respiratory"
+    assert "alveoli" in results[0]["snippet"].lower()
+    assert results[0]["highlights"]
+
+    gut = {"ileum": "Peyer's patches line the ileum.", "colon": "The colon absorbs water."}
+    results = search_content("peyer patches", index_content(gut), gut)
+    assert [result["section"] for result in results] == ["ileum"]
+    assert [results[0]["snippet"][start:end] for start, end in results[0]["highlights"]] == ["Peyer's", "patches"]
+
+def test_prefix_completer_ranks_by_frequency():
+    """Test that completions come from the prefix range ordered by frequency"""
+    from search_utils import PrefixCompleter
+
+    completer = PrefixCompleter({"lymph": 9, "lymphocyte": 4, "lymphatic": 7, "lung": 3, "thymus": 5}, max_suggestions=2)
+    assert completer.complete("lym") == ["lymph", "lymphatic"]
+    assert completer.complete("l") == ["lymph", "lymphatic"]
+    assert completer.complete("lymphoc") == ["lymphocyte"]
+    assert completer.complete("x") == []
+    assert completer.complete("zz") == []
+    assert completer.complete_query("Lymphatic thy") == ["Lymphatic thymus"]
+    assert completer.complete_query("thymus") == []
+    assert completer.complete_query("lym ") == []
+
+def test_prefix_completer_precomputes_heavy_prefixes(monkeypatch):
+    """Test that prefixes matching many terms are answered from stored lists that match a full scan"""
+    import random
+    import search_utils
+    from search_utils import PrefixCompleter
+
+    monkeypatch.setattr(search_utils, "COMPLETION_SCAN_LIMIT", 4)
+    rng = random.Random(0)
+    term_freqs = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 6))): rng.randint(1, 5) for _ in range(300)}
+    completer = PrefixCompleter(term_freqs, max_suggestions=3)
+
+    assert "a" in completer.top and "ab" in completer.top
+    for term in term_freqs:
+        for length in range(1, len(term) + 1):
+            prefix = term[:length]
+            expected = sorted((t for t in term_freqs if t.startswith(prefix)), key=lambda t: (-term_freqs[t], t))
+            assert completer.complete(prefix) == expected[:3]
+
+def test_prefix_completer_from_index(knowledge):
+    """Test completions over the study content vocabulary"""
+    from search_utils import PrefixCompleter
+
+    _, index = knowledge
+    completer = PrefixCompleter.from_index(index)
+    suggestions = completer.complete("alv")
+    assert "alveoli" in suggestions
+    assert all(term.startswith("alv") for term in suggestions)
+
+def test_phrase_queries_require_adjacent_terms():
+    """Test that quoted phrases only match consecutive positions"""
+    from search_utils import parse_query, phrase_starts
+
+    content = {
+        "node": "Germinal centers form in the cortex of the node.",
+        "spleen": "Germinal tissue surrounds arteries. Centers of activity vary.",
+    }
+    index = index_content(content)
+
+    assert parse_query('"Germinal centers" of the spleen') == (["spleen"], [["germinal", "centers"]])
+    assert phrase_starts(["germinal", "centers"], "node", index) == [0]
+    assert phrase_starts(["germinal", "centers"], "spleen", index) == []
+    # Stopwords are dropped from both the phrase and the positions
+    assert phrase_starts(["cortex", "node"], "node", index) == [3]
+
+    results = search_content('"germinal centers"', index, content)
+    assert [result["section"] for result in results] == ["node"]
+    assert search_content('"centers germinal"', index, content) == []
+
+def test_proximity_boosts_close_terms():
+    """Test that unquoted terms close together outrank the same terms far apart"""
+    from search_utils import minimal_window
+
+    assert minimal_window([[0, 9], [5, 10]]) == 2
+    assert minimal_window([[1], [4], [2, 8]]) == 4
+
+    filler = " ".join(f"word{i}" for i in range(30))
+    content = {
+        "near": f"Germinal centers appear here. {filler} Cells.",
+        "far": f"Germinal cells appear here. {filler} Centers.",
+    }
+    results = search_content("germinal centers", index_content(content), content)
+    assert [result["section"] for result in results] == ["near", "far"]
+
+def test_cached_search_shares_normalized_queries():
+    """Test that equivalent queries hit one cache entry and content changes miss"""
+    from search_utils import cached_search, clear_search_cache, content_hash, search_cache_stats
+
+    clear_search_cache()
+    content = {"thymus": "The thymus matures T cells.", "spleen": "The spleen filters blood."}
+    index = index_content(content)
+    before = search_cache_stats()
+
+    first = cached_search("Thymus", index, content)
+    first[0]["section"] = "mutated"
+    second = cached_search("  the THYMUS! ", index, content)
+    assert second == search_content("thymus", index, content)
+    stats = search_cache_stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+
+    changed = dict(content, thymus="The thymus shrinks with age.")
+    assert content_hash(changed) != index["content_hash"]
+    cached_search("thymus", index_content(changed), changed)
+    assert search_cache_stats()["misses"] - before["misses"] == 2
@@ -0,0 +1,52 @@
+"""
+Tests for the text_processing module
+"""
+import os
+import pytest
+from text_processing import STOPWORDS, normalize, preprocess_text, tokenize
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge")
+
+def nltk_preprocess():
+    """Return the original NLTK pipeline, skipping if NLTK or its data is unavailable"""
+    nltk = pytest.importorskip("nltk")
+    from nltk.corpus import stopwords
+    from nltk.tokenize import word_tokenize
+    try:
+        stop_words = set(stopwords.words('english'))
+        word_tokenize("probe")
+    except LookupError:
+        pytest.skip("NLTK data not installed")
+
+    def preprocess(text):
+        tokens = word_tokenize(normalize(text))
+        return [word for word in tokens if word not in stop_words]
+    return preprocess, stop_words
+
+def test_preprocess_text():
+    """Test lowercasing, punctuation removal and stopword filtering"""
+    assert preprocess_text("The Peyer's patches, in the ILEUM!") == ["peyers", "patches", "ileum"]
+    assert preprocess_text("") == []
+
+def test_treebank_contractions():
+    """Test that words word_tokenize splits are split the same way"""
+    assert tokenize("cannot gonna wanna gotta gimme lemme cannoted") == [
+        "can", "not", "gon", "na", "wan", "na", "got", "ta", "gim", "me", "lem", "me", "cannoted"
+    ]
+    assert preprocess_text("You cannot wanna") == ["wan", "na"]
+
+def test_stopwords_frozen():
+    """Test that the stopword set matches NLTK's English list"""
+    assert isinstance(STOPWORDS, frozenset)
+    assert len(STOPWORDS) == 179
+    assert {"the", "of", "don't", "wouldn't"} <= STOPWORDS
+
+def test_matches_nltk_pipeline():
+    """Test equivalence with word_tokenize and NLTK stopwords on the study content"""
+    preprocess, stop_words = nltk_preprocess()
+    assert STOPWORDS == stop_words
+
+    for filename in os.listdir(KNOWLEDGE_DIR):
+        with open(os.path.join(KNOWLEDGE_DIR, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                assert preprocess_text(line) == preprocess(line)
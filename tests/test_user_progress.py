@@ -6,7 +6,8 @@ import tempfile
 import json
 import pytest
 from datetime import datetime
-from user_progress import initialize_user_progress, update_viewed_section, load_user_progress
+import user_progress
+from user_progress import initialize_user_progress, update_viewed_section, load_user_progress, should_record_view, record_debounced_view
 
 @pytest.fixture
 def temp_data_dir():
@@ -47,4 +48,41 @@ def test_update_viewed_section(temp_data_dir):
     
     # View the same section again
     result = update_viewed_section(user_id, "respiratory")
-    assert len(result["viewed_sections"]["respiratory"]) == 2
\ No newline at end of file
+    assert len(result["viewed_sections"]["respiratory"]) == 2
+
+def test_should_record_view_debounces_per_section():
+    """Test that views are accepted at most once per window for each section"""
+    last_views = {"lymphatic": 0}
+    assert not should_record_view(last_views, "lymphatic", now=299, window=300)
+    assert should_record_view(last_views, "respiratory", now=299, window=300)
+    assert should_record_view(last_views, "lymphatic", now=300, window=300)
+    assert last_views == {"lymphatic": 0}
+
+def test_debounced_reruns_persist_one_view(temp_data_dir):
+    """Test that a burst of study page reruns writes a single view event"""
+    user_id = "test-user-rerun"
+    initialize_user_progress(user_id)
+    last_views = {}
+    for rerun in range(200):
+        record_debounced_view(user_id, last_views, "digestive", now=rerun, window=300)
+
+    assert len(load_user_progress(user_id)["viewed_sections"]["digestive"]) == 1
+    assert last_views == {"digestive": 0}
+
+def test_failed_view_write_is_retried(temp_data_dir, monkeypatch):
+    """Test that a view whose write failed does not start the debounce window"""
+    user_id = "test-user-retry"
+    initialize_user_progress(user_id)
+    last_views = {}
+
+    def fail(user_id, section):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(user_progress, "update_viewed_section", fail)
+    with pytest.raises(OSError):
+        record_debounced_view(user_id, last_views, "digestive", now=0, window=300)
+    assert last_views == {}
+
+    monkeypatch.undo()
+    assert record_debounced_view(user_id, last_views, "digestive", now=1, window=300)
+    assert len(load_user_progress(user_id)["viewed_sections"]["digestive"]) == 1
@@ -0,0 +1,57 @@
+"""
+Self-contained tokenizer and stopword list for search.
+
+Produces the same tokens as the former NLTK pipeline (lowercase, strip
+punctuation, word_tokenize, drop English stopwords) without loading any
+corpora or touching the network.
+"""
+import re
+
+# NLTK's English stopword list (nltk 3.8.1 corpora/stopwords/english)
+STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down
+in out on off over under again further then once here there when where why how
+all any both each few more most other some such no nor not only own same so
+than too very s t can will just don don't should should've now d ll m o re ve y
+ain aren aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn
+hasn't haven haven't isn isn't ma mightn mightn't mustn mustn't needn needn't
+shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn
+wouldn't
+""".split())
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WORD_RE = re.compile(r'\w+')
+
+# Once punctuation is gone, these are the only Treebank rules that still split a word
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+def normalize(text):
+    """Lowercase text and remove punctuation"""
+    return PUNCTUATION_RE.sub('', text.lower())
+
+def tokenize(text):
+    """Split normalized text into word tokens"""
+    tokens = []
+    for word in WORD_RE.findall(text):
+        parts = CONTRACTIONS.get(word)
+        if parts:
+            tokens.extend(parts)
+        else:
+            tokens.append(word)
+    return tokens
+
+def preprocess_text(text):
+    """Normalize and tokenize text, dropping stopwords"""
+    return [token for token in tokenize(normalize(text)) if token not in STOPWORDS]
@@ -1,42 +1,59 @@
-import json
 import os
+import time
 from datetime import datetime
+from progress_store import (
+    get_progress_store,
+    apply_event,
+    ensure_quiz_aggregates,
+    make_quiz_event,
+    make_view_event,
+    ProgressConflictError
+)
+from content_registry import get_system_ids
+
+# A section view is recorded at most once per window per session
+VIEW_DEBOUNCE_SECONDS = float(os.environ.get("VIEW_DEBOUNCE_SECONDS", "300"))
 
 def initialize_user_progress(user_id):
     """Initialize progress tracking for a new user"""
-    if not os.path.exists("data/user_progress"):
-        os.makedirs("data/user_progress")
-        
     progress = {
         "user_id": user_id,
         "quiz_history": [],
-        "viewed_sections": {
-            "lymphatic": [],
-            "respiratory": [],
-            "digestive": []
-        },
-        "mastery_levels": {
-            "lymphatic": 0,
-            "respiratory": 0,
-            "digestive": 0
-        }
+        "viewed_sections": {system: [] for system in get_system_ids()},
+        "mastery_levels": {system: 0 for system in get_system_ids()},
+        "quiz_aggregates": {}
     }
     
-    save_user_progress(user_id, progress)
+    try:
+        save_user_progress(user_id, progress)
+    except ProgressConflictError:
+        # Another session or worker created this user's progress first
+        return load_user_progress(user_id)
     return progress
 
 def save_user_progress(user_id, progress):
-    """Save user progress to file"""
-    with open(f"data/user_progress/{user_id}.json", "w") as f:
-        json.dump(progress, f)
+    """
+    Save user progress through the configured progress store
+
+    Raises ProgressConflictError if the progress changed since it was loaded.
+    """
+    get_progress_store().save(user_id, progress)
         
 def load_user_progress(user_id):
-    """Load user progress from file"""
-    try:
-        with open(f"data/user_progress/{user_id}.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
+    """Load user progress from the configured progress store"""
+    progress = get_progress_store().load(user_id)
+    if progress is None:
         return initialize_user_progress(user_id)
+    return progress
+        
+def get_quiz_aggregates(progress):
+    """
+    Return per-category quiz aggregates for a progress document
+    
+    Each category maps to its recent score ratios (oldest first), quiz count,
+    summed scores and totals, and quiz counts per difficulty.
+    """
+    return ensure_quiz_aggregates(progress)
         
 def update_quiz_history(user_id, quiz_results, category):
     """Add new quiz results to history"""
@@ -50,34 +67,45 @@ def update_quiz_history(user_id, quiz_results, category):
         "difficulty": quiz_results["difficulty"]
     }
     
-    progress["quiz_history"].append(quiz_entry)
+    # Appending the entry also updates the category's aggregates and mastery level
+    event = make_quiz_event(quiz_entry)
+    apply_event(progress, event)
+    get_progress_store().record_events(user_id, [event], progress)
+    return progress
+
+def should_record_view(last_views, section, now=None, window=None):
+    """
+    Decide whether a section view should be persisted
     
-    # Update mastery level based on recent quiz performance
-    recent_quizzes = [q for q in progress["quiz_history"] if q["category"] == category][-5:]
-    if len(recent_quizzes) >= 3:
-        avg_score = sum(q["score"]/q["total"] for q in recent_quizzes) / len(recent_quizzes)
-        
-        if avg_score > 0.9:
-            progress["mastery_levels"][category] = 3  # Expert
-        elif avg_score > 0.7:
-            progress["mastery_levels"][category] = 2  # Intermediate
-        else:
-            progress["mastery_levels"][category] = 1  # Beginner
+    last_views maps section names to the time their last view was persisted
+    (kept in session state); record_debounced_view updates it.
+    """
+    now = time.monotonic() if now is None else now
+    window = VIEW_DEBOUNCE_SECONDS if window is None else window
+    last = last_views.get(section)
+    return last is None or now - last >= window
+
+def record_debounced_view(user_id, last_views, section, now=None, window=None):
+    """
+    Persist a section view unless one was persisted within the window
     
-    save_user_progress(user_id, progress)
-    return progress
+    The view's time is only stored in last_views once the write succeeded,
+    so a failed write is retried on the next rerun. Returns whether the
+    view was persisted.
+    """
+    now = time.monotonic() if now is None else now
+    if not should_record_view(last_views, section, now, window):
+        return False
+    update_viewed_section(user_id, section)
+    last_views[section] = now
+    return True
 
 def update_viewed_section(user_id, section):
     """Record that user has viewed a section"""
     progress = load_user_progress(user_id)
     
-    # Ensure section exists in viewed_sections
-    if section not in progress["viewed_sections"]:
-        progress["viewed_sections"][section] = []
-    
-    # Add timestamp
-    timestamp = datetime.now().isoformat()
-    progress["viewed_sections"][section].append(timestamp)
-    save_user_progress(user_id, progress)
+    event = make_view_event(section)
+    apply_event(progress, event)
+    get_progress_store().record_events(user_id, [event], progress)
     
     return progress
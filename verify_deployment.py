@@ -199,7 +199,7 @@ class DeploymentVerifier:
                 content = f.read()
             
             # Check for key dependencies
-            required_packages = ["streamlit", "pandas", "nltk", "pillow", "matplotlib"]
+            required_packages = ["streamlit", "pandas", "pillow", "matplotlib"]
             missing_packages = []
             
             for package in required_packages:
@@ -248,16 +248,11 @@ class DeploymentVerifier:
                 self.results["image_resource_check"] = True
                 
                 # Add warnings for missing images that were auto-generated
-                systems = ["lymphatic", "respiratory", "digestive"]
-                expected_counts = {
-                    "lymphatic": 3,  # thymus, lymph_node, spleen
-                    "respiratory": 2,  # trachea, lung
-                    "digestive": 2    # esophagus_stomach, small_intestine
-                }
+                from content_registry import get_histology_slides, get_system_ids
                 
-                for system in systems:
+                for system in get_system_ids():
                     found_count = len(validation_results["histology_images"][system])
-                    expected = expected_counts.get(system, 0)
+                    expected = len(get_histology_slides(system))
                     
                     if found_count < expected:
                         logger.warning(f"Some {system} histology images are placeholder generated")
@@ -280,7 +275,15 @@ class DeploymentVerifier:
         logger.info("Checking study content...")
         
         knowledge_dir = os.path.join(self.app_dir, "data", "knowledge")
-        systems = ["lymphatic", "respiratory", "digestive"]
+        
+        # Every system in the content manifest needs a knowledge page
+        try:
+            from content_registry import get_system_ids
+            systems = get_system_ids()
+        except Exception as e:
+            logger.error(f"Error reading content manifest: {str(e)}")
+            self.results["errors"].append(f"Content manifest error: {str(e)}")
+            return False
         
         if not os.path.exists(knowledge_dir):
             logger.error(f"Knowledge directory not found: {knowledge_dir}")